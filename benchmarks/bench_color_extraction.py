@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Benchmark the color extraction hot path in scripts/analyze_colors.py.
+
+Times decode, filter, count, group and naming separately, over the real
+collection and over synthetic JPEGs of several sizes.
+
+Run with: python3 benchmarks/bench_color_extraction.py [--json results.json]
+Compare:  python3 benchmarks/bench_color_extraction.py --compare results.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import analyze_colors
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Paths
+IMAGE_DIR = Path("editorial_feed_images")
+
+SYNTHETIC_SIZES = [256, 1024, 2048, 4096]
+NUM_COLORS = 5
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (q in 0-100)"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def run_stages(image_path, backend):
+    """Run one extraction, returning {stage: seconds}"""
+    timings = {}
+    clock = time.perf_counter
+
+    start = clock()
+    img = analyze_colors.load_thumbnail(image_path)
+    timings['decode'] = clock() - start
+
+    if backend == 'reference':
+        start = clock()
+        pixels = analyze_colors.filter_pixels(list(img.getdata()))
+        timings['filter'] = clock() - start
+
+        start = clock()
+        most_common = analyze_colors.count_colors(pixels, NUM_COLORS * 3)
+        timings['count'] = clock() - start
+
+        start = clock()
+        unique_colors = analyze_colors.group_similar_colors(most_common, NUM_COLORS)
+        timings['group'] = clock() - start
+    elif backend == 'numpy':
+        start = clock()
+        arr = analyze_colors.filter_pixels_np(np.asarray(img, dtype=np.uint8).reshape(-1, 3))
+        timings['filter'] = clock() - start
+
+        start = clock()
+        most_common = analyze_colors.count_colors_np(arr, NUM_COLORS * 3)
+        timings['count'] = clock() - start
+
+        start = clock()
+        unique_colors = analyze_colors.group_similar_colors_np(most_common, NUM_COLORS)
+        timings['group'] = clock() - start
+    else:
+        # Quantizer backends filter, count and group in one call
+        start = clock()
+        unique_colors = analyze_colors.PALETTE_BACKENDS[backend](img, NUM_COLORS)
+        timings['quantize'] = clock() - start
+
+    start = clock()
+    analyze_colors.summarize_colors(unique_colors)
+    timings['naming'] = clock() - start
+
+    return timings
+
+def make_synthetic_images(directory, sizes, per_size, seed):
+    """Write gradient + shape JPEGs resembling the collection; return {size: [paths]}"""
+    rng = random.Random(seed)
+    images = {}
+
+    for size in sizes:
+        images[size] = []
+        for i in range(per_size):
+            start_color = tuple(rng.randrange(256) for _ in range(3))
+            end_color = tuple(rng.randrange(256) for _ in range(3))
+
+            gradient = Image.linear_gradient('L').resize((size, size))
+            img = Image.merge('RGB', [
+                gradient.point(lambda v, a=a, b=b: a + (b - a) * v // 255)
+                for a, b in zip(start_color, end_color)
+            ])
+
+            draw = ImageDraw.Draw(img)
+            for _ in range(3):
+                x0, y0 = rng.randrange(size // 2), rng.randrange(size // 2)
+                x1, y1 = x0 + rng.randrange(size // 8, size // 2), y0 + rng.randrange(size // 8, size // 2)
+                draw.ellipse((x0, y0, x1, y1), fill=tuple(rng.randrange(256) for _ in range(3)))
+
+            path = Path(directory) / f"synthetic-{size}-{i}.jpg"
+            img.save(path, quality=90)
+            images[size].append(path)
+
+    return images
+
+def bench(image_paths, backend, repeat):
+    """Benchmark `image_paths`, returning a JSON-friendly summary"""
+    # Warm up imports, the color lookup table and the file cache
+    run_stages(image_paths[0], backend)
+
+    stages = {}
+    totals = []
+    wall_start = time.perf_counter()
+
+    for _ in range(repeat):
+        for image_path in image_paths:
+            timings = run_stages(image_path, backend)
+            for stage, seconds in timings.items():
+                stages.setdefault(stage, []).append(seconds)
+            totals.append(sum(timings.values()))
+
+    wall = time.perf_counter() - wall_start
+
+    def summarize(values):
+        return {
+            'mean_ms': sum(values) / len(values) * 1000,
+            'p50_ms': percentile(values, 50) * 1000,
+            'p90_ms': percentile(values, 90) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+        }
+
+    return {
+        'images': len(image_paths),
+        'runs': len(totals),
+        'images_per_sec': len(totals) / wall,
+        'latency': summarize(totals),
+        'stages': {stage: summarize(values) for stage, values in stages.items()},
+    }
+
+def print_result(name, result, baseline=None):
+    """Print one benchmark result as a table, with ratios against a baseline"""
+    line = f"{name}: {result['images_per_sec']:.1f} images/sec over {result['runs']} runs"
+    if baseline:
+        line += f" (baseline {baseline['images_per_sec']:.1f}, {result['images_per_sec'] / baseline['images_per_sec']:.2f}x)"
+    print(line)
+
+    rows = [('total', result['latency'])] + list(result['stages'].items())
+    print(f"  {'stage':<10} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9}")
+    for stage, stats in rows:
+        row = f"  {stage:<10} " + " ".join(
+            f"{stats[key]:>7.2f}ms" for key in ('mean_ms', 'p50_ms', 'p90_ms', 'p99_ms')
+        )
+        base = baseline and (baseline['latency'] if stage == 'total' else baseline['stages'].get(stage))
+        if base:
+            row += f"  ({stats['mean_ms'] / base['mean_ms']:.2f}x mean)"
+        print(row)
+    print()
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark color extraction stages")
+    parser.add_argument('--backend', choices=sorted(analyze_colors.PALETTE_BACKENDS),
+                        default=analyze_colors.DEFAULT_BACKEND)
+    parser.add_argument('--repeat', type=int, default=3, help="passes over each image set")
+    parser.add_argument('--limit', type=int, default=None, help="only use the first N collection images")
+    parser.add_argument('--sizes', type=int, nargs='*', default=SYNTHETIC_SIZES,
+                        help="synthetic image sizes in pixels (none to skip)")
+    parser.add_argument('--per-size', type=int, default=10, help="synthetic images per size")
+    parser.add_argument('--seed', type=int, default=0, help="seed for synthetic images")
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON ('-' for stdout)")
+    parser.add_argument('--compare', metavar='PATH', help="JSON from an earlier run to compare against")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the benchmarks"""
+    args = parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    report = {
+        'backend': args.backend,
+        'algorithm_version': analyze_colors.ALGORITHM_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {},
+    }
+
+    out = sys.stderr if args.json == '-' else sys.stdout
+    stdout, sys.stdout = sys.stdout, out
+    try:
+        print(f"Color extraction benchmark ({args.backend} backend)\n")
+
+        corpus = sorted(IMAGE_DIR.glob("*.jpg"))[:args.limit]
+        if corpus:
+            result = bench(corpus, args.backend, args.repeat)
+            report['results']['corpus'] = result
+            print_result(f"corpus ({len(corpus)} images)", result, baseline.get('corpus'))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            synthetic = make_synthetic_images(tmp, args.sizes, args.per_size, args.seed)
+            for size, paths in synthetic.items():
+                name = f"synthetic-{size}px"
+                result = bench(paths, args.backend, args.repeat)
+                report['results'][name] = result
+                print_result(f"{name} ({len(paths)} images)", result, baseline.get(name))
+    finally:
+        sys.stdout = stdout
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Saved results to {args.json}")
+
+if __name__ == "__main__":
+    main()
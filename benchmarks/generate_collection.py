@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic collection for scale testing.
+
+Creates N gradient + object JPEGs resembling the real collection and a
+matching images_metadata.json whose tags follow the tag distributions of the
+real metadata. Output is fully determined by --seed (each image gets its own
+seeded generator, so --workers does not change the result) and nothing is
+downloaded.
+
+The output directory has the same layout as the repository, so the scripts,
+tests and gallery run against it from inside that directory:
+    python3 benchmarks/generate_collection.py --count 10000 --output /tmp/synthetic-10k
+    cd /tmp/synthetic-10k && python3 <repo>/scripts/analyze_colors.py
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR / "scripts"))
+
+import image_hashes
+import palette_index
+import search_index
+from color_names import DATA_DIR, get_color_name, load_palette
+
+# Paths
+SOURCE_METADATA = REPO_DIR / "images_metadata.json"
+
+# Copied as-is; the indexes in data/ are rebuilt from the synthetic metadata
+GALLERY_FILES = ['index.html', 'search_index.js', 'search_worker.js']
+DATA_FILES = ['color_palette.json', 'color_lookup.bin']
+TAG_TYPES = ['conceptual', 'subject', 'colors', 'style']
+
+SHAPES = ['ellipse', 'rectangle', 'rings', 'polygon']
+
+def rgb_to_hex(rgb):
+    """Convert RGB tuple to hex string"""
+    return '#{:02x}{:02x}{:02x}'.format(rgb[0], rgb[1], rgb[2])
+
+def load_tag_distributions(path=SOURCE_METADATA):
+    """Tag frequencies and tag-list lengths per tag type from real metadata"""
+    with open(path) as f:
+        metadata = json.load(f)
+
+    color_names = {name for name, _ in load_palette()}
+
+    distributions = {}
+    for tag_type in TAG_TYPES:
+        counts = Counter(tag for entry in metadata for tag in entry['tags'].get(tag_type, []))
+        if tag_type == 'colors':
+            # Color names come from the drawn colors; only sample descriptors
+            counts = Counter({tag: n for tag, n in counts.items() if tag not in color_names})
+        lengths = Counter(len(entry['tags'].get(tag_type, [])) for entry in metadata)
+        distributions[tag_type] = {
+            'tags': sorted(counts),
+            'weights': [counts[tag] for tag in sorted(counts)],
+            'lengths': sorted(lengths),
+            'length_weights': [lengths[n] for n in sorted(lengths)],
+        }
+    return distributions
+
+def sample_tags(rng, distribution):
+    """Draw a tag list: length from the real length distribution, tags by frequency"""
+    length = rng.choices(distribution['lengths'], distribution['length_weights'])[0]
+    tags = []
+    while len(tags) < min(length, len(distribution['tags'])):
+        tag = rng.choices(distribution['tags'], distribution['weights'])[0]
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+def draw_image(rng, size, palette):
+    """Two-color gradient background with a few flat-shaded objects on top"""
+    start_color = rng.choice(palette)[1]
+    end_color = rng.choice(palette)[1]
+    object_colors = [rng.choice(palette)[1] for _ in range(rng.randint(1, 3))]
+
+    gradient = Image.linear_gradient('L').resize((size, size))
+    if rng.random() < 0.5:
+        gradient = gradient.rotate(90)
+    img = Image.merge('RGB', [
+        gradient.point(lambda v, a=a, b=b: a + (b - a) * v // 255)
+        for a, b in zip(start_color, end_color)
+    ])
+
+    draw = ImageDraw.Draw(img)
+    for color in object_colors:
+        shape = rng.choice(SHAPES)
+        x0, y0 = rng.randrange(size // 2), rng.randrange(size // 2)
+        x1 = x0 + rng.randrange(size // 6, size // 2)
+        y1 = y0 + rng.randrange(size // 6, size // 2)
+        if shape == 'ellipse':
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+        elif shape == 'rectangle':
+            draw.rounded_rectangle((x0, y0, x1, y1), radius=max(1, size // 32), fill=color)
+        elif shape == 'rings':
+            for step in range(3):
+                offset = step * (x1 - x0) // 3
+                draw.ellipse((x0 + offset, y0, x1 + offset, y1), outline=color, width=max(1, size // 48))
+        else:
+            points = [(rng.randrange(x0, x1), rng.randrange(y0, y1)) for _ in range(5)]
+            draw.polygon(points, fill=color)
+
+    return img, start_color, end_color, object_colors
+
+def generate_entry(index, seed, size, quality, image_dir, palette, distributions):
+    """Create image `index` and return its metadata entry"""
+    rng = random.Random(f"{seed}:{index}")
+
+    img, start_color, end_color, object_colors = draw_image(rng, size, palette)
+
+    tags = {tag_type: sample_tags(rng, distributions[tag_type]) for tag_type in TAG_TYPES}
+    subject = tags['subject'][0] if tags['subject'] else 'shape'
+    color_name = get_color_name(start_color)
+
+    new_filename = f"{subject}-{color_name}-gradient-{index}.jpg"
+    img.save(image_dir / new_filename, quality=quality)
+
+    named = []
+    for rgb in [start_color, end_color] + object_colors:
+        name = get_color_name(rgb)
+        if name not in named:
+            named.append(name)
+
+    # Color tags: the drawn colors, then sampled descriptors ("gradient", "vibrant", ...)
+    descriptors = [tag for tag in tags['colors'] if tag not in named]
+    tags['colors'] = named + descriptors[:max(1, len(tags['colors']) - len(named))]
+
+    title = f"{subject.replace('-', ' ').title()} {color_name.replace('-', ' ').title()}"
+    tags['analyzed_colors'] = {
+        'dominant': [rgb_to_hex(start_color), rgb_to_hex(end_color)],
+        'accent': [rgb_to_hex(rgb) for rgb in object_colors],
+        'named': named[:6],
+    }
+
+    return {
+        "originalFilename": f"FLORA Synthetic {index}.jpg",
+        "newFilename": new_filename,
+        "title": title,
+        "description": (
+            f"Synthetic {subject.replace('-', ' ')} on a {color_name.replace('-', ' ')} to "
+            f"{get_color_name(end_color).replace('-', ' ')} gradient background. "
+            f"Concepts: {', '.join(tags['conceptual'][:3])}."
+        ),
+        "tags": tags,
+    }
+
+def generate_chunk(indices, **kwargs):
+    """Worker entry point: generate a range of entries"""
+    return [generate_entry(index, **kwargs) for index in indices]
+
+def generate_collection(output, count, seed=0, size=256, quality=85, workers=1):
+    """Generate `count` images and metadata under `output`; return the metadata"""
+    output = Path(output)
+    image_dir = output / "editorial_feed_images"
+    image_dir.mkdir(parents=True, exist_ok=True)
+
+    worker = partial(
+        generate_chunk, seed=seed, size=size, quality=quality, image_dir=image_dir,
+        palette=load_palette(), distributions=load_tag_distributions(),
+    )
+
+    chunk = 1000
+    chunks = [range(start, min(start + chunk, count)) for start in range(0, count, chunk)]
+
+    metadata = []
+    if workers <= 1:
+        for entries in map(worker, chunks):
+            metadata.extend(entries)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for entries in pool.map(worker, chunks):
+                metadata.extend(entries)
+
+    metadata_file = output / "images_metadata.json"
+    with open(metadata_file, 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    # Gallery files, so the collection can be served and browsed as-is
+    data_dir = output / "data"
+    data_dir.mkdir(exist_ok=True)
+    for name in GALLERY_FILES:
+        shutil.copy2(REPO_DIR / name, output / name)
+    for name in DATA_FILES:
+        shutil.copy2(DATA_DIR / name, data_dir / name)
+
+    search_index.build(metadata_file, data_dir / "search_index.json")
+    palette_index.build(metadata_file, data_dir / "palette_index.bin", data_dir / "palette_index.json")
+    image_hashes.build(
+        workers, metadata_file=metadata_file, image_dir=image_dir,
+        hashes_file=data_dir / "image_hashes.json", cache_file=output / ".cache" / "image_hashes.json",
+    )
+
+    return metadata
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic collection for scale testing")
+    parser.add_argument('--count', type=int, required=True, help="number of images")
+    parser.add_argument('--output', required=True, help="output directory")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument('--size', type=int, default=256, help="image edge in pixels (default: 256)")
+    parser.add_argument('--quality', type=int, default=85, help="JPEG quality (default: 85)")
+    parser.add_argument('--workers', type=int, default=1, help="parallel workers (default: 1)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Generate the collection"""
+    args = parse_args(argv)
+
+    start = time.perf_counter()
+    metadata = generate_collection(args.output, args.count, args.seed, args.size, args.quality, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Generated {len(metadata)} images in {elapsed:.1f}s")
+    print(f"✓ Saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
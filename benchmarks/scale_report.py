@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Run the collection tooling against synthetic collections of increasing size
+and report wall time and peak memory for each tool.
+
+Run with: python3 benchmarks/scale_report.py --counts 10000 100000 --workdir /tmp/scale
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import generate_collection
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+def tool_commands(workers):
+    """Commands to time, run from inside each synthetic collection"""
+    return {
+        'analyze_colors': [sys.executable, str(REPO_DIR / "scripts" / "analyze_colors.py"),
+                           '--workers', str(workers)],
+        'search_index': [sys.executable, str(REPO_DIR / "scripts" / "search_index.py")],
+        'test_metadata_integrity': [sys.executable, str(REPO_DIR / "tests" / "test_metadata_integrity.py")],
+        'test_search': ['node', str(REPO_DIR / "tests" / "test_search.js")],
+        # What the gallery does on load: download and parse the metadata
+        'gallery_load': ['node', '-e', "JSON.parse(require('fs').readFileSync('images_metadata.json', 'utf8'))"],
+    }
+
+def run_measured(command, cwd):
+    """Run `command`, returning wall time, peak RSS and exit code of that child"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+    return {'seconds': elapsed, 'peak_rss_mb': peak_rss / (1024 * 1024), 'exit_code': proc.returncode}
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Time the tooling on synthetic collections")
+    parser.add_argument('--counts', type=int, nargs='+', default=[10000, 100000],
+                        help="collection sizes (default: 10000 100000)")
+    parser.add_argument('--workdir', required=True, help="where synthetic collections are generated")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=128, help="synthetic image edge in pixels (default: 128)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="workers for generation and analyze_colors")
+    parser.add_argument('--tools', nargs='*', help="only run these tools")
+    parser.add_argument('--json', metavar='PATH', help="write the report as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Generate collections and time each tool"""
+    args = parse_args(argv)
+    commands = tool_commands(args.workers)
+    if args.tools:
+        commands = {name: command for name, command in commands.items() if name in args.tools}
+
+    report = {'seed': args.seed, 'size': args.size, 'workers': args.workers, 'collections': {}}
+
+    for count in args.counts:
+        collection = Path(args.workdir) / f"synthetic-{count}-seed{args.seed}"
+
+        if not (collection / "images_metadata.json").exists():
+            print(f"Generating {count} images in {collection}...")
+            start = time.perf_counter()
+            generate_collection.generate_collection(collection, count, args.seed, args.size, workers=args.workers)
+            print(f"  ✓ {time.perf_counter() - start:.1f}s")
+
+        metadata_bytes = (collection / "images_metadata.json").stat().st_size
+        results = {'metadata_mb': metadata_bytes / (1024 * 1024), 'tools': {}}
+
+        print(f"\n{count} images ({results['metadata_mb']:.1f} MB metadata):")
+        for name, command in commands.items():
+            result = run_measured(command, collection)
+            results['tools'][name] = result
+            status = "✓" if result['exit_code'] == 0 else f"exit {result['exit_code']}"
+            print(f"  {name:<25} {result['seconds']:>9.2f}s {result['peak_rss_mb']:>9.1f} MB  {status}")
+
+        report['collections'][str(count)] = results
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Saved report to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,12 @@ echo ""
 python3 scripts/integrate_new_image.py
 
 if [ $? -eq 0 ]; then
+    echo ""
+    echo "🗂  Rebuilding indexes..."
+    python3 scripts/search_index.py
+    python3 scripts/palette_index.py build
+    python3 scripts/image_hashes.py build
+
     echo ""
     echo "✅ Integration complete!"
     echo ""
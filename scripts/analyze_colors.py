@@ -3,15 +3,35 @@
 Analyze actual colors in images and update metadata
 """
 
-import json
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from PIL import Image
 import colorsys
 from collections import Counter
 
+from color_names import get_color_name, load_palette, palette_checksum
+from content_cache import CACHE_DIR, ContentCache
+from metadata_io import load_metadata, save_metadata
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; fall back to the reference backend
+    np = None
+
 # Paths
 IMAGE_DIR = Path("editorial_feed_images")
 METADATA_FILE = Path("images_metadata.json")
+CACHE_FILE = CACHE_DIR / "analyzed_colors.json"
+
+# Bump when a change to the extraction would give different colors,
+# so cached results from older runs are discarded
+ALGORITHM_VERSION = "2"
+
+# Images are analyzed at this size
+THUMBNAIL_SIZE = (300, 300)
 
 def rgb_to_hex(rgb):
     """Convert RGB tuple to hex string"""
@@ -21,236 +41,277 @@ def color_distance(c1, c2):
     """Calculate euclidean distance between two RGB colors"""
     return sum((a - b) ** 2 for a, b in zip(c1, c2)) ** 0.5
 
-def get_color_name(rgb):
-    """Map RGB color to closest named color"""
-    color_names = {
-        # Reds
-        (220, 20, 60): 'crimson',
-        (255, 0, 0): 'red',
-        (178, 34, 34): 'firebrick',
-        (139, 0, 0): 'dark-red',
-        (205, 92, 92): 'indian-red',
-        (240, 128, 128): 'light-coral',
-        (233, 150, 122): 'dark-salmon',
-        (250, 128, 114): 'salmon',
-        (255, 99, 71): 'tomato',
-        (255, 69, 0): 'orange-red',
-        (255, 140, 0): 'dark-orange',
-        (255, 165, 0): 'orange',
-
-        # Pinks
-        (255, 192, 203): 'pink',
-        (255, 182, 193): 'light-pink',
-        (255, 105, 180): 'hot-pink',
-        (255, 20, 147): 'deep-pink',
-        (219, 112, 147): 'pale-violet-red',
-        (199, 21, 133): 'medium-violet-red',
-
-        # Purples
-        (128, 0, 128): 'purple',
-        (147, 112, 219): 'medium-purple',
-        (138, 43, 226): 'blue-violet',
-        (148, 0, 211): 'dark-violet',
-        (153, 50, 204): 'dark-orchid',
-        (186, 85, 211): 'medium-orchid',
-        (221, 160, 221): 'plum',
-        (216, 191, 216): 'thistle',
-        (230, 230, 250): 'lavender',
-        (238, 130, 238): 'violet',
-        (218, 112, 214): 'orchid',
-        (255, 0, 255): 'magenta',
-
-        # Blues
-        (0, 0, 255): 'blue',
-        (0, 0, 139): 'dark-blue',
-        (0, 0, 205): 'medium-blue',
-        (25, 25, 112): 'midnight-blue',
-        (0, 191, 255): 'deep-sky-blue',
-        (30, 144, 255): 'dodger-blue',
-        (100, 149, 237): 'cornflower-blue',
-        (135, 206, 235): 'sky-blue',
-        (135, 206, 250): 'light-sky-blue',
-        (70, 130, 180): 'steel-blue',
-        (176, 196, 222): 'light-steel-blue',
-        (173, 216, 230): 'light-blue',
-        (176, 224, 230): 'powder-blue',
-        (175, 238, 238): 'pale-turquoise',
-        (0, 206, 209): 'dark-turquoise',
-        (64, 224, 208): 'turquoise',
-        (72, 209, 204): 'medium-turquoise',
-        (0, 255, 255): 'cyan',
-        (224, 255, 255): 'light-cyan',
-        (95, 158, 160): 'cadet-blue',
-
-        # Teals/Aquas
-        (0, 128, 128): 'teal',
-        (32, 178, 170): 'light-sea-green',
-        (47, 79, 79): 'dark-slate-gray',
-        (102, 205, 170): 'medium-aquamarine',
-        (127, 255, 212): 'aquamarine',
-
-        # Greens
-        (0, 128, 0): 'green',
-        (0, 100, 0): 'dark-green',
-        (34, 139, 34): 'forest-green',
-        (0, 255, 0): 'lime',
-        (50, 205, 50): 'lime-green',
-        (144, 238, 144): 'light-green',
-        (152, 251, 152): 'pale-green',
-        (143, 188, 143): 'dark-sea-green',
-        (0, 250, 154): 'medium-spring-green',
-        (0, 255, 127): 'spring-green',
-        (46, 139, 87): 'sea-green',
-        (60, 179, 113): 'medium-sea-green',
-        (32, 178, 170): 'light-sea-green',
-        (152, 251, 152): 'pale-green',
-        (0, 255, 127): 'spring-green',
-        (124, 252, 0): 'lawn-green',
-        (127, 255, 0): 'chartreuse',
-        (173, 255, 47): 'green-yellow',
-        (154, 205, 50): 'yellow-green',
-        (85, 107, 47): 'dark-olive-green',
-        (107, 142, 35): 'olive-drab',
-        (128, 128, 0): 'olive',
-
-        # Yellows
-        (255, 255, 0): 'yellow',
-        (255, 255, 224): 'light-yellow',
-        (255, 250, 205): 'lemon-chiffon',
-        (250, 250, 210): 'light-goldenrod-yellow',
-        (255, 239, 213): 'papaya-whip',
-        (255, 228, 181): 'moccasin',
-        (255, 218, 185): 'peach-puff',
-        (238, 232, 170): 'pale-goldenrod',
-        (240, 230, 140): 'khaki',
-        (189, 183, 107): 'dark-khaki',
-        (255, 215, 0): 'gold',
-
-        # Browns
-        (210, 180, 140): 'tan',
-        (210, 105, 30): 'chocolate',
-        (205, 133, 63): 'peru',
-        (244, 164, 96): 'sandy-brown',
-        (222, 184, 135): 'burly-wood',
-        (160, 82, 45): 'sienna',
-        (139, 69, 19): 'saddle-brown',
-        (165, 42, 42): 'brown',
-        (128, 0, 0): 'maroon',
-
-        # Grays
-        (255, 255, 255): 'white',
-        (245, 245, 245): 'white-smoke',
-        (220, 220, 220): 'gainsboro',
-        (211, 211, 211): 'light-gray',
-        (192, 192, 192): 'silver',
-        (169, 169, 169): 'dark-gray',
-        (128, 128, 128): 'gray',
-        (105, 105, 105): 'dim-gray',
-        (119, 136, 153): 'light-slate-gray',
-        (112, 128, 144): 'slate-gray',
-        (47, 79, 79): 'dark-slate-gray',
-        (0, 0, 0): 'black',
+def filter_pixels(pixels):
+    """Drop near-white and near-black pixels (usually background/shadows)"""
+    filtered_pixels = []
+    for pixel in pixels:
+        r, g, b = pixel
+        # Skip if too light or too dark
+        if not (r > 240 and g > 240 and b > 240) and not (r < 15 and g < 15 and b < 15):
+            filtered_pixels.append(pixel)
+
+    if not filtered_pixels:
+        filtered_pixels = pixels
+
+    return filtered_pixels
+
+def count_colors(pixels, limit):
+    """Return the `limit` most common colors as (color, count) pairs"""
+    return Counter(pixels).most_common(limit)
+
+def group_similar_colors(most_common, num_colors):
+    """Greedily keep colors that are not within 40 of an already kept color"""
+    unique_colors = []
+    for color, count in most_common:
+        is_similar = False
+        for existing_color, _ in unique_colors:
+            if color_distance(color, existing_color) < 40:  # Similarity threshold
+                is_similar = True
+                break
+        if not is_similar:
+            unique_colors.append((color, count))
+        if len(unique_colors) >= num_colors:
+            break
+
+    return unique_colors
+
+def filter_pixels_np(arr):
+    """Vectorized filter_pixels over an (N, 3) uint8 pixel array"""
+    r, g, b = arr[:, 0], arr[:, 1], arr[:, 2]
+    too_light = (r > 240) & (g > 240) & (b > 240)
+    too_dark = (r < 15) & (g < 15) & (b < 15)
+    filtered = arr[~(too_light | too_dark)]
+
+    if len(filtered) == 0:
+        filtered = arr
+
+    return filtered
+
+def count_colors_np(arr, limit):
+    """Vectorized count_colors over an (N, 3) uint8 pixel array.
+
+    Colors are packed into one int32 per pixel and counted with np.unique.
+    Ties are broken by first occurrence, which is what Counter.most_common
+    does, so the result is identical to count_colors.
+    """
+    packed = (arr[:, 0].astype(np.int32) << 16) | (arr[:, 1].astype(np.int32) << 8) | arr[:, 2]
+    values, counts = np.unique(packed, return_counts=True)
+
+    if len(values) == 0 or limit <= 0:
+        return []
+
+    # Only colors at least as frequent as the limit-th one can make the cut,
+    # so first occurrences are only looked up for those candidates
+    kth = len(counts) - min(limit, len(counts))
+    cutoff = np.partition(counts, kth)[kth]
+    candidates = counts >= cutoff
+    values, counts = values[candidates], counts[candidates]
+
+    positions = np.flatnonzero(np.isin(packed, values))
+    _, first_index = np.unique(packed[positions], return_index=True)
+    first_index = positions[first_index]
+
+    order = np.lexsort((first_index, -counts))[:limit]
+
+    return [
+        (((int(v) >> 16) & 255, (int(v) >> 8) & 255, int(v) & 255), int(c))
+        for v, c in zip(values[order], counts[order])
+    ]
+
+def group_similar_colors_np(most_common, num_colors):
+    """group_similar_colors using a precomputed pairwise distance matrix"""
+    if not most_common:
+        return []
+
+    colors = np.array([color for color, _ in most_common], dtype=np.int32)
+    diff = colors[:, None, :] - colors[None, :, :]
+    # Compare squared distances so the < 40 threshold is exact in integers
+    similar = (diff ** 2).sum(axis=2) < 40 ** 2
+
+    kept = []
+    for i in range(len(most_common)):
+        if not similar[i, kept].any():
+            kept.append(i)
+        if len(kept) >= num_colors:
+            break
+
+    return [most_common[i] for i in kept]
+
+def palette_reference(img, num_colors):
+    """Pure Python palette extraction (Counter + greedy grouping)"""
+    pixels = filter_pixels(list(img.getdata()))
+    most_common = count_colors(pixels, num_colors * 3)
+    return group_similar_colors(most_common, num_colors)
+
+def palette_numpy(img, num_colors):
+    """NumPy palette extraction, same output as palette_reference"""
+    arr = np.asarray(img, dtype=np.uint8).reshape(-1, 3)
+    most_common = count_colors_np(filter_pixels_np(arr), num_colors * 3)
+    return group_similar_colors_np(most_common, num_colors)
+
+def palette_quantize(img, num_colors, method):
+    """Palette from Pillow's C quantizer (Image.quantize).
+
+    Pixel coverage per palette entry comes from the quantized image's
+    histogram, so counting happens in C and JPEG noise is averaged into
+    the palette entries instead of splitting counts across near-duplicates.
+    """
+    quantized = img.quantize(colors=num_colors * 3, method=method)
+    palette = quantized.getpalette()
+
+    entries = [
+        (tuple(palette[index * 3:index * 3 + 3]), count)
+        for index, count in enumerate(quantized.histogram())
+        if count
+    ]
+
+    # Same near-white/near-black filter as filter_pixels, applied to palette entries
+    filtered = [
+        (color, count) for color, count in entries
+        if not (min(color) > 240 or max(color) < 15)
+    ]
+    if not filtered:
+        filtered = entries
+
+    filtered.sort(key=lambda entry: entry[1], reverse=True)
+    return group_similar_colors(filtered, num_colors)
+
+# Palette backends: each takes an RGB thumbnail and returns (color, count) pairs.
+# 'reference' and 'numpy' give identical results; the quantizers do not.
+PALETTE_BACKENDS = {
+    'reference': palette_reference,
+    'fastoctree': partial(palette_quantize, method=Image.Quantize.FASTOCTREE),
+    'mediancut': partial(palette_quantize, method=Image.Quantize.MEDIANCUT),
+}
+if np is not None:
+    PALETTE_BACKENDS['numpy'] = palette_numpy
+
+DEFAULT_BACKEND = 'numpy' if np is not None else 'reference'
+
+def summarize_colors(unique_colors):
+    """Split grouped colors into dominant/accent hex lists and color names"""
+    # Calculate total pixels for percentage
+    total_pixels = sum(count for _, count in unique_colors)
+
+    # Separate dominant (>10%) and accent colors
+    dominant_colors = []
+    accent_colors = []
+    color_names = []
+
+    for color, count in unique_colors:
+        percentage = (count / total_pixels) * 100
+        hex_color = rgb_to_hex(color)
+        color_name = get_color_name(color)
+
+        if percentage > 10:
+            dominant_colors.append(hex_color)
+        else:
+            accent_colors.append(hex_color)
+
+        if color_name not in color_names:
+            color_names.append(color_name)
+
+    return {
+        'dominant': dominant_colors[:3],  # Top 3 dominant
+        'accent': accent_colors[:3],       # Top 3 accent
+        'named': color_names[:6]           # Top 6 color names
     }
 
-    # Find closest color name
-    min_distance = float('inf')
-    closest_name = 'gray'
+def load_thumbnail(image_path, size=THUMBNAIL_SIZE):
+    """Open an image as an RGB thumbnail no larger than `size`.
 
-    for color_rgb, name in color_names.items():
-        distance = color_distance(rgb, color_rgb)
-        if distance < min_distance:
-            min_distance = distance
-            closest_name = name
+    For JPEGs, draft() makes libjpeg decode at the smallest DCT scale
+    (1/2, 1/4 or 1/8) that still covers `size`, so most of the pixels we
+    would throw away are never decoded.
+    """
+    img = Image.open(image_path)
+    img.draft('RGB', size)
 
-    return closest_name
+    # Convert to RGB if needed
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
 
-def extract_colors(image_path, num_colors=5):
-    """Extract dominant colors from an image"""
-    try:
-        img = Image.open(image_path)
-
-        # Convert to RGB if needed
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-
-        # Resize for faster processing
-        img.thumbnail((300, 300))
-
-        # Get all pixels
-        pixels = list(img.getdata())
-
-        # Remove very light (near white) and very dark (near black) colors
-        # as they're often background/shadows
-        filtered_pixels = []
-        for pixel in pixels:
-            r, g, b = pixel
-            # Skip if too light or too dark
-            if not (r > 240 and g > 240 and b > 240) and not (r < 15 and g < 15 and b < 15):
-                filtered_pixels.append(pixel)
-
-        if not filtered_pixels:
-            filtered_pixels = pixels
-
-        # Count color frequencies
-        color_counts = Counter(filtered_pixels)
-
-        # Get most common colors
-        most_common = color_counts.most_common(num_colors * 3)
-
-        # Group similar colors together
-        unique_colors = []
-        for color, count in most_common:
-            is_similar = False
-            for existing_color, _ in unique_colors:
-                if color_distance(color, existing_color) < 40:  # Similarity threshold
-                    is_similar = True
-                    break
-            if not is_similar:
-                unique_colors.append((color, count))
-            if len(unique_colors) >= num_colors:
-                break
-
-        # Calculate total pixels for percentage
-        total_pixels = sum(count for _, count in unique_colors)
+    # Resize for faster processing
+    img.thumbnail(size)
 
-        # Separate dominant (>10%) and accent colors
-        dominant_colors = []
-        accent_colors = []
-        color_names = []
+    return img
 
-        for color, count in unique_colors:
-            percentage = (count / total_pixels) * 100
-            hex_color = rgb_to_hex(color)
-            color_name = get_color_name(color)
-
-            if percentage > 10:
-                dominant_colors.append(hex_color)
-            else:
-                accent_colors.append(hex_color)
+def extract_colors(image_path, num_colors=5, backend=DEFAULT_BACKEND):
+    """Extract dominant colors from an image"""
+    try:
+        img = load_thumbnail(image_path)
 
-            if color_name not in color_names:
-                color_names.append(color_name)
+        unique_colors = PALETTE_BACKENDS[backend](img, num_colors)
 
-        return {
-            'dominant': dominant_colors[:3],  # Top 3 dominant
-            'accent': accent_colors[:3],       # Top 3 accent
-            'named': color_names[:6]           # Top 6 color names
-        }
+        return summarize_colors(unique_colors)
 
     except Exception as e:
         print(f"Error processing {image_path}: {e}")
         return None
 
-def main():
+def analyze_file(image_path, backend=DEFAULT_BACKEND):
+    """Worker entry point: extract colors for one image path"""
+    return extract_colors(image_path, backend=backend)
+
+def analyze_files(image_paths, workers=1, executor='process', chunksize=None, backend=DEFAULT_BACKEND):
+    """Yield extract_colors results for `image_paths`, in input order.
+
+    With more than one worker the paths are sent to a process or thread pool
+    in chunks. Threads work well too because Pillow releases the GIL while
+    decoding.
+    """
+    worker = partial(analyze_file, backend=backend)
+
+    if workers <= 1:
+        yield from map(worker, image_paths)
+        return
+
+    if chunksize is None:
+        # A few chunks per worker keeps the pool busy without much IPC overhead
+        chunksize = max(1, len(image_paths) // (workers * 4))
+
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        yield from pool.map(worker, image_paths, chunksize=chunksize)
+
+def cache_version(backend=DEFAULT_BACKEND):
+    """Cache version: algorithm version, backend and the palette used for naming"""
+    # numpy is a faster implementation of reference, so they share results
+    algorithm = 'reference' if backend == 'numpy' else backend
+    return f"{ALGORITHM_VERSION}:{algorithm}:{palette_checksum(load_palette()):08x}"
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Analyze actual colors in images and update metadata")
+    parser.add_argument('--backend', choices=sorted(PALETTE_BACKENDS), default=DEFAULT_BACKEND,
+                        help=f"palette extraction backend (default: {DEFAULT_BACKEND})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of parallel workers (default: 1)")
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help="pool type used when --workers > 1 (default: process)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="images sent to a worker at a time (default: automatic)")
+    parser.add_argument('--progress', action='store_true',
+                        help="print a progress summary while analyzing")
+    parser.add_argument('--force', action='store_true',
+                        help="re-analyze every image, ignoring cached results")
+    parser.add_argument('--prune', action='store_true',
+                        help="remove cache entries for images that no longer exist")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main processing function"""
+    args = parse_args(argv)
+
     # Load existing metadata
-    with open(METADATA_FILE) as f:
-        metadata = json.load(f)
+    metadata = load_metadata(METADATA_FILE)
 
-    print(f"Analyzing colors for {len(metadata)} images...\n")
+    print(f"Analyzing colors for {len(metadata)} images with {args.workers} worker(s), "
+          f"{args.backend} backend...\n")
 
-    updated_count = 0
+    cache = ContentCache(CACHE_FILE, cache_version(args.backend))
 
+    items = []
     for i, item in enumerate(metadata, 1):
         image_path = IMAGE_DIR / item['newFilename']
 
@@ -258,11 +319,36 @@ def main():
             print(f"[{i}/{len(metadata)}] Skipping {item['newFilename']} - file not found")
             continue
 
-        print(f"[{i}/{len(metadata)}] Analyzing {item['newFilename']}")
+        items.append((item, image_path))
+
+    # Only new or modified images (or everything with --force) are decoded
+    colors_by_path = {}
+    pending = []
+    for _, image_path in items:
+        colors = None if args.force else cache.get(image_path)
+        if colors:
+            colors_by_path[image_path] = colors
+        else:
+            pending.append(image_path)
+
+    print(f"{len(items) - len(pending)} unchanged (cached), {len(pending)} to analyze\n")
 
-        # Extract colors
-        colors = extract_colors(image_path)
+    start = time.perf_counter()
+    report_every = max(1, len(pending) // 20)
 
+    results = analyze_files(pending, args.workers, args.executor, args.chunksize, args.backend)
+    for done, (image_path, colors) in enumerate(zip(pending, results), 1):
+        if colors:
+            colors_by_path[image_path] = colors
+            cache.put(image_path, colors)
+
+        if args.progress and (done % report_every == 0 or done == len(pending)):
+            elapsed = time.perf_counter() - start
+            print(f"[{done}/{len(pending)}] {done / elapsed:.1f} images/sec")
+
+    updated_count = 0
+    for item, image_path in items:
+        colors = colors_by_path.get(image_path)
         if colors:
             # Keep original conceptual tags
             item['tags']['analyzed_colors'] = colors
@@ -273,15 +359,18 @@ def main():
                     item['tags']['colors'].append(color_name)
 
             updated_count += 1
-            print(f"  Dominant: {colors['dominant']}")
-            print(f"  Named: {colors['named']}")
+
+    if args.prune:
+        removed = cache.prune(path for _, path in items)
+        print(f"✓ Pruned {removed} cache entries for deleted files")
+    cache.save()
 
     # Save updated metadata
-    with open(METADATA_FILE, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    changed = save_metadata(metadata, "analyze_colors", METADATA_FILE)
 
-    print(f"\n✓ Updated {updated_count} images with color analysis")
-    print(f"✓ Saved to {METADATA_FILE}")
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ Updated {updated_count} images with color analysis in {elapsed:.1f}s")
+    print(f"✓ Saved to {METADATA_FILE} ({changed} entries changed)")
 
 if __name__ == "__main__":
     main()
@@ -5,32 +5,101 @@ Fully automated validation and fixing of image metadata.
 2. Auto-flags mismatches
 3. Re-analyzes flagged images
 4. Updates JSON automatically
+
+Requests run concurrently (--concurrency, default 16) on one async client;
+results are printed and applied in metadata order regardless of which
+request finishes first. With --batch, each phase is instead sent as Message
+Batches (half the price, no rate limits; results usually within minutes,
+at most 24 hours), polled with backoff, and errored or expired requests
+are resubmitted.
+
+Parsed responses are cached (scripts/response_cache.py), so unchanged
+images with unchanged metadata are not sent again; --force ignores the cache.
+Images are downscaled before sending (scripts/image_payload.py; --max-edge,
+--jpeg-quality).
+
+With --combined, one request per image returns both the verdict and, for
+a mismatch, the corrected metadata, so flagged images are not sent twice.
+Replies that cannot be used fall back to the two-step flow.
+
+Usage:
+    python3 scripts/auto_validate_and_fix.py [--concurrency 16]
+    python3 scripts/auto_validate_and_fix.py --batch
+    python3 scripts/auto_validate_and_fix.py --combined
+    python3 scripts/auto_validate_and_fix.py --force
 """
 
+import argparse
+import asyncio
+import copy
 import json
-import base64
 from pathlib import Path
 import os
-from anthropic import Anthropic
+import re
+import sys
+from anthropic import AsyncAnthropic
 
-# Initialize client
-client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+from metadata_io import load_metadata, save_metadata
+import image_payload
+from image_payload import ImagePayloads, PayloadError, image_source
+import response_cache
+from response_cache import ResponseCache
 
 # Paths
 IMAGE_DIR = Path("editorial_feed_images")
 METADATA_FILE = Path("images_metadata.json")
-BACKUP_FILE = Path("images_metadata.backup.json")
+CACHE_FILE = response_cache.CACHE_FILE
+PAYLOAD_DIR = image_payload.PAYLOAD_DIR
+
+MODEL = "claude-sonnet-4-5-20250929"
+
+# Message Batches: seconds between status polls (doubling up to the max),
+# resubmissions of failed requests, and limits per submitted batch
+BATCH_POLL_INITIAL = 10
+BATCH_POLL_MAX = 300
+BATCH_RETRIES = 2
+BATCH_MAX_REQUESTS = 100_000
+BATCH_MAX_BYTES = 200 * 1024 * 1024
+
+# Downscaled image payloads; set by main(), None sends original files
+payloads = None
+
+def image_variant():
+    """Which version of the images is sent, for response cache keys"""
+    return payloads.variant if payloads else 'original'
+
+def image_request(image_path, prompt, max_tokens):
+    """messages.create() arguments for one image and a text prompt"""
+    return {
+        "model": MODEL,
+        "max_tokens": max_tokens,
+        "messages": [{
+            "role": "user",
+            "content": [{
+                "type": "image",
+                "source": image_source(image_path, payloads)
+            }, {
+                "type": "text",
+                "text": prompt
+            }]
+        }]
+    }
 
-def get_image_base64(image_path):
-    """Read image and convert to base64"""
-    with open(image_path, "rb") as f:
-        return base64.standard_b64encode(f.read()).decode("utf-8")
+def parse_json_response(message):
+    """JSON object from a reply, with or without a ``` fence"""
+    response_text = message.content[0].text
+    if "```json" in response_text:
+        json_str = response_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in response_text:
+        json_str = response_text.split("```")[1].split("```")[0].strip()
+    else:
+        json_str = response_text.strip()
 
-def validate_entry(image_path, current_title, current_description):
-    """Ask AI: does this title/description match the actual image?"""
-    image_data = get_image_base64(image_path)
+    return json.loads(json_str)
 
-    validation_prompt = f"""You are validating image metadata accuracy.
+def validation_prompt(current_title, current_description):
+    """Prompt asking whether the title/description match the image"""
+    return f"""You are validating image metadata accuracy.
 
 Current metadata:
 - Title: "{current_title}"
@@ -45,40 +114,7 @@ Respond with ONLY a JSON object:
   "actual_content": "brief description of what you actually see if inaccurate"
 }}"""
 
-    try:
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=512,
-            messages=[{
-                "role": "user",
-                "content": [{
-                    "type": "image",
-                    "source": {"type": "base64", "media_type": "image/jpeg", "data": image_data}
-                }, {
-                    "type": "text",
-                    "text": validation_prompt
-                }]
-            }]
-        )
-
-        response_text = message.content[0].text
-        if "```json" in response_text:
-            json_str = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_str = response_text.split("```")[1].split("```")[0].strip()
-        else:
-            json_str = response_text.strip()
-
-        return json.loads(json_str)
-    except Exception as e:
-        print(f"  ⚠ Validation error: {e}")
-        return {"accurate": True, "confidence": 0.5, "actual_content": ""}
-
-def reanalyze_image(image_path):
-    """Get accurate analysis of image content"""
-    image_data = get_image_base64(image_path)
-
-    prompt = """Look at this image and describe EXACTLY what you see. Be literal and accurate.
+REANALYSIS_PROMPT = """Look at this image and describe EXACTLY what you see. Be literal and accurate.
 
 Return ONLY valid JSON:
 {
@@ -89,65 +125,307 @@ Return ONLY valid JSON:
   "style": ["style1", "style2", "style3", "style4"]
 }"""
 
+def combined_prompt(current_title, current_description):
+    """Prompt asking for a verdict and, if inaccurate, corrected metadata"""
+    return f"""You are validating image metadata accuracy.
+
+Current metadata:
+- Title: "{current_title}"
+- Description: "{current_description}"
+
+Look at the image and answer: Does this metadata ACCURATELY describe what you actually see in the image?
+If it does not, also describe EXACTLY what you see. Be literal and accurate.
+
+Respond with ONLY a JSON object:
+{{
+  "accurate": true/false,
+  "confidence": 0.0-1.0,
+  "actual_content": "brief description of what you actually see if inaccurate",
+  "corrected": null if accurate, otherwise {{
+    "title": "Brief Title (2-4 words)",
+    "description": "Accurate 1-2 sentence description of what's in the image",
+    "conceptual": ["concept1", "concept2", "concept3", "concept4"],
+    "subject": ["object1", "object2", "object3", "object4"],
+    "style": ["style1", "style2", "style3", "style4"]
+  }}
+}}"""
+
+# Room for the verdict plus a full re-analysis
+COMBINED_MAX_TOKENS = 1024
+
+# Returned when validation fails, so the entry is left alone
+VALIDATION_FALLBACK = {"accurate": True, "confidence": 0.5, "actual_content": ""}
+
+# Replies are checked before they are used or cached: each check returns
+# the reply or raises ValueError, which is reported as a request error
+UNUSABLE_REPLY = (json.JSONDecodeError, KeyError, ValueError)
+
+def is_analysis(analysis):
+    """Whether `analysis` has every field a re-analysis returns"""
+    return (isinstance(analysis, dict) and
+            all(isinstance(analysis.get(key), str) for key in ('title', 'description')) and
+            all(isinstance(analysis.get(key), list) for key in ('conceptual', 'subject', 'style')))
+
+def checked_analysis(result):
+    """A re-analysis reply with every field"""
+    if not is_analysis(result):
+        raise ValueError("re-analysis reply is missing title, description or tags")
+    return result
+
+def checked_verdict(result):
+    """A validation reply with an accuracy verdict and confidence"""
+    if not (isinstance(result, dict) and isinstance(result.get('accurate'), bool) and
+            isinstance(result.get('confidence'), (int, float))):
+        raise ValueError("no accuracy verdict in reply")
+    return result
+
+def combined_verdict(result):
+    """
+    Validation from a combined reply. Raises ValueError without a usable
+    verdict; a missing or malformed correction is dropped, so the entry is
+    re-analyzed instead.
+    """
+    checked_verdict(result)
+    if result['accurate'] or not is_analysis(result.get('corrected')):
+        result.pop('corrected', None)
+    return result
+
+def cached(cache, image_path, prompt, max_tokens, check):
+    """Cached parsed response for a request that passes `check`, or None"""
+    return cache.get(image_path, prompt, MODEL, max_tokens, image_variant(), check) if cache else None
+
+def store(cache, image_path, prompt, max_tokens, value):
+    """Cache a parsed response (no-op without a cache)"""
+    if cache:
+        cache.put(image_path, prompt, MODEL, max_tokens, value, image_variant())
+
+async def request_json(async_client, image_path, prompt, max_tokens, check, cache=None):
+    """
+    Parsed JSON reply to an image and prompt that passes `check`, from the
+    cache if it has one; only checked replies are cached
+    """
+    result = cached(cache, image_path, prompt, max_tokens, check)
+    if result is None:
+        request = await asyncio.to_thread(image_request, image_path, prompt, max_tokens)
+        message = await async_client.messages.create(**request)
+        result = check(parse_json_response(message))
+        store(cache, image_path, prompt, max_tokens, result)
+    return result
+
+async def validate_entry(async_client, image_path, current_title, current_description, cache=None,
+                         combined=False):
+    """Ask AI: does this title/description match the actual image? Returns (validation, error message or None)"""
+    if combined:
+        try:
+            prompt = combined_prompt(current_title, current_description)
+            return await request_json(
+                async_client, image_path, prompt, COMBINED_MAX_TOKENS, combined_verdict, cache), None
+        except (OSError, PayloadError) as e:
+            # The image cannot be sent, so two steps would fail the same way
+            return dict(VALIDATION_FALLBACK), str(e)
+        except UNUSABLE_REPLY as e:
+            # Fall back to validation, then re-analysis if flagged
+            print(f"  ↩ {Path(image_path).name}: combined reply unusable ({e}); validating separately",
+                  file=sys.stderr)
+        except Exception as e:
+            return dict(VALIDATION_FALLBACK), str(e)
+
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=1024,
-            messages=[{
-                "role": "user",
-                "content": [{
-                    "type": "image",
-                    "source": {"type": "base64", "media_type": "image/jpeg", "data": image_data}
-                }, {
-                    "type": "text",
-                    "text": prompt
-                }]
-            }]
-        )
+        prompt = validation_prompt(current_title, current_description)
+        return await request_json(async_client, image_path, prompt, 512, checked_verdict, cache), None
+    except Exception as e:
+        return dict(VALIDATION_FALLBACK), str(e)
 
-        response_text = message.content[0].text
-        if "```json" in response_text:
-            json_str = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_str = response_text.split("```")[1].split("```")[0].strip()
+async def reanalyze_image(async_client, image_path, cache=None):
+    """Get accurate analysis of image content; returns (analysis or None, error message or None)"""
+    try:
+        return await request_json(async_client, image_path, REANALYSIS_PROMPT, 1024, checked_analysis, cache), None
+    except Exception as e:
+        return None, str(e)
+
+async def run_ordered(calls, concurrency, on_result):
+    """
+    Await `calls` (zero-argument coroutine functions) with at most
+    `concurrency` running, calling on_result(index, result) in input order
+    as soon as each result and all earlier ones are ready.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def limited(call):
+        async with semaphore:
+            return await call()
+
+    tasks = [asyncio.create_task(limited(call)) for call in calls]
+    results = []
+    try:
+        for index, task in enumerate(tasks):
+            result = await task
+            on_result(index, result)
+            results.append(result)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return results
+
+def batch_custom_id(phase, filename, taken):
+    """A custom_id ([A-Za-z0-9_-]{1,64}) for `filename`, unique within `taken`"""
+    base = f"{phase}-{re.sub(r'[^A-Za-z0-9_-]', '_', Path(filename).stem)}"[:56]
+    custom_id, n = base, 1
+    while custom_id in taken:
+        n += 1
+        custom_id = f"{base}-{n}"
+    return custom_id
+
+def batch_chunks(jobs, build, failed):
+    """
+    Build params for {custom_id: job} with build(job), one request at a
+    time, and yield {custom_id: params} submissions within the batch size
+    limits, so only one submission's payloads are held at once. Requests
+    that cannot be built (e.g. an unreadable image) are left out and
+    recorded as failed[custom_id] = error message.
+    """
+    chunk, size = {}, 0
+    for custom_id, job in jobs.items():
+        try:
+            params = build(job)
+        except (OSError, ValueError) as e:
+            failed[custom_id] = str(e)
+            continue
+        request_size = len(json.dumps(params)) + len(custom_id) + 64
+        if chunk and (len(chunk) >= BATCH_MAX_REQUESTS or size + request_size > BATCH_MAX_BYTES):
+            yield chunk
+            chunk, size = {}, 0
+        chunk[custom_id] = params
+        size += request_size
+    if chunk:
+        yield chunk
+
+async def wait_for_batch(async_client, batch_id):
+    """Poll a batch until it has ended, backing off between polls"""
+    delay = BATCH_POLL_INITIAL
+    while True:
+        batch = await async_client.messages.batches.retrieve(batch_id)
+        if batch.processing_status == 'ended':
+            return batch
+        counts = batch.request_counts
+        print(f"  ⏳ {batch_id}: {counts.processing} processing, next check in {delay:g}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, BATCH_POLL_MAX)
+
+def batch_error(result):
+    """(message, retryable) for a request that did not succeed"""
+    if result.type == 'errored':
+        error = result.error.error
+        return f"{error.type}: {error.message}", error.type != 'invalid_request_error'
+    return f"request {result.type}", True
+
+async def run_batch_once(async_client, jobs, build):
+    """Submit {custom_id: job} (params from build(job)), wait, and return {custom_id: (message, error, retryable)}"""
+    batches, failed = [], {}
+    for chunk in batch_chunks(jobs, build, failed):
+        batch = await async_client.messages.batches.create(
+            requests=[{'custom_id': custom_id, 'params': params} for custom_id, params in chunk.items()])
+        print(f"  📦 Submitted batch {batch.id} ({len(chunk)} requests)")
+        batches.append(batch.id)
+        # Release the payloads before the next chunk is built
+        chunk.clear()
+
+    # Requests that could not be built would fail the same way again
+    outcomes = {custom_id: (None, error, False) for custom_id, error in failed.items()}
+    for batch in await asyncio.gather(*(wait_for_batch(async_client, batch_id) for batch_id in batches)):
+        async for item in await async_client.messages.batches.results(batch.id):
+            if item.custom_id not in jobs:
+                continue
+            if item.result.type == 'succeeded':
+                outcomes[item.custom_id] = (item.result.message, None, False)
+            else:
+                outcomes[item.custom_id] = (None, *batch_error(item.result))
+    return outcomes
+
+async def run_batch(async_client, jobs, build):
+    """
+    Send {custom_id: job} as Message Batches, with request params from
+    build(job); returns {custom_id: (message or None, error message or
+    None)}. Errored, expired and missing results are resubmitted (rebuilt)
+    up to BATCH_RETRIES times.
+    """
+    results = {}
+    pending = dict(jobs)
+    for attempt in range(BATCH_RETRIES + 1):
+        if attempt:
+            print(f"  🔁 Resubmitting {len(pending)} failed requests (retry {attempt}/{BATCH_RETRIES})")
+        outcomes = await run_batch_once(async_client, pending, build)
+        retry = {}
+        for custom_id, job in pending.items():
+            message, error, retryable = outcomes.get(custom_id, (None, "no result returned", True))
+            results[custom_id] = (message, error)
+            if retryable:
+                retry[custom_id] = job
+        pending = retry
+        if not pending:
+            break
+    return results
+
+async def request_json_batch(async_client, jobs, check, fallback, cache=None, unusable=None):
+    """
+    Parsed replies to [(custom_id, image_path, prompt, max_tokens)] via
+    Message Batches, skipping cached ones; returns {custom_id: (parsed JSON
+    or fallback, error message or None)}. `check` is as for request_json.
+    custom_ids whose reply could not be parsed or checked (as opposed to
+    failed requests) are added to the `unusable` set.
+    """
+    results, sent = {}, {}
+    for custom_id, image_path, prompt, max_tokens in jobs:
+        result = cached(cache, image_path, prompt, max_tokens, check)
+        if result is not None:
+            results[custom_id] = (result, None)
         else:
-            json_str = response_text.strip()
+            sent[custom_id] = (image_path, prompt, max_tokens)
 
-        return json.loads(json_str)
-    except Exception as e:
-        print(f"  ✗ Re-analysis error: {e}")
-        return None
+    # Payloads are built per submitted chunk, not for the whole collection up front
+    replies = await run_batch(async_client, sent, lambda job: image_request(*job)) if sent else {}
+    for custom_id, (message, error) in replies.items():
+        if error:
+            results[custom_id] = (copy.deepcopy(fallback), error)
+            continue
+        try:
+            result = check(parse_json_response(message))
+        except UNUSABLE_REPLY as e:
+            results[custom_id] = (copy.deepcopy(fallback), str(e))
+            if unusable is not None:
+                unusable.add(custom_id)
+            continue
+        store(cache, *sent[custom_id], result)
+        results[custom_id] = (result, None)
+    return results
 
-def main():
-    """Main validation and fixing pipeline"""
-    print("=" * 80)
-    print("AUTOMATED IMAGE METADATA VALIDATION & FIX")
-    print("=" * 80)
+def make_async_client(base_url=None):
+    """One AsyncAnthropic client, and so one pooled HTTP client, for a whole run"""
+    return AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"), base_url=base_url)
 
-    # Load metadata
-    with open(METADATA_FILE) as f:
-        metadata = json.load(f)
+async def skipped():
+    """Placeholder result for entries that are not sent"""
+    return None
 
-    print(f"\n📊 Total entries: {len(metadata)}")
-    print(f"🔍 Validating all images...\n")
+async def corrected(validation):
+    """Re-analysis result taken from a combined reply"""
+    return validation['corrected'], None
 
-    # Phase 1: Validate all entries
+async def validate_all(async_client, metadata, concurrency, batch=False, cache=None, combined=False):
+    """Validate every entry; returns [(index, entry, validation)] for mismatches, in order"""
     flagged = []
+    entries = [(i, entry, IMAGE_DIR / entry['newFilename']) for i, entry in enumerate(metadata, 1)]
 
-    for i, entry in enumerate(metadata, 1):
-        image_path = IMAGE_DIR / entry['newFilename']
-
-        if not image_path.exists():
+    def report(index, result):
+        i, entry, _ = entries[index]
+        if result is None:
             print(f"[{i}/{len(metadata)}] ⚠ Missing file: {entry['newFilename']}")
-            continue
+            return
 
+        validation, error = result
         print(f"[{i}/{len(metadata)}] Validating: {entry['newFilename']}", end=" ")
-
-        validation = validate_entry(
-            image_path,
-            entry['title'],
-            entry['description']
-        )
+        if error:
+            print(f"\n  ⚠ Validation error: {error}")
 
         if not validation['accurate']:
             print(f"❌ MISMATCH (confidence: {validation['confidence']:.2f})")
@@ -157,31 +435,59 @@ def main():
         else:
             print(f"✓ OK (confidence: {validation['confidence']:.2f})")
 
-    # Summary of validation
-    print("\n" + "=" * 80)
-    print(f"📋 Validation complete:")
-    print(f"   ✓ Accurate: {len(metadata) - len(flagged)}")
-    print(f"   ❌ Mismatches found: {len(flagged)}")
-
-    if not flagged:
-        print("\n✨ All metadata is accurate! No fixes needed.")
-        return
-
-    # Phase 2: Re-analyze flagged entries
-    print("\n" + "=" * 80)
-    print(f"🔧 Re-analyzing {len(flagged)} flagged entries...\n")
-
-    # Create backup
-    import shutil
-    shutil.copy2(METADATA_FILE, BACKUP_FILE)
-    print(f"💾 Backup created: {BACKUP_FILE}\n")
-
-    fixed_count = 0
-    for i, entry, validation in flagged:
-        image_path = IMAGE_DIR / entry['newFilename']
-        print(f"Re-analyzing: {entry['newFilename']}")
-
-        analysis = reanalyze_image(image_path)
+    if batch:
+        # Results come back by custom_id, mapped to newFilename
+        jobs, filenames, taken = [], {}, set()
+        for _, entry, image_path in entries:
+            if image_path.exists():
+                custom_id = batch_custom_id('validate', entry['newFilename'], taken)
+                taken.add(custom_id)
+                filenames[entry['newFilename']] = custom_id
+                jobs.append((custom_id, image_path, entry))
+
+        def validation_jobs(jobs):
+            return [(custom_id, image_path, validation_prompt(entry['title'], entry['description']), 512)
+                    for custom_id, image_path, entry in jobs]
+
+        if combined:
+            unusable = set()
+            results = await request_json_batch(async_client, [
+                (custom_id, image_path, combined_prompt(entry['title'], entry['description']), COMBINED_MAX_TOKENS)
+                for custom_id, image_path, entry in jobs], combined_verdict, VALIDATION_FALLBACK, cache, unusable)
+            # Unusable replies fall back to the two-step flow; failed requests are reported as errors
+            jobs = [job for job in jobs if job[0] in unusable]
+            if jobs:
+                print(f"  ↩ {len(jobs)} combined replies unusable; validating them separately", file=sys.stderr)
+                results.update(await request_json_batch(
+                    async_client, validation_jobs(jobs), checked_verdict, VALIDATION_FALLBACK, cache))
+        else:
+            results = await request_json_batch(
+                async_client, validation_jobs(jobs), checked_verdict, VALIDATION_FALLBACK, cache)
+        for index, (_, entry, _) in enumerate(entries):
+            custom_id = filenames.get(entry['newFilename'])
+            report(index, results[custom_id] if custom_id else None)
+        return flagged
+
+    calls = [
+        (lambda entry=entry, image_path=image_path:
+            validate_entry(async_client, image_path, entry['title'], entry['description'], cache, combined))
+        if image_path.exists() else skipped
+        for _, entry, image_path in entries
+    ]
+    await run_ordered(calls, concurrency, report)
+    return flagged
+
+async def reanalyze_all(async_client, flagged, concurrency, batch=False, cache=None):
+    """Re-analyze flagged entries and update them in place; returns how many were fixed"""
+    fixed = []
+
+    def apply(index, result):
+        _, entry, validation = flagged[index]
+        analysis, error = result
+        if 'corrected' in validation:
+            print(f"Correcting: {entry['newFilename']}")
+        else:
+            print(f"Re-analyzing: {entry['newFilename']}")
 
         if analysis:
             # Update entry
@@ -193,20 +499,120 @@ def main():
             # Keep existing colors and analyzed_colors
 
             print(f"  ✓ Updated: {analysis['title']}")
-            fixed_count += 1
+            fixed.append(entry)
         else:
+            if error:
+                print(f"  ✗ Re-analysis error: {error}")
             print(f"  ✗ Failed to re-analyze")
 
-    # Save updated metadata
-    with open(METADATA_FILE, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    if batch:
+        # Entries corrected by a combined reply are not sent again
+        custom_ids, taken = [], set()
+        for _, entry, validation in flagged:
+            custom_ids.append(None if 'corrected' in validation else
+                              batch_custom_id('reanalyze', entry['newFilename'], taken))
+            taken.add(custom_ids[-1])
+        jobs = [(custom_id, IMAGE_DIR / entry['newFilename'], REANALYSIS_PROMPT, 1024)
+                for custom_id, (_, entry, _) in zip(custom_ids, flagged) if custom_id]
+        results = await request_json_batch(async_client, jobs, checked_analysis, None, cache) if jobs else {}
+        for index, (custom_id, (_, _, validation)) in enumerate(zip(custom_ids, flagged)):
+            apply(index, results[custom_id] if custom_id else (validation['corrected'], None))
+        return len(fixed)
+
+    calls = [
+        (lambda validation=validation: corrected(validation)) if 'corrected' in validation else
+        (lambda entry=entry: reanalyze_image(async_client, IMAGE_DIR / entry['newFilename'], cache))
+        for _, entry, validation in flagged
+    ]
+    await run_ordered(calls, concurrency, apply)
+    return len(fixed)
+
+async def validate_and_fix(metadata, concurrency, base_url=None, batch=False, cache=None, combined=False):
+    """Both phases on one client; returns (flagged, fixed_count)"""
+    async with make_async_client(base_url) as async_client:
+        flagged = await validate_all(async_client, metadata, concurrency, batch, cache, combined)
+
+        # Summary of validation
+        print("\n" + "=" * 80)
+        print(f"📋 Validation complete:")
+        print(f"   ✓ Accurate: {len(metadata) - len(flagged)}")
+        print(f"   ❌ Mismatches found: {len(flagged)}")
+
+        if not flagged:
+            return flagged, 0
+
+        # Phase 2: Re-analyze flagged entries
+        print("\n" + "=" * 80)
+        corrections = sum('corrected' in validation for _, _, validation in flagged)
+        if corrections:
+            print(f"🔧 Fixing {len(flagged)} flagged entries "
+                  f"({corrections} corrected in the same request, {len(flagged) - corrections} to re-analyze)...\n")
+        else:
+            print(f"🔧 Re-analyzing {len(flagged)} flagged entries...\n")
+
+        fixed_count = await reanalyze_all(async_client, flagged, concurrency, batch, cache)
+        return flagged, fixed_count
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Validate image metadata with Claude and fix mismatches")
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="API requests in flight at once (default: 16; 1 = one at a time)")
+    parser.add_argument('--batch', action='store_true',
+                        help="send each phase as Message Batches (half price; slower to complete)")
+    parser.add_argument('--combined', action='store_true',
+                        help="validate and correct in one request per image")
+    parser.add_argument('--force', action='store_true',
+                        help="send every request, ignoring cached responses")
+    image_payload.add_arguments(parser)
+    parser.add_argument('--base-url', default=None,
+                        help="API base URL (default: ANTHROPIC_BASE_URL or the public API)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main validation and fixing pipeline"""
+    global payloads
+    args = parse_args(argv)
+    payloads = ImagePayloads(PAYLOAD_DIR, args.max_edge, args.jpeg_quality)
+
+    print("=" * 80)
+    print("AUTOMATED IMAGE METADATA VALIDATION & FIX")
+    print("=" * 80)
+
+    # Load metadata
+    metadata = load_metadata(METADATA_FILE)
+
+    print(f"\n📊 Total entries: {len(metadata)}")
+    if args.batch:
+        print(f"🔍 Validating all images (Message Batches)...\n")
+    else:
+        print(f"🔍 Validating all images ({args.concurrency} at a time)...\n")
+
+    cache = ResponseCache(CACHE_FILE, force=args.force)
+    try:
+        flagged, fixed_count = asyncio.run(
+            validate_and_fix(metadata, args.concurrency, args.base_url, args.batch, cache, args.combined))
+    finally:
+        # Keep responses already paid for, even if the run is interrupted
+        cache.save()
+        payloads.save()
+    print(f"💾 Responses: {cache.hits} from cache, {cache.misses} requested")
+    if payloads.report():
+        print(payloads.report())
+
+    if not flagged:
+        print("\n✨ All metadata is accurate! No fixes needed.")
+        return
+
+    # Save updated metadata (journaled; undo with scripts/metadata_io.py revert)
+    save_metadata(metadata, f"auto_validate_and_fix: {fixed_count} entries fixed", METADATA_FILE)
 
     print("\n" + "=" * 80)
     print("✅ COMPLETE")
     print("=" * 80)
     print(f"✓ Fixed {fixed_count}/{len(flagged)} entries")
     print(f"✓ Updated: {METADATA_FILE}")
-    print(f"✓ Backup: {BACKUP_FILE}")
+    print("✓ Undo with: python3 scripts/metadata_io.py revert")
     print("\n🔄 Refresh your browser to see corrected labels.")
 
 if __name__ == "__main__":
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Build resized derivatives of every image for the gallery.
+
+Each image is written at DERIVATIVE_WIDTHS in WebP and progressive JPEG to
+derivatives/ (git-ignored, rebuilt on demand). Files are named after the
+source's content hash, so unchanged images are skipped on the next run, and
+renamed images reuse their existing files. The records (path, width, height,
+format, bytes) are written to derivatives/index.json by newFilename, next to
+the files they describe, so the gallery can pick the smallest file that
+covers a card. Without that file (e.g. a fresh clone) it loads the originals.
+
+Usage:
+    python3 scripts/build_derivatives.py [--workers 4] [--force] [--prune]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from PIL import Image
+
+from content_cache import CACHE_DIR, ContentCache
+from metadata_io import load_metadata, save_metadata
+
+# Paths
+IMAGE_DIR = Path("editorial_feed_images")
+METADATA_FILE = Path("images_metadata.json")
+DERIVATIVE_DIR = Path("derivatives")
+INDEX_FILE = DERIVATIVE_DIR / "index.json"
+CACHE_FILE = CACHE_DIR / "derivatives.json"
+
+DERIVATIVE_WIDTHS = [240, 480, 960]
+
+# Pillow save() options per output format
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'progressive': True, 'optimize': True},
+}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+# Bump when sizes or encoder settings change, so every derivative is rebuilt
+DERIVATIVE_VERSION = "1"
+
+def cache_version():
+    """Cache version: derivative version, widths and formats"""
+    return f"{DERIVATIVE_VERSION}:{','.join(map(str, DERIVATIVE_WIDTHS))}:{','.join(FORMATS)}"
+
+def make_derivatives(image_path, sha256, output_dir=DERIVATIVE_DIR):
+    """Write every derivative of one image; return their records, or None on error"""
+    try:
+        img = Image.open(image_path)
+        img.draft('RGB', (max(DERIVATIVE_WIDTHS), max(DERIVATIVE_WIDTHS)))
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        records = []
+        for width in DERIVATIVE_WIDTHS:
+            # Never upscale; the smallest derivative is still produced
+            if width > img.width and width != DERIVATIVE_WIDTHS[0]:
+                continue
+            width = min(width, img.width)
+            height = round(img.height * width / img.width)
+            resized = img.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+            for fmt, options in FORMATS.items():
+                path = Path(output_dir) / f"{sha256[:16]}-{width}.{EXTENSIONS[fmt]}"
+                resized.save(path, **options)
+                records.append({
+                    'path': path.as_posix(),
+                    'width': width,
+                    'height': height,
+                    'format': fmt,
+                    'bytes': path.stat().st_size,
+                })
+        return records
+
+    except Exception as e:
+        print(f"Error processing {image_path}: {e}")
+        return None
+
+def build_files(jobs, workers=1, executor='process', output_dir=DERIVATIVE_DIR):
+    """Yield make_derivatives results for (image_path, sha256) jobs, in order"""
+    worker = partial(make_derivatives, output_dir=output_dir)
+    paths = [path for path, _ in jobs]
+    digests = [sha256 for _, sha256 in jobs]
+
+    if workers <= 1:
+        yield from map(worker, paths, digests)
+        return
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        yield from pool.map(worker, paths, digests, chunksize=chunksize)
+
+def is_current(records):
+    """Whether every derivative file in `records` still exists unchanged"""
+    for record in records:
+        path = Path(record['path'])
+        if not path.exists() or path.stat().st_size != record['bytes']:
+            return False
+    return True
+
+def build(image_paths, workers=1, executor='process', force=False,
+          output_dir=DERIVATIVE_DIR, cache_file=CACHE_FILE):
+    """Build derivatives for `image_paths`; return ({path: records}, number built)"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cache = ContentCache(cache_file, cache_version())
+
+    records_by_path = {}
+    pending = []
+    for image_path in image_paths:
+        records = None if force else cache.get(image_path)
+        if records and is_current(records):
+            records_by_path[image_path] = records
+        else:
+            pending.append((image_path, cache.digest(image_path)))
+
+    for (image_path, _), records in zip(pending, build_files(pending, workers, executor, output_dir)):
+        if records:
+            records_by_path[image_path] = records
+            cache.put(image_path, records)
+    cache.save()
+
+    return records_by_path, len(pending)
+
+def write_index(records_by_name, index_file=INDEX_FILE):
+    """Save {newFilename: records} for the gallery"""
+    with open(index_file, 'w') as f:
+        json.dump({'version': cache_version(), 'images': records_by_name}, f, indent=2)
+
+def prune(records_by_path, output_dir=DERIVATIVE_DIR, index_file=INDEX_FILE):
+    """Delete derivative files no current image refers to; return how many"""
+    live = {Path(record['path']).name for records in records_by_path.values() for record in records}
+    live.add(Path(index_file).name)
+    removed = 0
+    for path in Path(output_dir).iterdir():
+        if path.name not in live:
+            path.unlink()
+            removed += 1
+    return removed
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Build resized WebP/JPEG derivatives for the gallery")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of parallel workers (default: 1)")
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help="pool type used when --workers > 1 (default: process)")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild every derivative, ignoring cached results")
+    parser.add_argument('--prune', action='store_true',
+                        help="delete derivatives of images that changed or no longer exist")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Build derivatives and write their index"""
+    args = parse_args(argv)
+
+    metadata = load_metadata(METADATA_FILE)
+
+    items = [(item, IMAGE_DIR / item['newFilename']) for item in metadata]
+    items = [(item, path) for item, path in items if path.exists()]
+
+    print(f"Building derivatives for {len(items)} images with {args.workers} worker(s)...\n")
+
+    start = time.perf_counter()
+    records_by_path, built = build([path for _, path in items], args.workers, args.executor, args.force,
+                                   DERIVATIVE_DIR, CACHE_FILE)
+    elapsed = time.perf_counter() - start
+
+    write_index({item['newFilename']: records_by_path[path] for item, path in items if path in records_by_path},
+                INDEX_FILE)
+
+    # Records used to live in the metadata, which is tracked while the files are not
+    for item in metadata:
+        item.pop('derivatives', None)
+    save_metadata(metadata, "build_derivatives", METADATA_FILE)
+
+    if args.prune:
+        print(f"✓ Pruned {prune(records_by_path, DERIVATIVE_DIR, INDEX_FILE)} stale derivative files")
+
+    original_bytes = sum(path.stat().st_size for _, path in items)
+    smallest = {}
+    for records in records_by_path.values():
+        for record in records:
+            key = (record['format'], record['width'])
+            smallest[key] = smallest.get(key, 0) + record['bytes']
+
+    print(f"✓ Built {built} images ({len(items) - built} unchanged) in {elapsed:.1f}s")
+    print(f"  originals: {original_bytes / 1e6:.1f} MB")
+    for (fmt, width), total in sorted(smallest.items()):
+        print(f"  {fmt:<5} {width:>4}px: {total / 1e6:.1f} MB")
+    print(f"✓ Saved to {DERIVATIVE_DIR}/ (records in {INDEX_FILE})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Shared RGB -> color name lookup.
+
+The canonical palette lives in data/color_palette.json. From it we generate
+data/color_lookup.bin, a quantized 32x32x32 table that stores, for every RGB
+bin, the few palette colors that are closest to some color in the bin. Naming
+a color scans only that short list (usually one or two entries) instead of
+the whole palette, and gives exactly the same name as a full scan.
+
+Regenerate the table after editing the palette:
+    python3 scripts/color_names.py
+"""
+
+import json
+import struct
+import zlib
+from itertools import accumulate
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # numpy only speeds up building the table
+    np = None
+
+# Paths (relative to the repository, not the working directory)
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+PALETTE_FILE = DATA_DIR / "color_palette.json"
+LOOKUP_FILE = DATA_DIR / "color_lookup.bin"
+
+# Table layout: 16-byte header, one candidate count per RGB bin, then the
+# candidates' palette indices for every bin in turn
+LOOKUP_MAGIC = b"CLU2"
+LOOKUP_BITS = 5                      # bits kept per channel -> 32 bins
+LOOKUP_SHIFT = 8 - LOOKUP_BITS
+LOOKUP_BINS = 1 << LOOKUP_BITS
+LOOKUP_HEADER = struct.Struct("<4sB3xII")  # magic, bits, palette crc32, palette size
+
+def hex_to_rgb(hex_color):
+    """Convert hex string to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+def load_palette(path=PALETTE_FILE):
+    """Load the canonical palette as a list of (name, (r, g, b))"""
+    with open(path) as f:
+        data = json.load(f)
+    return [(c['name'], hex_to_rgb(c['hex'])) for c in data['colors']]
+
+def palette_checksum(palette):
+    """CRC32 of the palette, stored in the table header to detect stale tables"""
+    canonical = json.dumps([[name, list(rgb)] for name, rgb in palette])
+    return zlib.crc32(canonical.encode('utf-8'))
+
+def axis_distances(value):
+    """Squared (nearest, farthest) distance from `value` to each bin's channel range"""
+    size = 1 << LOOKUP_SHIFT
+    near, far = [], []
+    for low in range(0, 256, size):
+        high = low + size - 1
+        near.append(0 if low <= value <= high else min(abs(value - low), abs(value - high)) ** 2)
+        far.append(max(abs(value - low), abs(value - high)) ** 2)
+    return near, far
+
+def build_lookup(palette):
+    """Return the candidate counts and candidate lists of every RGB bin.
+
+    A palette color is a candidate for a bin when its distance to the
+    nearest color in the bin is no more than some palette color's distance
+    to the farthest one, so the closest palette color of any RGB value is
+    among the candidates of its bin. Bins are ordered r, g, b (b varies
+    fastest); candidates keep palette order, so ties still go to the
+    earlier palette entry.
+    """
+    # Per palette color and channel: distances to every bin along that axis
+    axes = [[axis_distances(rgb[channel]) for _, rgb in palette] for channel in range(3)]
+
+    if np is not None:
+        near = [np.array([a[0] for a in axis], dtype=np.int64) for axis in axes]
+        far = [np.array([a[1] for a in axis], dtype=np.int64) for axis in axes]
+        # (palette, r, g, b) distances from each color to the nearest and farthest point of each bin
+        nearest = near[0][:, :, None, None] + near[1][:, None, :, None] + near[2][:, None, None, :]
+        farthest = far[0][:, :, None, None] + far[1][:, None, :, None] + far[2][:, None, None, :]
+        candidates = (nearest <= farthest.min(axis=0)).reshape(len(palette), -1).T
+        counts = candidates.sum(axis=1).astype(np.uint8)
+        indices = np.nonzero(candidates)[1].astype(np.uint8)
+        return counts.tobytes(), indices.tobytes()
+
+    counts, indices = bytearray(), bytearray()
+    for r in range(LOOKUP_BINS):
+        for g in range(LOOKUP_BINS):
+            for b in range(LOOKUP_BINS):
+                bound = min(axes[0][i][1][r] + axes[1][i][1][g] + axes[2][i][1][b] for i in range(len(palette)))
+                bin_candidates = [i for i in range(len(palette))
+                                  if axes[0][i][0][r] + axes[1][i][0][g] + axes[2][i][0][b] <= bound]
+                counts.append(len(bin_candidates))
+                indices.extend(bin_candidates)
+    return bytes(counts), bytes(indices)
+
+def write_lookup(palette, path=LOOKUP_FILE):
+    """Build the lookup table for `palette` and save it to `path`"""
+    if len(palette) > 255:
+        raise ValueError(f"Palette has {len(palette)} colors, the table supports 255")
+
+    header = LOOKUP_HEADER.pack(LOOKUP_MAGIC, LOOKUP_BITS, palette_checksum(palette), len(palette))
+    counts, indices = build_lookup(palette)
+    with open(path, 'wb') as f:
+        f.write(header + counts + indices)
+
+def read_lookup(palette, path=LOOKUP_FILE):
+    """Read (counts, candidates) from `path`, or None if it is missing or stale"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    if len(data) < LOOKUP_HEADER.size + LOOKUP_BINS ** 3:
+        return None
+
+    magic, bits, checksum, size = LOOKUP_HEADER.unpack_from(data)
+    if (magic, bits, checksum, size) != (LOOKUP_MAGIC, LOOKUP_BITS, palette_checksum(palette), len(palette)):
+        return None
+
+    counts = data[LOOKUP_HEADER.size:LOOKUP_HEADER.size + LOOKUP_BINS ** 3]
+    indices = data[LOOKUP_HEADER.size + LOOKUP_BINS ** 3:]
+    if sum(counts) != len(indices):
+        return None
+    return counts, indices
+
+_palette = None
+_offsets = None
+_indices = None
+
+def _load():
+    """Load the palette and the lookup table once per process"""
+    global _palette, _offsets, _indices
+    palette = load_palette()
+    table = read_lookup(palette)
+    if table is None:
+        print(f"⚠ {LOOKUP_FILE.name} is missing or out of date, rebuilding in memory "
+              f"(run scripts/color_names.py to regenerate it)")
+        table = build_lookup(palette)
+    counts, _indices = table
+    _offsets = [0, *accumulate(counts)]
+    _palette = palette
+
+def get_color_name(rgb):
+    """Map RGB color to closest named color"""
+    if _palette is None:
+        _load()
+
+    r, g, b = rgb[0], rgb[1], rgb[2]
+    index = ((r >> LOOKUP_SHIFT) << (2 * LOOKUP_BITS)) | ((g >> LOOKUP_SHIFT) << LOOKUP_BITS) | (b >> LOOKUP_SHIFT)
+    start, end = _offsets[index], _offsets[index + 1]
+    if end - start == 1:
+        return _palette[_indices[start]][0]
+
+    # Exact nearest among the bin's candidates; ties go to the earlier palette entry
+    best, best_distance = None, None
+    for i in _indices[start:end]:
+        name, (pr, pg, pb) = _palette[i]
+        distance = (r - pr) ** 2 + (g - pg) ** 2 + (b - pb) ** 2
+        if best_distance is None or distance < best_distance:
+            best, best_distance = name, distance
+    return best
+
+def main():
+    """Regenerate the lookup table from the palette"""
+    palette = load_palette()
+    write_lookup(palette)
+    print(f"✓ Wrote {LOOKUP_FILE} ({len(palette)} colors, {LOOKUP_BINS}x{LOOKUP_BINS}x{LOOKUP_BINS} bins)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Persistent sidecar cache for per-image results, keyed by file content.
+
+Results are stored under the file's SHA-256 so renamed or copied images still
+hit the cache. Hashing is skipped when a file's size and mtime match what was
+recorded last time. The whole cache is dropped when the `version` string
+changes (e.g. after an algorithm change).
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_DIR = Path(".cache")
+CHUNK_SIZE = 1 << 20
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ContentCache:
+    def __init__(self, path, version):
+        self.path = Path(path)
+        self.version = version
+        self.files = {}     # str(path) -> {"size", "mtime_ns", "sha256"}
+        self.results = {}   # sha256 -> cached value
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        """Load the cache file, keeping file hashes even if results are stale"""
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Ignoring unreadable cache {self.path}: {e}")
+            return
+
+        self.files = data.get('files', {})
+        if data.get('version') == self.version:
+            self.results = data.get('results', {})
+
+    def digest(self, path):
+        """SHA-256 of `path`, reusing the recorded hash if size and mtime match"""
+        stat = os.stat(path)
+        record = self.files.get(str(path))
+
+        if record and record['size'] == stat.st_size and record['mtime_ns'] == stat.st_mtime_ns:
+            return record['sha256']
+
+        sha256 = file_sha256(path)
+        self.files[str(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        return sha256
+
+    def get(self, path):
+        """Cached value for `path`, or None if the content has not been seen"""
+        value = self.results.get(self.digest(path))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, path, value):
+        """Store `value` for the current content of `path`"""
+        self.results[self.digest(path)] = value
+
+    def prune(self, paths):
+        """Drop entries for files not in `paths`; return the number removed"""
+        keep = {str(path) for path in paths}
+        removed = [name for name in self.files if name not in keep]
+        for name in removed:
+            del self.files[name]
+
+        live = {record['sha256'] for record in self.files.values()}
+        self.results = {sha256: value for sha256, value in self.results.items() if sha256 in live}
+
+        return len(removed)
+
+    def save(self):
+        """Write the cache next to its final location, then swap it in"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.version, 'files': self.files, 'results': self.results}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Perceptual hashes for near-duplicate detection.
+
+Every image gets a 64-bit dHash (brightness gradient) and pHash (low DCT
+frequencies), stored in data/image_hashes.json keyed by filename. Similar
+images have hashes a small Hamming distance apart; a multi-index hash table
+answers "everything within distance k" without comparing against every image.
+By default both hashes must be within the distance: on these mostly smooth
+gradients either one alone also matches different pictures of a similar
+layout.
+
+Usage:
+    python3 scripts/image_hashes.py build [--workers 4] [--force]
+    python3 scripts/image_hashes.py clusters [-k 5] [--kind both]
+    python3 scripts/image_hashes.py query --image amber-gears-gradient.jpg [-k 10]
+    python3 scripts/image_hashes.py query --file path/to/new-image.jpg
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from color_names import DATA_DIR
+from content_cache import CACHE_DIR, ContentCache
+
+# Paths
+IMAGE_DIR = Path("editorial_feed_images")
+METADATA_FILE = Path("images_metadata.json")
+HASHES_FILE = DATA_DIR / "image_hashes.json"
+CACHE_FILE = CACHE_DIR / "image_hashes.json"
+
+# Bump when a change to the hashing would give different hashes
+HASH_VERSION = "1"
+
+HASH_KINDS = ['dhash', 'phash']
+MATCH_KINDS = HASH_KINDS + ['both']
+DEFAULT_KIND = 'both'      # pHash and dHash each within the distance
+DEFAULT_DISTANCE = 5       # out of 64 bits
+PHASH_SIZE = 32            # grayscale edge fed to the DCT
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis, so dct(x) = M @ x"""
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+DCT = _dct_matrix(PHASH_SIZE)
+
+def bits_to_int(bits):
+    """Pack a boolean array (most significant bit first) into an int"""
+    return int(''.join('1' if bit else '0' for bit in np.ravel(bits)), 2)
+
+def load_grayscale(image_path, size):
+    """Open an image as a `size` grayscale array, decoding JPEGs at reduced scale"""
+    img = Image.open(image_path)
+    img.draft('L', size)
+    return np.asarray(img.convert('L').resize(size, Image.LANCZOS), dtype=np.float64)
+
+def dhash(pixels):
+    """dHash of a (8, 9) grayscale array: is each pixel brighter than its right neighbour?"""
+    return bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+def phash(pixels):
+    """pHash of a (PHASH_SIZE, PHASH_SIZE) array: low frequencies above their median"""
+    low = (DCT @ pixels @ DCT.T)[:8, :8]
+    return bits_to_int(low > np.median(low.ravel()[1:]))
+
+def hash_image(image_path):
+    """{'dhash': hex, 'phash': hex} for one image, or None on error"""
+    try:
+        return {
+            'dhash': f"{dhash(load_grayscale(image_path, (9, 8))):016x}",
+            'phash': f"{phash(load_grayscale(image_path, (PHASH_SIZE, PHASH_SIZE))):016x}",
+        }
+    except Exception as e:
+        print(f"Error hashing {image_path}: {e}")
+        return None
+
+def hash_files(image_paths, workers=1, executor='process', chunksize=None):
+    """Yield hash_image results for `image_paths`, in input order"""
+    if workers <= 1:
+        yield from map(hash_image, image_paths)
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(image_paths) // (workers * 4))
+
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        yield from pool.map(hash_image, image_paths, chunksize=chunksize)
+
+def hamming(a, b):
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+class MultiIndexHash:
+    """Multi-index hash table for Hamming-distance search.
+
+    Hashes are split into `segments` bit ranges, each with its own table.
+    If two hashes are within k bits, one of their segments differs by at most
+    k // segments bits (pigeonhole), so a search only probes the buckets near
+    each query segment and checks those candidates, instead of the whole
+    collection.
+    """
+
+    def __init__(self, items=(), bits=64, segments=4):
+        self.bits = bits
+        self.segments = segments
+        self.width = bits // segments
+        self.mask = (1 << self.width) - 1
+        self.values = []
+        self.items = []
+        self.tables = [{} for _ in range(segments)]
+        for value, item in items:
+            self.add(value, item)
+
+    def add(self, value, item):
+        """Insert `item` under the integer hash `value`"""
+        row = len(self.values)
+        self.values.append(value)
+        self.items.append(item)
+        for segment, table in enumerate(self.tables):
+            table.setdefault((value >> (segment * self.width)) & self.mask, []).append(row)
+
+    def _probes(self, key, radius):
+        """Every segment value within `radius` bits of `key`"""
+        for r in range(radius + 1):
+            for positions in combinations(range(self.width), r):
+                flipped = key
+                for position in positions:
+                    flipped ^= 1 << position
+                yield flipped
+
+    def search(self, value, k):
+        """(distance, item) pairs within Hamming distance `k`, nearest first"""
+        radius = k // self.segments
+        seen = set()
+        results = []
+        for segment, table in enumerate(self.tables):
+            key = (value >> (segment * self.width)) & self.mask
+            for probe in self._probes(key, radius):
+                for row in table.get(probe, ()):
+                    if row in seen:
+                        continue
+                    seen.add(row)
+                    distance = hamming(value, self.values[row])
+                    if distance <= k:
+                        results.append((distance, self.items[row]))
+        return sorted(results)
+
+class HashIndex:
+    """Near-duplicate lookups over stored hashes"""
+
+    def __init__(self, hashes, kind=DEFAULT_KIND):
+        self.kind = kind
+        # With 'both', the table is searched by pHash and dHash confirms each match
+        self.hashes = {name: int(h['phash' if kind == 'both' else kind], 16) for name, h in hashes.items()}
+        self.confirm = {name: int(h['dhash'], 16) for name, h in hashes.items()} if kind == 'both' else None
+        self.table = MultiIndexHash((value, name) for name, value in self.hashes.items())
+
+    @classmethod
+    def load(cls, kind=DEFAULT_KIND, path=HASHES_FILE):
+        """Load data/image_hashes.json"""
+        with open(path) as f:
+            return cls(json.load(f)['hashes'], kind)
+
+    def near(self, value, k=DEFAULT_DISTANCE, confirm=None):
+        """
+        (distance, filename) pairs within `k` bits of an integer hash; with
+        kind 'both', the dHash `confirm` must be within `k` bits too
+        """
+        results = self.table.search(value, k)
+        if self.confirm is not None:
+            results = [(d, name) for d, name in results if hamming(confirm, self.confirm[name]) <= k]
+        return results
+
+    def near_image(self, filename, k=DEFAULT_DISTANCE):
+        """Indexed images within `k` bits of an indexed image (excluding itself)"""
+        confirm = self.confirm[filename] if self.confirm is not None else None
+        return [(d, name) for d, name in self.near(self.hashes[filename], k, confirm) if name != filename]
+
+    def near_file(self, image_path, k=DEFAULT_DISTANCE):
+        """Indexed images within `k` bits of any image file"""
+        hashes = hash_image(image_path)
+        if not hashes:
+            return []
+        if self.confirm is not None:
+            return self.near(int(hashes['phash'], 16), k, int(hashes['dhash'], 16))
+        return self.near(int(hashes[self.kind], 16), k)
+
+    def clusters(self, k=DEFAULT_DISTANCE):
+        """Groups of images connected by distances <= k, largest first"""
+        parent = {name: name for name in self.hashes}
+
+        def find(name):
+            while parent[name] != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        for name in self.hashes:
+            for _, other in self.near_image(name, k):
+                parent[find(other)] = find(name)
+
+        groups = {}
+        for name in self.hashes:
+            groups.setdefault(find(name), []).append(name)
+
+        clusters = [sorted(group) for group in groups.values() if len(group) > 1]
+        return sorted(clusters, key=lambda group: (-len(group), group[0]))
+
+def build(workers=1, executor='process', force=False, metadata_file=METADATA_FILE,
+          image_dir=IMAGE_DIR, hashes_file=HASHES_FILE, cache_file=CACHE_FILE):
+    """Hash every image in the metadata (reusing cached hashes) and save the sidecar"""
+    with open(metadata_file) as f:
+        metadata = json.load(f)
+
+    cache = ContentCache(cache_file, HASH_VERSION)
+    paths = [image_dir / entry['newFilename'] for entry in metadata]
+    paths = [path for path in paths if path.exists()]
+
+    hashes = {}
+    pending = []
+    for path in paths:
+        cached = None if force else cache.get(path)
+        if cached:
+            hashes[path.name] = cached
+        else:
+            pending.append(path)
+
+    for path, result in zip(pending, hash_files(pending, workers, executor)):
+        if result:
+            hashes[path.name] = result
+            cache.put(path, result)
+    cache.save()
+
+    # Metadata order, so the file diffs cleanly when images are added
+    hashes = {path.name: hashes[path.name] for path in paths if path.name in hashes}
+    with open(hashes_file, 'w') as f:
+        json.dump({'version': HASH_VERSION, 'bits': 64, 'hashes': hashes}, f, indent=2)
+
+    return hashes, len(pending)
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Perceptual hashes and near-duplicate detection")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="hash every image in images_metadata.json")
+    build_parser.add_argument('--workers', type=int, default=1,
+                              help="number of parallel workers (default: 1)")
+    build_parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                              help="pool type used when --workers > 1 (default: process)")
+    build_parser.add_argument('--force', action='store_true',
+                              help="re-hash every image, ignoring cached hashes")
+
+    clusters = commands.add_parser('clusters', help="report groups of near-duplicate images")
+    query = commands.add_parser('query', help="find near-duplicates of one image")
+    target = query.add_mutually_exclusive_group(required=True)
+    target.add_argument('--image', help="an indexed image filename")
+    target.add_argument('--file', help="any image file (hashed first)")
+
+    for command in (clusters, query):
+        command.add_argument('-k', type=int, default=DEFAULT_DISTANCE,
+                             help=f"maximum Hamming distance (default: {DEFAULT_DISTANCE})")
+        command.add_argument('--kind', choices=MATCH_KINDS, default=DEFAULT_KIND,
+                             help=f"hash to compare, or both (default: {DEFAULT_KIND})")
+
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Build, report or query"""
+    args = parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        hashes, hashed = build(args.workers, args.executor, args.force)
+        print(f"✓ Hashed {hashed} images ({len(hashes) - hashed} cached) "
+              f"in {time.perf_counter() - start:.1f}s")
+        print(f"✓ Saved to {HASHES_FILE}")
+        return
+
+    index = HashIndex.load(args.kind)
+
+    if args.command == 'clusters':
+        clusters = index.clusters(args.k)
+        print(f"{len(clusters)} near-duplicate clusters ({args.kind}, distance <= {args.k}):\n")
+        for group in clusters:
+            print(f"[{len(group)}] " + ", ".join(group))
+        return
+
+    if args.image:
+        if args.image not in index.hashes:
+            print(f"❌ {args.image} is not in {HASHES_FILE} (run: python3 scripts/image_hashes.py build)")
+            sys.exit(1)
+        results = index.near_image(args.image, args.k)
+    else:
+        results = index.near_file(args.file, args.k)
+
+    for distance, filename in results:
+        print(f"{distance:3d}  {filename}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Downscaled JPEG payloads for Claude Vision requests.
+
+Images are resized to fit MAX_EDGE and re-encoded at JPEG_QUALITY before
+being base64-encoded, which cuts upload bytes, latency and image tokens
+(roughly width x height / 750) without losing detail the metadata needs.
+Encoded files are kept in .cache/payloads/, named after the source's
+content hash and the settings, so each image is encoded once. The
+original is sent unchanged when it is already small enough and a
+re-encode would not be smaller, when it is small enough but Pillow cannot
+decode it, or when max_edge is 0 (the file is then never decoded).
+Files that are not a JPEG, PNG, GIF or WebP image, or that are too large
+and cannot be decoded, raise PayloadError.
+
+Usage:
+    python3 scripts/image_payload.py [--max-edge 768] [--jpeg-quality 80]   # report savings
+"""
+
+import argparse
+import base64
+import io
+import math
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from content_cache import CACHE_DIR, ContentCache
+
+# Paths
+IMAGE_DIR = Path("editorial_feed_images")
+PAYLOAD_DIR = CACHE_DIR / "payloads"
+
+MAX_EDGE = 768
+JPEG_QUALITY = 80
+
+# Bump when the encoding changes, so cached payloads are rebuilt
+PAYLOAD_VERSION = "2"
+
+# Image formats the API accepts, by their leading bytes (WebP is RIFF....WEBP)
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+
+# The API scales images down to fit these before counting tokens
+API_MAX_EDGE = 1568
+API_MAX_PIXELS = 1_150_000
+
+class PayloadError(ValueError):
+    """An image file that cannot be sent"""
+
+def estimate_tokens(width, height):
+    """Approximate image tokens the API charges for a width x height image"""
+    scale = min(1.0, API_MAX_EDGE / max(width, height), math.sqrt(API_MAX_PIXELS / (width * height)))
+    return math.ceil(width * scale * height * scale / 750)
+
+def media_type(image_path):
+    """MIME type of an image file from its header; PayloadError if the API does not accept it"""
+    with open(image_path, 'rb') as f:
+        header = f.read(12)
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, mime in SIGNATURES:
+        if header.startswith(signature):
+            return mime
+    raise PayloadError(f"{Path(image_path).name} is not a JPEG, PNG, GIF or WebP image")
+
+def image_source(image_path, payloads=None):
+    """Image content block source for `image_path`, downscaled if `payloads` is given"""
+    if payloads:
+        return payloads.source(image_path)
+    data = Path(image_path).read_bytes()
+    return {"type": "base64", "media_type": media_type(image_path),
+            "data": base64.standard_b64encode(data).decode("utf-8")}
+
+def encode_jpeg(image_path, max_edge, quality):
+    """(JPEG bytes, width, height) of `image_path` scaled to fit max_edge"""
+    img = Image.open(image_path)
+    img.draft('RGB', (max_edge, max_edge))
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    if max(img.size) > max_edge:
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=quality, optimize=True)
+    return output.getvalue(), img.width, img.height
+
+class ImagePayloads:
+    def __init__(self, directory=PAYLOAD_DIR, max_edge=MAX_EDGE, quality=JPEG_QUALITY):
+        self.directory = Path(directory)
+        self.max_edge = max_edge
+        self.quality = quality
+        self.index = ContentCache(self.directory / "index.json", PAYLOAD_VERSION)
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.original_bytes = 0
+        self.payload_bytes = 0
+        self.sized = 0
+        self.original_tokens = 0
+        self.payload_tokens = 0
+
+    @property
+    def variant(self):
+        """Name of the encoding settings, e.g. '768px-q80' ('original' when disabled)"""
+        return f"{self.max_edge}px-q{self.quality}" if self.max_edge else 'original'
+
+    def prepare(self, image_path):
+        """Record for `image_path`: payload file, media type, sizes and dimensions (encoding it if needed)"""
+        with self.lock:
+            sha256 = self.index.digest(image_path)
+            key = f"{sha256}:{self.variant}"
+            record = self.index.results.get(key)
+        if record and (record['path'] is None or Path(record['path']).exists()):
+            return record
+
+        original_bytes = Path(image_path).stat().st_size
+        record = {'path': None, 'media_type': media_type(image_path), 'original_bytes': original_bytes,
+                  'bytes': original_bytes, 'original_size': None, 'size': None}
+
+        # With max_edge 0 the file is sent as is, without decoding it
+        if self.max_edge:
+            try:
+                with Image.open(image_path) as img:
+                    width, height = img.size
+            except (OSError, Image.DecompressionBombError) as e:
+                raise PayloadError(f"cannot read {Path(image_path).name}: {e}") from e
+            record.update(original_size=[width, height], size=[width, height])
+
+            try:
+                data, new_width, new_height = encode_jpeg(image_path, self.max_edge, self.quality)
+            except (OSError, Image.DecompressionBombError) as e:
+                if max(width, height) > self.max_edge:
+                    raise PayloadError(f"cannot decode {Path(image_path).name}: {e}") from e
+                data = None
+
+            if data is not None and (max(width, height) > self.max_edge or len(data) < original_bytes):
+                path = self.directory / f"{sha256[:16]}-{self.variant}.jpg"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(data)
+                record.update(path=path.as_posix(), media_type='image/jpeg', bytes=len(data),
+                              size=[new_width, new_height])
+
+        with self.lock:
+            self.index.results[key] = record
+        return record
+
+    def source(self, image_path):
+        """Image content block source for `image_path`; adds to the savings totals"""
+        record = self.prepare(image_path)
+        data = Path(record['path'] or image_path).read_bytes()
+        with self.lock:
+            self.sent += 1
+            self.original_bytes += record['original_bytes']
+            self.payload_bytes += len(data)
+            # Dimensions are unknown for files sent without decoding
+            if record['size']:
+                self.sized += 1
+                self.original_tokens += estimate_tokens(*record['original_size'])
+                self.payload_tokens += estimate_tokens(*record['size'])
+        return {"type": "base64", "media_type": record['media_type'],
+                "data": base64.standard_b64encode(data).decode("utf-8")}
+
+    def report(self):
+        """One-line summary of bytes and tokens saved per request, or '' if nothing was sent"""
+        if not self.sent:
+            return ''
+        saved = 1 - self.payload_bytes / max(self.original_bytes, 1)
+        report = (f"📉 Images ({self.variant}): {self.original_bytes / self.sent / 1024:.0f} KB → "
+                  f"{self.payload_bytes / self.sent / 1024:.0f} KB per request ({saved:.0%} fewer bytes)")
+        if self.sized:
+            report += f", ~{self.original_tokens // self.sized} → ~{self.payload_tokens // self.sized} image tokens"
+        return report
+
+    def save(self):
+        """Write the payload index"""
+        with self.lock:
+            self.index.save()
+
+def add_arguments(parser):
+    """Add --max-edge/--jpeg-quality to a script's argument parser"""
+    parser.add_argument('--max-edge', type=int, default=MAX_EDGE,
+                        help=f"downscale images to fit this many pixels before sending "
+                             f"(default: {MAX_EDGE}; 0 sends the original file)")
+    parser.add_argument('--jpeg-quality', type=int, default=JPEG_QUALITY,
+                        help=f"JPEG quality of downscaled images (default: {JPEG_QUALITY})")
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Report what downscaling saves per vision request")
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Encode every image with the given settings and print the savings"""
+    args = parse_args(argv)
+    payloads = ImagePayloads(PAYLOAD_DIR, args.max_edge, args.jpeg_quality)
+    for image_path in sorted(IMAGE_DIR.glob("*.jpg")):
+        try:
+            payloads.source(image_path)
+        except PayloadError as e:
+            print(f"⚠ {e}")
+    payloads.save()
+    print(payloads.report() or "No images found")
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,27 @@ Integrate a new image into the system:
 3. Generate clean filename
 4. Add to metadata JSON
 5. Rename file
+
+The analysis is cached (scripts/response_cache.py), so re-integrating an
+image that was analyzed before, under any name, makes no API call;
+--force ignores the cache. The image is downscaled before sending
+(scripts/image_payload.py; --max-edge, --jpeg-quality).
 """
 
+import argparse
 import json
-import base64
 from pathlib import Path
 import os
 import re
 from anthropic import Anthropic
-from PIL import Image
-from collections import Counter
+
+import analyze_colors
+from auto_validate_and_fix import REANALYSIS_PROMPT, checked_analysis
+from metadata_io import load_metadata, save_metadata
+import image_payload
+from image_payload import ImagePayloads, image_source
+import response_cache
+from response_cache import ResponseCache
 
 # Initialize client
 client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
@@ -23,136 +34,44 @@ client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
 # Paths
 IMAGE_DIR = Path("editorial_feed_images")
 METADATA_FILE = Path("images_metadata.json")
-BACKUP_FILE = Path("images_metadata.backup_before_new.json")
-
-def get_image_base64(image_path):
-    """Read image and convert to base64"""
-    with open(image_path, "rb") as f:
-        return base64.standard_b64encode(f.read()).decode("utf-8")
-
-def rgb_to_hex(rgb):
-    """Convert RGB tuple to hex string"""
-    return '#{:02x}{:02x}{:02x}'.format(rgb[0], rgb[1], rgb[2])
-
-def color_distance(c1, c2):
-    """Calculate euclidean distance between two RGB colors"""
-    return sum((a - b) ** 2 for a, b in zip(c1, c2)) ** 0.5
-
-def get_color_name(rgb):
-    """Map RGB color to closest named color"""
-    color_names = {
-        (220, 20, 60): 'crimson', (255, 0, 0): 'red', (178, 34, 34): 'firebrick',
-        (255, 192, 203): 'pink', (255, 105, 180): 'hot-pink', (255, 20, 147): 'deep-pink',
-        (128, 0, 128): 'purple', (147, 112, 219): 'medium-purple', (138, 43, 226): 'blue-violet',
-        (0, 0, 255): 'blue', (0, 191, 255): 'deep-sky-blue', (30, 144, 255): 'dodger-blue',
-        (0, 128, 128): 'teal', (64, 224, 208): 'turquoise', (0, 255, 255): 'cyan',
-        (0, 128, 0): 'green', (0, 255, 0): 'lime', (50, 205, 50): 'lime-green',
-        (255, 255, 0): 'yellow', (255, 215, 0): 'gold', (255, 165, 0): 'orange',
-        (255, 255, 255): 'white', (192, 192, 192): 'silver', (128, 128, 128): 'gray',
-        (0, 0, 0): 'black'
-    }
+CACHE_FILE = response_cache.CACHE_FILE
+PAYLOAD_DIR = image_payload.PAYLOAD_DIR
 
-    min_distance = float('inf')
-    closest_name = 'gray'
-
-    for color_rgb, name in color_names.items():
-        distance = color_distance(rgb, color_rgb)
-        if distance < min_distance:
-            min_distance = distance
-            closest_name = name
-
-    return closest_name
+MODEL = "claude-sonnet-4-5-20250929"
+MAX_TOKENS = 1024
 
 def extract_colors(image_path):
-    """Extract dominant colors from image"""
-    try:
-        img = Image.open(image_path)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-
-        img.thumbnail((300, 300))
-        pixels = list(img.getdata())
-
-        # Filter out very light and very dark colors
-        filtered_pixels = [
-            p for p in pixels
-            if not ((p[0] > 240 and p[1] > 240 and p[2] > 240) or
-                   (p[0] < 15 and p[1] < 15 and p[2] < 15))
-        ]
-
-        if not filtered_pixels:
-            filtered_pixels = pixels
-
-        color_counts = Counter(filtered_pixels)
-        most_common = color_counts.most_common(15)
-
-        # Group similar colors
-        unique_colors = []
-        for color, count in most_common:
-            is_similar = False
-            for existing_color, _ in unique_colors:
-                if color_distance(color, existing_color) < 40:
-                    is_similar = True
-                    break
-            if not is_similar:
-                unique_colors.append((color, count))
-            if len(unique_colors) >= 5:
-                break
-
-        total_pixels = sum(count for _, count in unique_colors)
-
-        dominant_colors = []
-        accent_colors = []
-        color_names = []
-
-        for color, count in unique_colors:
-            percentage = (count / total_pixels) * 100
-            hex_color = rgb_to_hex(color)
-            color_name = get_color_name(color)
-
-            if percentage > 10:
-                dominant_colors.append(hex_color)
-            else:
-                accent_colors.append(hex_color)
-
-            if color_name not in color_names:
-                color_names.append(color_name)
-
-        return {
-            'dominant': dominant_colors[:3],
-            'accent': accent_colors[:3],
-            'named': color_names[:6]
-        }
-
-    except Exception as e:
-        print(f"Error extracting colors: {e}")
+    """Extract dominant colors from image (same analysis as analyze_colors.py)"""
+    colors = analyze_colors.extract_colors(image_path)
+    if colors is None:
         return {'dominant': [], 'accent': [], 'named': []}
+    return colors
 
-def analyze_image(image_path):
+def analyze_image(image_path, cache=None, payloads=None):
     """Analyze image content with Claude Vision"""
-    print(f"Analyzing image content...")
-    image_data = get_image_base64(image_path)
-
-    prompt = """Look at this image and describe EXACTLY what you see. Be literal and accurate.
-
-Return ONLY valid JSON:
-{
-  "title": "Brief Title (2-4 words)",
-  "description": "Accurate 1-2 sentence description of what's in the image",
-  "conceptual": ["concept1", "concept2", "concept3", "concept4"],
-  "subject": ["object1", "object2", "object3", "object4"],
-  "style": ["style1", "style2", "style3", "style4"]
-}"""
+    # The re-analysis prompt of auto_validate_and_fix.py, so the two share cached responses
+    prompt = REANALYSIS_PROMPT
+    variant = payloads.variant if payloads else 'original'
+    analysis = cache.get(image_path, prompt, MODEL, MAX_TOKENS, variant, checked_analysis) if cache else None
+    if analysis is not None:
+        print(f"Using cached analysis...")
+        return analysis
 
+    print(f"Analyzing image content...")
     try:
+        source = image_source(image_path, payloads)
+        if payloads:
+            payloads.save()
+            print(payloads.report())
+
         message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=1024,
+            model=MODEL,
+            max_tokens=MAX_TOKENS,
             messages=[{
                 "role": "user",
                 "content": [{
                     "type": "image",
-                    "source": {"type": "base64", "media_type": "image/jpeg", "data": image_data}
+                    "source": source
                 }, {
                     "type": "text",
                     "text": prompt
@@ -168,7 +87,11 @@ Return ONLY valid JSON:
         else:
             json_str = response_text.strip()
 
-        return json.loads(json_str)
+        analysis = checked_analysis(json.loads(json_str))
+        if cache:
+            cache.put(image_path, prompt, MODEL, MAX_TOKENS, analysis, variant)
+            cache.save()
+        return analysis
 
     except Exception as e:
         print(f"Error analyzing image: {e}")
@@ -190,8 +113,18 @@ def generate_filename(title, existing_filenames):
 
     return filename
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Add the newest image in editorial_feed_images/ to the metadata")
+    parser.add_argument('--force', action='store_true',
+                        help="analyze the image again, ignoring any cached analysis")
+    image_payload.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main integration function"""
+    args = parse_args(argv)
+
     print("=" * 80)
     print("NEW IMAGE INTEGRATION")
     print("=" * 80)
@@ -209,8 +142,7 @@ def main():
     print()
 
     # Load existing metadata
-    with open(METADATA_FILE) as f:
-        metadata = json.load(f)
+    metadata = load_metadata(METADATA_FILE)
 
     existing_filenames = {entry['newFilename'] for entry in metadata}
 
@@ -228,7 +160,8 @@ def main():
 
     # Step 1: Analyze image content
     print("🔍 Step 1: Analyzing image content with Claude Vision...")
-    analysis = analyze_image(newest_image)
+    payloads = ImagePayloads(PAYLOAD_DIR, args.max_edge, args.jpeg_quality)
+    analysis = analyze_image(newest_image, ResponseCache(CACHE_FILE, force=args.force), payloads)
 
     if not analysis:
         print("❌ Failed to analyze image")
@@ -269,17 +202,11 @@ def main():
         }
     }
 
-    # Backup existing metadata
-    import shutil
-    shutil.copy2(METADATA_FILE, BACKUP_FILE)
-    print(f"   ✓ Backup created: {BACKUP_FILE}")
-
     # Add new entry
     metadata.append(new_entry)
 
-    # Save updated metadata
-    with open(METADATA_FILE, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    # Save updated metadata (journaled; undo with scripts/metadata_io.py revert)
+    save_metadata(metadata, f"integrate_new_image: add {new_filename}", METADATA_FILE)
 
     print(f"   ✓ Added to metadata ({len(metadata)} total entries)")
     print()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Crash-safe reads and writes of images_metadata.json.
+
+save_metadata() never rewrites the file in place. It appends the change to
+images_metadata.journal (git-ignored), fsyncs the journal, writes the new
+JSON to a temporary file, fsyncs it and renames it over the old file. An
+interrupted run leaves either the old file or the new one, never a torn
+one, and the journal holds enough to rebuild either.
+
+Journal records are JSON lines:
+
+    {"seq": 1, "op": "checkpoint", "metadata": [...], "sha256": ...}
+    {"seq": 2, "op": "change", "reason": "analyze_colors", "time": ...,
+     "base": <sha256 before>, "sha256": <sha256 after>,
+     "length": <entries after>, "entries": {"<index>": <entry>, ...}}
+
+A change stores only the entries that differ, by position. The journal
+starts with a checkpoint of the file, and a new one is written (replacing
+the old journal) once it grows past JOURNAL_LIMIT times the metadata
+size, so there is no full backup copy per run. If the file was edited by
+hand since the last record, a checkpoint of it is journaled first.
+
+Usage:
+    python3 scripts/metadata_io.py history          # journaled changes
+    python3 scripts/metadata_io.py recover          # repair/roll forward from the journal
+    python3 scripts/metadata_io.py revert [--to SEQ] # undo the last change (or back to SEQ)
+    python3 scripts/metadata_io.py checkpoint       # compact the journal
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Paths
+METADATA_FILE = Path("images_metadata.json")
+
+# Compact the journal once it is this many times the size of the metadata
+JOURNAL_LIMIT = 4
+
+def journal_path(path=METADATA_FILE):
+    """Journal file belonging to a metadata file"""
+    return Path(path).with_suffix('.journal')
+
+# In indent=2 output, only separators between top-level entries are
+# followed by a line with exactly two spaces of indentation
+ENTRY_SEPARATOR = re.compile(r',\n  (?=\S)')
+
+def serialize(metadata):
+    """The exact text the metadata file holds"""
+    return json.dumps(metadata, indent=2)
+
+def split_entries(text):
+    """Serialized top-level entries of text written by serialize()"""
+    if text == '[]':
+        return []
+    return ENTRY_SEPARATOR.split(text[len('[\n  '):-len('\n]')])
+
+def digest(text):
+    """sha256 of the file text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def fsync_dir(path):
+    """Make a rename in `path`'s directory durable (no-op where unsupported)"""
+    try:
+        fd = os.open(Path(path).parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write(path, text):
+    """Replace `path` with `text`: temp file in the same directory, fsync, rename"""
+    path = Path(path)
+    if path.exists():
+        mode = path.stat().st_mode & 0o777
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        # mkstemp creates 0600; keep the file readable as before (e.g. by the web server)
+        os.chmod(tmp, mode)
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        # Including KeyboardInterrupt: the original file is untouched
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    fsync_dir(path)
+
+def read_journal(path=METADATA_FILE):
+    """Journal records, oldest first; a torn last line (crash mid-append) is ignored"""
+    journal = journal_path(path)
+    if not journal.exists():
+        return []
+
+    lines = journal.read_text().split('\n')
+    records = []
+    for number, line in enumerate(lines, 1):
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            if number == len(lines):
+                break
+            raise ValueError(f"{journal}:{number} is corrupt")
+    return records
+
+def last_record(path=METADATA_FILE):
+    """The newest complete journal record, or None, reading only the end of the journal"""
+    journal = journal_path(path)
+    if not journal.exists():
+        return None
+
+    with open(journal, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        # Chunks read backwards, newest first; joined only once the record is bounded
+        chunks = []
+        end = None
+        while position > 0:
+            step = min(1 << 16, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            if end is None:
+                # Bytes after the last newline are a torn append
+                index = chunk.rfind(b'\n')
+                if index == -1:
+                    continue
+                end = position + index
+                start = chunk.rfind(b'\n', 0, index)
+            else:
+                start = chunk.rfind(b'\n')
+            if start != -1:
+                start += position
+                break
+        else:
+            if end is None:
+                return None
+            start = -1
+
+    tail = b''.join(reversed(chunks))
+    base = position
+    record = tail[start + 1 - base:end - base]
+    return json.loads(record) if record else None
+
+def append_record(path, record):
+    """Append one record and fsync it before the metadata file is touched"""
+    journal = journal_path(path)
+    with open(journal, 'a+') as f:
+        # Drop a torn last line left by an interrupted append
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(f.tell() - 1)
+            if f.read(1) != '\n':
+                text = journal.read_text()
+                f.truncate(text.rfind('\n') + 1)
+        f.write(json.dumps(record) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+def checkpoint_record(metadata, seq):
+    """A journal record holding the whole metadata"""
+    return {'seq': seq, 'op': 'checkpoint', 'time': time.time(),
+            'sha256': digest(serialize(metadata)), 'metadata': metadata}
+
+def diff(old_entries, new_entries, new):
+    """Entries of `new` whose serialized text (from split_entries) changed, by position"""
+    return {str(i): new[i] for i, entry in enumerate(new_entries)
+            if i >= len(old_entries) or old_entries[i] != entry}
+
+def apply_change(metadata, record):
+    """Metadata after one change record"""
+    length = record['length']
+    result = metadata[:length] + [None] * max(0, length - len(metadata))
+    for index, entry in record['entries'].items():
+        result[int(index)] = entry
+    return result
+
+def replay(records, upto=None):
+    """Metadata after the records (up to and including seq `upto`); None if nothing to replay"""
+    metadata = None
+    for record in records:
+        if upto is not None and record['seq'] > upto:
+            break
+        if record['op'] == 'checkpoint':
+            metadata = record['metadata']
+        elif metadata is not None:
+            metadata = apply_change(metadata, record)
+    return metadata
+
+def load_metadata(path=METADATA_FILE):
+    """Load the metadata file; point at `recover` if it cannot be parsed"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path} is not valid JSON ({e}); "
+                         f"run: python3 scripts/metadata_io.py recover") from e
+
+def save_metadata(metadata, reason, path=METADATA_FILE):
+    """
+    Journal and atomically write `metadata`.
+
+    Returns the number of entries that changed (0 writes nothing).
+    """
+    path = Path(path)
+    last = last_record(path)
+    seq = last['seq'] if last else 0
+    current = path.read_text() if path.exists() else None
+    text = serialize(metadata)
+    if text == current:
+        return 0
+
+    previous_text = current if current is not None else '[]'
+    if current is not None and (not last or last['sha256'] != digest(current)):
+        # First save, or the file changed outside this module: journal it as is
+        seq += 1
+        previous = json.loads(current)
+        append_record(path, checkpoint_record(previous, seq))
+        previous_text = serialize(previous)
+
+    old_entries = split_entries(previous_text)
+    entries = diff(old_entries, split_entries(text), metadata)
+    append_record(path, {
+        'seq': seq + 1, 'op': 'change', 'reason': reason, 'time': time.time(),
+        'base': digest(current) if current is not None else None,
+        'sha256': digest(text), 'length': len(metadata), 'entries': entries,
+    })
+    atomic_write(path, text)
+
+    journal = journal_path(path)
+    if journal.stat().st_size > JOURNAL_LIMIT * max(len(text), 1):
+        checkpoint(path)
+    return len(entries) + max(0, len(old_entries) - len(metadata))
+
+def checkpoint(path=METADATA_FILE):
+    """Replace the journal with a single checkpoint of the current file"""
+    last = last_record(path)
+    record = checkpoint_record(load_metadata(path), last['seq'] + 1 if last else 1)
+    atomic_write(journal_path(path), json.dumps(record) + '\n')
+    return record
+
+def recover(path=METADATA_FILE, force=False):
+    """
+    Make the metadata file match the journal where it is safe to.
+
+    Returns a short status: 'clean', 'recovered' (file unreadable, missing,
+    or one interrupted save behind), 'diverged' (edited outside the journal;
+    left alone unless `force`) or 'no journal'.
+    """
+    path = Path(path)
+    records = read_journal(path)
+    if not records:
+        return 'no journal'
+
+    expected = serialize(replay(records))
+    current = path.read_text() if path.exists() else None
+    if current == expected:
+        return 'clean'
+
+    try:
+        readable = current is not None and json.loads(current) is not None
+    except json.JSONDecodeError:
+        readable = False
+
+    last = records[-1]
+    behind = current is not None and last['op'] == 'change' and last['base'] == digest(current)
+    if readable and not behind and not force:
+        return 'diverged'
+
+    atomic_write(path, expected)
+    return 'recovered'
+
+def revert(path=METADATA_FILE, to=None):
+    """Save the metadata as of journal seq `to` (default: before the last change)"""
+    records = read_journal(path)
+    changes = [r['seq'] for r in records if r['op'] == 'change']
+    if to is None:
+        if not changes:
+            raise ValueError("No journaled change to revert")
+        to = changes[-1] - 1
+
+    metadata = replay(records, upto=to)
+    if metadata is None:
+        raise ValueError(f"The journal has no state at seq {to}")
+    return save_metadata(metadata, f"revert to {to}", path)
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Journal and recovery for images_metadata.json")
+    parser.add_argument('--file', type=Path, default=METADATA_FILE,
+                        help=f"metadata file (default: {METADATA_FILE})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('history', help="list journaled changes")
+    recover_parser = commands.add_parser('recover', help="rebuild the file from the journal")
+    recover_parser.add_argument('--force', action='store_true',
+                                help="also overwrite edits made outside the journal")
+    revert_parser = commands.add_parser('revert', help="undo the last change")
+    revert_parser.add_argument('--to', type=int, help="journal seq to return to")
+    commands.add_parser('checkpoint', help="compact the journal to one checkpoint")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Inspect, recover or compact the journal"""
+    args = parse_args(argv)
+
+    if args.command == 'history':
+        for record in read_journal(args.file):
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record['time']))
+            if record['op'] == 'checkpoint':
+                print(f"{record['seq']:>5}  {when}  checkpoint ({len(record['metadata'])} entries)")
+            else:
+                print(f"{record['seq']:>5}  {when}  {record['reason']}: "
+                      f"{len(record['entries'])} entries changed, {record['length']} total")
+
+    elif args.command == 'recover':
+        status = recover(args.file, args.force)
+        if status == 'diverged':
+            print(f"⚠️  {args.file} was edited outside the journal; "
+                  f"keeping it (use --force to restore the journaled version)")
+            sys.exit(1)
+        print(f"✓ {args.file}: {status}")
+
+    elif args.command == 'revert':
+        changed = revert(args.file, args.to)
+        print(f"✓ Reverted {changed} entries in {args.file}")
+
+    else:
+        record = checkpoint(args.file)
+        print(f"✓ Journal compacted to checkpoint {record['seq']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite store for the image metadata.
+
+images_metadata.json stays the file the gallery loads and git tracks.
+This store holds the same entries in images_metadata.db (git-ignored), so
+scripts can update one row and query by tag, color or full text without
+loading and rewriting the whole list:
+
+    images       one row per entry: filenames, title, description and the
+                 analyzed colors (dominant_colors, accent_colors,
+                 named_colors; JSON arrays)
+    tags         distinct tag strings
+    image_tags   (image, tag type, position) -> tag, indexed by tag
+    images_fts   FTS5 over title, description and all tags
+
+Export writes exactly the bytes `json.dump(metadata, f, indent=2)` would
+(through metadata_io, so the write is atomic and journaled):
+entry order, key order, tag order and keys the store has no column for
+(e.g. fields added by other scripts) are kept in the `position`, `layout` and `extra`
+columns. Import checks this before committing.
+
+Usage:
+    python3 scripts/metadata_store.py import
+    python3 scripts/metadata_store.py export
+    python3 scripts/metadata_store.py search "tennis ball"
+    python3 scripts/metadata_store.py tag gradient [--type style]
+    python3 scripts/metadata_store.py color crimson
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+from metadata_io import save_metadata
+
+# Paths
+METADATA_FILE = Path("images_metadata.json")
+DB_FILE = Path("images_metadata.db")
+
+# Bump when the schema changes; older databases must be re-imported
+STORE_VERSION = 1
+
+TAG_TYPES = ['conceptual', 'subject', 'colors', 'style']
+COLOR_KINDS = ['dominant', 'accent', 'named']
+
+# Key order of a complete entry; entries in any other shape store their own
+ENTRY_KEYS = ['originalFilename', 'newFilename', 'title', 'description', 'tags']
+TAG_KEYS = TAG_TYPES + ['analyzed_colors']
+STRING_COLUMNS = {
+    'originalFilename': 'original_filename',
+    'newFilename': 'new_filename',
+    'title': 'title',
+    'description': 'description',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL UNIQUE,
+    original_filename TEXT,
+    new_filename TEXT UNIQUE,
+    title TEXT,
+    description TEXT,
+    dominant_colors TEXT,
+    accent_colors TEXT,
+    named_colors TEXT,
+    layout TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS image_tags (
+    image_id INTEGER NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+    tag_type TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    tag_id INTEGER NOT NULL REFERENCES tags(id),
+    PRIMARY KEY (image_id, tag_type, position)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS images_fts USING fts5(
+    title, description, tags, prefix='2 3'
+);
+"""
+TAG_INDEX = "CREATE INDEX IF NOT EXISTS image_tags_by_tag ON image_tags(tag_id, tag_type)"
+
+def connect(db_file=DB_FILE):
+    """Open (creating if needed) the store"""
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, STORE_VERSION):
+        conn.close()
+        raise ValueError(f"{db_file} has store version {version}, expected {STORE_VERSION}; "
+                         f"delete it and re-import")
+    conn.executescript(SCHEMA)
+    conn.execute(TAG_INDEX)
+    conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    return conn
+
+def split_entry(entry):
+    """
+    Split an entry into (columns, tag lists, layout, extra).
+
+    Values of the expected type go to columns and tag lists; anything else
+    (unknown keys, unexpected types) is kept verbatim in `extra`, by
+    section. `layout` records key order when it differs from ENTRY_KEYS /
+    TAG_KEYS / COLOR_KINDS, else None.
+    """
+    columns = {column: None for column in STRING_COLUMNS.values()}
+    columns.update({f"{kind}_colors": None for kind in COLOR_KINDS})
+    tag_lists = {}
+    extra = {}
+    layout = {'entry': list(entry)}
+
+    for key, value in entry.items():
+        if key in STRING_COLUMNS and isinstance(value, str):
+            columns[STRING_COLUMNS[key]] = value
+        elif key == 'tags' and isinstance(value, dict):
+            layout['tags'] = list(value)
+            for tag_key, tag_value in value.items():
+                if tag_key in TAG_TYPES and isinstance(tag_value, list) and \
+                        all(isinstance(tag, str) for tag in tag_value):
+                    tag_lists[tag_key] = tag_value
+                elif tag_key == 'analyzed_colors' and isinstance(tag_value, dict):
+                    layout['analyzed_colors'] = list(tag_value)
+                    for kind, colors in tag_value.items():
+                        if kind in COLOR_KINDS and isinstance(colors, list):
+                            columns[f"{kind}_colors"] = json.dumps(colors)
+                        else:
+                            extra.setdefault('analyzed_colors', {})[kind] = colors
+                else:
+                    extra.setdefault('tags', {})[tag_key] = tag_value
+        else:
+            extra.setdefault('entry', {})[key] = value
+
+    canonical = {'entry': ENTRY_KEYS, 'tags': TAG_KEYS, 'analyzed_colors': COLOR_KINDS}
+    if all(layout.get(section) == keys for section, keys in canonical.items()):
+        layout = None
+    return columns, tag_lists, layout, extra or None
+
+def join_entry(row, tag_lists):
+    """Rebuild the metadata entry for an `images` row (inverse of split_entry)"""
+    layout = json.loads(row['layout']) if row['layout'] else \
+        {'entry': ENTRY_KEYS, 'tags': TAG_KEYS, 'analyzed_colors': COLOR_KINDS}
+    extra = json.loads(row['extra']) if row['extra'] else {}
+
+    def section(name, keys, value_of):
+        stored = extra.get(name, {})
+        return {key: stored[key] if key in stored else value_of(key) for key in keys}
+
+    def analyzed(kind):
+        return json.loads(row[f"{kind}_colors"])
+
+    def tag_value(key):
+        if key == 'analyzed_colors':
+            return section('analyzed_colors', layout['analyzed_colors'], analyzed)
+        return tag_lists.get(key, [])
+
+    def entry_value(key):
+        if key == 'tags':
+            return section('tags', layout['tags'], tag_value)
+        return row[STRING_COLUMNS[key]]
+
+    return section('entry', layout['entry'], entry_value)
+
+def tag_ids(conn, names, known=None):
+    """Ids of tag strings, creating missing ones; `known` caches ids across calls"""
+    known = {} if known is None else known
+    for name in set(names) - known.keys():
+        row = conn.execute("SELECT id FROM tags WHERE name = ?", (name,)).fetchone()
+        known[name] = row[0] if row else conn.execute("INSERT INTO tags(name) VALUES (?)", (name,)).lastrowid
+    return known
+
+def write_row(conn, entry, position, image_id=None, known_tags=None):
+    """Insert or replace one entry (row, tags and full-text row); return its id"""
+    columns, tag_lists, layout, extra = split_entry(entry)
+    values = dict(columns, position=position,
+                  layout=json.dumps(layout) if layout else None,
+                  extra=json.dumps(extra) if extra else None)
+
+    names = list(values)
+    if image_id is None:
+        cursor = conn.execute(
+            f"INSERT INTO images({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            [values[name] for name in names])
+        image_id = cursor.lastrowid
+    else:
+        conn.execute(f"UPDATE images SET {', '.join(f'{name} = ?' for name in names)} WHERE id = ?",
+                     [values[name] for name in names] + [image_id])
+        conn.execute("DELETE FROM image_tags WHERE image_id = ?", (image_id,))
+        conn.execute("DELETE FROM images_fts WHERE rowid = ?", (image_id,))
+
+    ids = tag_ids(conn, [tag for tags in tag_lists.values() for tag in tags], known_tags)
+    conn.executemany(
+        "INSERT INTO image_tags(image_id, tag_type, position, tag_id) VALUES (?, ?, ?, ?)",
+        [(image_id, tag_type, i, ids[tag]) for tag_type, tags in tag_lists.items() for i, tag in enumerate(tags)])
+    conn.execute(
+        "INSERT INTO images_fts(rowid, title, description, tags) VALUES (?, ?, ?, ?)",
+        (image_id, columns['title'] or '', columns['description'] or '',
+         ' '.join(tag for tags in tag_lists.values() for tag in tags)))
+    return image_id
+
+def read_tags(conn, image_ids=None):
+    """{image id: {tag type: [tags in order]}}, for all images or `image_ids`"""
+    query = "SELECT image_id, tag_type, tag_id FROM image_tags"
+    params = []
+    if image_ids is not None:
+        query += f" WHERE image_id IN ({', '.join('?' * len(image_ids))})"
+        params = list(image_ids)
+    query += " ORDER BY image_id, tag_type, position"
+
+    rows = conn.execute(query, params).fetchall()
+    names = dict(conn.execute("SELECT id, name FROM tags"))
+    tags = {}
+    for image_id, tag_type, tag_id in rows:
+        tags.setdefault(image_id, {}).setdefault(tag_type, []).append(names[tag_id])
+    return tags
+
+def import_metadata(conn, metadata):
+    """Replace the store's contents with `metadata` (a list of entries)"""
+    # new_filename is UNIQUE; name the duplicates rather than surface an IntegrityError
+    seen = set()
+    duplicates = []
+    for entry in metadata:
+        name = entry.get('newFilename')
+        if name is not None and name in seen and name not in duplicates:
+            duplicates.append(name)
+        seen.add(name)
+    if duplicates:
+        raise ValueError(f"Duplicate newFilename: {', '.join(duplicates)}; nothing was imported")
+
+    with conn:
+        conn.execute("DELETE FROM image_tags")
+        conn.execute("DELETE FROM images")
+        conn.execute("DELETE FROM images_fts")
+        conn.execute("DELETE FROM tags")
+
+        # Building the tag index once is much cheaper than updating it per row
+        conn.execute("DROP INDEX image_tags_by_tag")
+        known_tags = {}
+        for position, entry in enumerate(metadata):
+            write_row(conn, entry, position, known_tags=known_tags)
+        conn.execute(TAG_INDEX)
+
+        # Compare serialized, so key order and 1 vs 1.0 count too
+        if json.dumps(export_metadata(conn)) != json.dumps(metadata):
+            raise ValueError("Store does not round-trip this metadata; nothing was imported")
+
+def export_metadata(conn):
+    """All entries, in metadata order"""
+    rows = conn.execute("SELECT * FROM images ORDER BY position").fetchall()
+    tags = read_tags(conn)
+    return [join_entry(row, tags.get(row['id'], {})) for row in rows]
+
+def find_row(conn, filename):
+    """The `images` row for a newFilename, or None"""
+    return conn.execute("SELECT * FROM images WHERE new_filename = ?", (filename,)).fetchone()
+
+def get_entry(conn, filename):
+    """The metadata entry for a newFilename, or None"""
+    row = find_row(conn, filename)
+    if row is None:
+        return None
+    return join_entry(row, read_tags(conn, [row['id']]).get(row['id'], {}))
+
+def put_entry(conn, entry):
+    """Update the entry with the same newFilename in place, or append it"""
+    with conn:
+        row = find_row(conn, entry.get('newFilename'))
+        if row is not None:
+            write_row(conn, entry, row['position'], row['id'])
+        else:
+            position = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM images").fetchone()[0]
+            write_row(conn, entry, position)
+
+def delete_entry(conn, filename):
+    """Remove an entry; return whether it existed"""
+    with conn:
+        row = find_row(conn, filename)
+        if row is None:
+            return False
+        conn.execute("DELETE FROM images_fts WHERE rowid = ?", (row['id'],))
+        conn.execute("DELETE FROM images WHERE id = ?", (row['id'],))
+        return True
+
+def fts_query(text):
+    """FTS5 query matching every word of `text` as a prefix"""
+    words = re.findall(r'\w+', text.lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+def search(conn, text, limit=50):
+    """newFilenames matching every word of `text`, best first (title > tags > description)"""
+    query = fts_query(text)
+    if not query:
+        return []
+    rows = conn.execute(
+        "SELECT new_filename FROM images_fts JOIN images ON images.id = images_fts.rowid "
+        "WHERE images_fts MATCH ? ORDER BY bm25(images_fts, 10.0, 1.0, 5.0), position LIMIT ?",
+        (query, limit))
+    return [row[0] for row in rows]
+
+def images_with_tag(conn, tag, tag_type=None):
+    """newFilenames with `tag` (of `tag_type`, if given), in metadata order"""
+    query = ("SELECT DISTINCT new_filename, images.position FROM image_tags "
+             "JOIN tags ON tags.id = tag_id JOIN images ON images.id = image_id WHERE tags.name = ?")
+    params = [tag]
+    if tag_type:
+        query += " AND tag_type = ?"
+        params.append(tag_type)
+    return [row[0] for row in conn.execute(query + " ORDER BY images.position", params)]
+
+def images_with_color(conn, name):
+    """newFilenames with analyzed color `name`, most prominent first"""
+    rows = conn.execute(
+        "SELECT new_filename FROM images, json_each(images.named_colors) AS color "
+        "WHERE images.named_colors IS NOT NULL AND color.value = ? "
+        "ORDER BY color.key, position",
+        (name,))
+    return [row[0] for row in rows]
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="SQLite store for images_metadata.json")
+    parser.add_argument('--db', type=Path, default=DB_FILE, help=f"database file (default: {DB_FILE})")
+    parser.add_argument('--json', type=Path, default=METADATA_FILE,
+                        help=f"metadata file (default: {METADATA_FILE})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('import', help="load the metadata file into the database")
+    commands.add_parser('export', help="write the database back to the metadata file")
+    search_parser = commands.add_parser('search', help="full-text search")
+    search_parser.add_argument('text')
+    search_parser.add_argument('--limit', type=int, default=50)
+    tag_parser = commands.add_parser('tag', help="images with a tag")
+    tag_parser.add_argument('tag')
+    tag_parser.add_argument('--type', choices=TAG_TYPES)
+    color_parser = commands.add_parser('color', help="images with an analyzed color name")
+    color_parser.add_argument('name')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Import, export or query the store"""
+    args = parse_args(argv)
+    conn = connect(args.db)
+
+    if args.command == 'import':
+        with open(args.json) as f:
+            metadata = json.load(f)
+        try:
+            import_metadata(conn, metadata)
+        except (ValueError, sqlite3.IntegrityError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✓ Imported {len(metadata)} entries from {args.json} into {args.db}")
+
+    elif args.command == 'export':
+        metadata = export_metadata(conn)
+        save_metadata(metadata, "metadata_store export", args.json)
+        print(f"✓ Exported {len(metadata)} entries from {args.db} to {args.json}")
+
+    else:
+        if args.command == 'search':
+            filenames = search(conn, args.text, args.limit)
+        elif args.command == 'tag':
+            filenames = images_with_tag(conn, args.tag, args.type)
+        else:
+            filenames = images_with_color(conn, args.name)
+        for filename in filenames:
+            print(filename)
+        print(f"✓ {len(filenames)} images")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Palette similarity index ("find images with this palette").
+
+Each image's analyzed_colors (dominant + accent) is stored as up to
+PALETTE_SLOTS weighted CIE Lab colors in data/palette_index.bin, a flat
+float32 array of shape (images, PALETTE_SLOTS, 4) holding L, a, b, weight.
+data/palette_index.json lists the filenames in row order. The gallery reads
+the same two files.
+
+Palettes are compared with a weighted two-way nearest-color distance: every
+query color is matched to its closest image color and every image color to
+its closest query color, weighted by each side's color weights.
+
+Usage:
+    python3 scripts/palette_index.py build
+    python3 scripts/palette_index.py query --hex "#ff0000" -k 10
+    python3 scripts/palette_index.py query --palette "#1e90ff" "#ffd700"
+    python3 scripts/palette_index.py query --image wizard-football-purple.jpg
+    python3 scripts/palette_index.py query --file path/to/new-image.jpg
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from color_names import DATA_DIR, hex_to_rgb
+
+# Paths
+METADATA_FILE = Path("images_metadata.json")
+INDEX_FILE = DATA_DIR / "palette_index.bin"
+INDEX_META_FILE = DATA_DIR / "palette_index.json"
+
+PALETTE_SLOTS = 6          # 3 dominant + 3 accent
+DOMINANT_SHARE = 0.75      # weight shared by dominant colors when accents exist
+QUERY_CHUNK = 65536        # rows compared at a time, bounds temporary memory
+
+def srgb_to_lab(rgb):
+    """Convert an (..., 3) array of 0-255 sRGB values to CIE Lab (D65)"""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+
+    xyz = c @ np.array([
+        [0.4124564, 0.2126729, 0.0193339],
+        [0.3575761, 0.7151522, 0.1191920],
+        [0.1804375, 0.0721750, 0.9503041],
+    ])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+def palette_vectors(hex_colors, weights=None):
+    """Weighted Lab rows (PALETTE_SLOTS, 4) for up to PALETTE_SLOTS hex colors"""
+    hex_colors = list(hex_colors)[:PALETTE_SLOTS]
+    rows = np.zeros((PALETTE_SLOTS, 4), dtype=np.float32)
+    if not hex_colors:
+        return rows
+
+    weights = np.asarray(weights if weights is not None else [1.0] * len(hex_colors), dtype=np.float64)
+    weights = weights[:len(hex_colors)]
+
+    rows[:len(hex_colors), :3] = srgb_to_lab([hex_to_rgb(c) for c in hex_colors])
+    rows[:len(hex_colors), 3] = weights / weights.sum()
+    return rows
+
+def analyzed_vectors(dominant, accent):
+    """palette_vectors for analyzed_colors: dominant colors share DOMINANT_SHARE"""
+    dominant, accent = list(dominant)[:3], list(accent)[:3]
+    if dominant and accent:
+        weights = ([DOMINANT_SHARE / len(dominant)] * len(dominant) +
+                   [(1.0 - DOMINANT_SHARE) / len(accent)] * len(accent))
+    else:
+        weights = None
+    return palette_vectors(dominant + accent, weights)
+
+def palette_distances(query, lab, norms, weights):
+    """Distance from one query palette (PALETTE_SLOTS, 4) to N indexed palettes.
+
+    Index arrays are slot-major so every reduction runs over long contiguous
+    rows: `lab` is (3, PALETTE_SLOTS * N), `norms` the (PALETTE_SLOTS, N)
+    squared lengths of those colors and `weights` their (PALETTE_SLOTS, N)
+    weights.
+    """
+    q_valid = query[:, 3] > 0
+    q_lab = np.ascontiguousarray(query[q_valid, :3], dtype=np.float32)
+    q_weight = query[q_valid, 3]
+
+    slots, n = weights.shape
+    if not len(q_lab):
+        # An empty query palette (no extracted colors) matches nothing
+        return np.full(n, np.inf, dtype=np.float32)
+    valid = weights > 0
+
+    # (query colors, image slots, N) via |a|^2 + |b|^2 - 2ab, one matrix product
+    squared = (q_lab @ lab).reshape(len(q_lab), slots, n)
+    squared *= -2
+    squared += norms
+    squared += (q_lab ** 2).sum(axis=1)[:, None, None]
+    np.maximum(squared, 0, out=squared)
+    d = np.sqrt(squared, out=squared)
+    d[:, ~valid] = np.inf
+
+    query_to_image = q_weight @ d.min(axis=1)
+    image_to_query = (np.where(valid, d.min(axis=0), 0) * weights).sum(axis=0)
+
+    distances = (query_to_image + image_to_query) / 2
+    distances[~valid.any(axis=0)] = np.inf
+    return distances
+
+class PaletteIndex:
+    def __init__(self, filenames, palettes):
+        self.filenames = list(filenames)
+        self.palettes = palettes
+        self.rows = {name: i for i, name in enumerate(self.filenames)}
+
+        # Slot-major copies in chunks, so each query is one matrix product per chunk
+        self._chunks = []
+        for start in range(0, len(self.filenames), QUERY_CHUNK):
+            chunk = palettes[start:start + QUERY_CHUNK].transpose(1, 0, 2)   # (slots, n, 4)
+            lab = np.ascontiguousarray(chunk[:, :, :3].transpose(2, 0, 1)).reshape(3, -1)
+            norms = (chunk[:, :, :3] ** 2).sum(axis=2)
+            self._chunks.append((lab, norms, np.ascontiguousarray(chunk[:, :, 3])))
+
+    @classmethod
+    def from_metadata(cls, metadata):
+        """Build the index from metadata entries"""
+        palettes = np.zeros((len(metadata), PALETTE_SLOTS, 4), dtype=np.float32)
+        for i, entry in enumerate(metadata):
+            analyzed = entry['tags'].get('analyzed_colors') or {}
+            palettes[i] = analyzed_vectors(analyzed.get('dominant', []), analyzed.get('accent', []))
+        return cls([entry['newFilename'] for entry in metadata], palettes)
+
+    @classmethod
+    def load(cls, index_file=INDEX_FILE, meta_file=INDEX_META_FILE):
+        """Load a saved index"""
+        with open(meta_file) as f:
+            meta = json.load(f)
+        palettes = np.fromfile(index_file, dtype='<f4').reshape(-1, meta['slots'], 4)
+        return cls(meta['filenames'], palettes)
+
+    def save(self, index_file=INDEX_FILE, meta_file=INDEX_META_FILE):
+        """Save the array and the filename list"""
+        self.palettes.astype('<f4').tofile(index_file)
+        with open(meta_file, 'w') as f:
+            json.dump({
+                'format': 'float32 little-endian, shape (images, slots, 4): L, a, b, weight',
+                'slots': PALETTE_SLOTS,
+                'count': len(self.filenames),
+                'filenames': self.filenames,
+            }, f, indent=2)
+
+    def query(self, query, k=10, exclude=None):
+        """Top-k (filename, distance) pairs closest to a query palette row block"""
+        distances = np.concatenate([
+            palette_distances(query, *chunk) for chunk in self._chunks
+        ]) if self._chunks else np.zeros(0)
+
+        if exclude in self.rows:
+            distances[self.rows[exclude]] = np.inf
+
+        k = min(k, int(np.isfinite(distances).sum()))
+        top = np.argpartition(distances, k - 1)[:k] if k else np.zeros(0, dtype=int)
+        top = top[np.argsort(distances[top], kind='stable')]
+        return [(self.filenames[i], float(distances[i])) for i in top]
+
+    def query_hex(self, hex_color, k=10):
+        """Images whose palette is closest to a single color"""
+        return self.query(palette_vectors([hex_color]), k)
+
+    def query_palette(self, hex_colors, k=10, weights=None):
+        """Images closest to a palette (optionally weighted, otherwise equal weights)"""
+        return self.query(palette_vectors(hex_colors, weights), k)
+
+    def query_image(self, filename, k=10):
+        """Images closest to an indexed image's palette (excluding itself)"""
+        return self.query(self.palettes[self.rows[filename]], k, exclude=filename)
+
+    def query_file(self, image_path, k=10):
+        """Images closest to the palette extracted from any image file"""
+        import analyze_colors
+
+        colors = analyze_colors.extract_colors(image_path)
+        if not colors:
+            return []
+        return self.query(analyzed_vectors(colors['dominant'], colors['accent']), k)
+
+def build(metadata_file=METADATA_FILE, index_file=INDEX_FILE, meta_file=INDEX_META_FILE):
+    """Build and save the index from the metadata file"""
+    with open(metadata_file) as f:
+        metadata = json.load(f)
+
+    index = PaletteIndex.from_metadata(metadata)
+    index.save(index_file, meta_file)
+    return index
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Palette similarity index")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('build', help="build the index from images_metadata.json")
+
+    query = commands.add_parser('query', help="find images with a similar palette")
+    target = query.add_mutually_exclusive_group(required=True)
+    target.add_argument('--hex', help="a single color, e.g. '#1e90ff'")
+    target.add_argument('--palette', nargs='+', metavar='HEX', help="several colors")
+    target.add_argument('--image', help="an indexed image filename")
+    target.add_argument('--file', help="any image file (colors are extracted first)")
+    query.add_argument('-k', type=int, default=10, help="number of results (default: 10)")
+
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Build or query the index"""
+    args = parse_args(argv)
+
+    if args.command == 'build':
+        index = build()
+        print(f"✓ Indexed {len(index.filenames)} palettes")
+        print(f"✓ Saved to {INDEX_FILE} and {INDEX_META_FILE}")
+        return
+
+    index = PaletteIndex.load()
+    if args.hex:
+        results = index.query_hex(args.hex, args.k)
+    elif args.palette:
+        results = index.query_palette(args.palette, args.k)
+    elif args.image:
+        if args.image not in index.rows:
+            print(f"❌ {args.image} is not in the palette index (run: python3 scripts/palette_index.py build)")
+            sys.exit(1)
+        results = index.query_image(args.image, args.k)
+    else:
+        results = index.query_file(args.file, args.k)
+
+    for filename, distance in results:
+        print(f"{distance:8.2f}  {filename}")
+
+if __name__ == "__main__":
+    main()
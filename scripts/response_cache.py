@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of parsed Claude Vision responses.
+
+Responses are keyed by (image SHA-256, variant of the image sent as in
+image_payload.py, prompt hash, model, max_tokens), so a request that was
+already answered for the same image content, e.g. the re-analysis of an
+image that integrate_new_image.py analyzed with the same prompt, returns
+without an API call. Image hashes come from ContentCache, so unchanged
+files are not re-read. Entries expire after TTL_DAYS, and the least
+recently used are evicted beyond MAX_ENTRIES.
+
+Usage:
+    python3 scripts/response_cache.py           # show cache statistics
+    python3 scripts/response_cache.py --clear   # drop all cached responses
+"""
+
+import argparse
+import hashlib
+import time
+
+from content_cache import CACHE_DIR, ContentCache
+
+CACHE_FILE = CACHE_DIR / "responses.json"
+CACHE_VERSION = "2"
+
+TTL_DAYS = 30
+MAX_ENTRIES = 10_000
+
+def prompt_hash(prompt):
+    """Short hash identifying a prompt"""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+
+class ResponseCache:
+    def __init__(self, path=CACHE_FILE, ttl_days=TTL_DAYS, max_entries=MAX_ENTRIES, force=False):
+        self.store = ContentCache(path, CACHE_VERSION)
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, image_path, prompt, model, max_tokens, variant='original'):
+        """Cache key of one request"""
+        return f"{self.store.digest(image_path)}:{variant}:{prompt_hash(prompt)}:{model}:{max_tokens}"
+
+    def get(self, image_path, prompt, model, max_tokens, variant='original', check=None):
+        """
+        Cached parsed response, or None (always None when `force` is set).
+        `check(value)` returns the value to use or raises ValueError, which
+        counts as a miss (e.g. a reply cached before the check existed).
+        """
+        key = self.key(image_path, prompt, model, max_tokens, variant)
+        record = None if self.force else self.store.results.get(key)
+        value = None
+        if record is not None and time.time() - record['created'] <= self.ttl:
+            try:
+                value = check(record['value']) if check else record['value']
+            except ValueError:
+                value = None
+        if value is None:
+            self.misses += 1
+            return None
+        record['used'] = time.time()
+        self.hits += 1
+        return value
+
+    def put(self, image_path, prompt, model, max_tokens, value, variant='original'):
+        """Store a parsed response"""
+        now = time.time()
+        self.store.results[self.key(image_path, prompt, model, max_tokens, variant)] = {
+            'created': now, 'used': now, 'value': value}
+
+    def evict(self):
+        """Drop expired entries and the least recently used beyond max_entries; returns the number removed"""
+        now = time.time()
+        results = {key: record for key, record in self.store.results.items()
+                   if now - record['created'] <= self.ttl}
+        if len(results) > self.max_entries:
+            newest = sorted(results.items(), key=lambda item: item[1]['used'], reverse=True)
+            results = dict(newest[:self.max_entries])
+        removed = len(self.store.results) - len(results)
+        self.store.results = results
+        return removed
+
+    def save(self):
+        """Evict, then write the cache"""
+        self.evict()
+        self.store.save()
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Inspect or clear the vision response cache")
+    parser.add_argument('--clear', action='store_true', help="remove all cached responses")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Show cache statistics, or clear the cache"""
+    args = parse_args(argv)
+    cache = ResponseCache()
+
+    if args.clear:
+        count = len(cache.store.results)
+        cache.store.results = {}
+        cache.store.save()
+        print(f"✓ Removed {count} cached responses")
+        return
+
+    total = len(cache.store.results)
+    removed = cache.evict()
+    print(f"💾 {CACHE_FILE}: {total - removed} responses ({removed} expired or over the limit)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Build data/search_index.json, the inverted index behind gallery search.
+
+The gallery matches a query as a lowercase substring of an image's title,
+description or tags, and ranks color queries by analyzed color position.
+This index lets search_index.js do that without lowercasing and scanning
+every entry per keystroke:
+
+    filenames  newFilename per document id (metadata order)
+    text       per document: title, description and tags, lowercased and
+               joined with NUL, used to verify candidates
+    tokens     lowercase [a-z0-9]+ token -> document ids containing it
+    colors     named: analyzed color name -> [document id, weight] with
+               weight 10 - 2 * position in analyzed_colors.named;
+               tags: color tag -> document ids (worth 5 once per image)
+
+Usage:
+    python3 scripts/search_index.py
+"""
+
+import json
+import re
+from pathlib import Path
+
+# Paths (relative to the collection, like the metadata it indexes)
+METADATA_FILE = Path("images_metadata.json")
+INDEX_FILE = Path("data") / "search_index.json"
+
+INDEX_VERSION = 1
+TAG_TYPES = ['conceptual', 'subject', 'colors', 'style']
+FIELD_SEPARATOR = '\0'
+TOKEN_SPLIT = re.compile(r'[^a-z0-9]+')
+
+def searchable_text(entry):
+    """Lowercased title, description and tags joined by FIELD_SEPARATOR"""
+    tags = [tag for tag_type in TAG_TYPES for tag in entry['tags'].get(tag_type) or []]
+    return FIELD_SEPARATOR.join([entry['title'], entry['description']] + tags).lower()
+
+def tokenize(text):
+    """Distinct lowercase alphanumeric tokens in `text`"""
+    return {token for token in TOKEN_SPLIT.split(text) if token}
+
+def build_index(metadata):
+    """Build the index dict for a list of metadata entries"""
+    text = [searchable_text(entry) for entry in metadata]
+
+    tokens = {}
+    for doc, entry_text in enumerate(text):
+        for token in tokenize(entry_text):
+            tokens.setdefault(token, []).append(doc)
+
+    named_colors = {}
+    color_tags = {}
+    for doc, entry in enumerate(metadata):
+        analyzed = entry['tags'].get('analyzed_colors') or {}
+        for position, name in enumerate(analyzed.get('named') or []):
+            named_colors.setdefault(name.lower(), []).append([doc, 10 - position * 2])
+        for tag in {tag.lower() for tag in entry['tags'].get('colors') or []}:
+            color_tags.setdefault(tag, []).append(doc)
+
+    return {
+        'version': INDEX_VERSION,
+        'filenames': [entry['newFilename'] for entry in metadata],
+        'text': text,
+        'tokens': dict(sorted(tokens.items())),
+        'colors': {
+            'named': dict(sorted(named_colors.items())),
+            'tags': {tag: sorted(docs) for tag, docs in sorted(color_tags.items())},
+        },
+    }
+
+def build(metadata_file=METADATA_FILE, index_file=INDEX_FILE):
+    """Build the index from the metadata file and save it"""
+    with open(metadata_file) as f:
+        metadata = json.load(f)
+
+    index = build_index(metadata)
+    with open(index_file, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return index
+
+def main():
+    """Rebuild data/search_index.json"""
+    index = build()
+    print(f"✓ Indexed {len(index['filenames'])} images, {len(index['tokens'])} tokens")
+    print(f"✓ Saved to {INDEX_FILE} ({INDEX_FILE.stat().st_size / 1024:.0f} KB)")
+
+if __name__ == "__main__":
+    main()
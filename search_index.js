@@ -0,0 +1,366 @@
+/**
+ * Gallery search, shared by index.html and tests/test_search.js.
+ *
+ * A query matches an image when its lowercase form is a substring of the
+ * title, description or any conceptual/subject/colors/style tag. Queries that
+ * look like a color are ranked instead: 10 - 2 * position for every matching
+ * analyzed color name, plus 5 if any color tag matches.
+ *
+ * scanSearch() does this over raw metadata. createSearcher() answers the
+ * same queries from data/search_index.json (scripts/search_index.py): an
+ * n-gram index over the token vocabulary finds the tokens containing each
+ * part of the query, their postings give candidates, and candidates are
+ * verified against the stored text. The work is proportional to the
+ * matching tokens and results, not the collection.
+ */
+(function (root, factory) {
+    if (typeof module === 'object' && module.exports) {
+        module.exports = factory();
+    } else {
+        root.SearchIndex = factory();
+    }
+})(typeof self !== 'undefined' ? self : this, function () {
+    'use strict';
+
+    const INDEX_VERSION = 1;
+    const FIELD_SEPARATOR = '\0';
+    const TOKEN_SPLIT = /[^a-z0-9]+/;
+
+    // Common color keywords
+    const COLOR_KEYWORDS = [
+        'red', 'blue', 'green', 'yellow', 'orange', 'purple', 'pink', 'gold', 'golden',
+        'teal', 'cyan', 'magenta', 'violet', 'indigo', 'turquoise', 'coral', 'salmon',
+        'navy', 'lime', 'mint', 'peach', 'lavender', 'plum', 'rust', 'bronze', 'copper',
+        'amber', 'rose', 'burgundy', 'crimson', 'scarlet', 'maroon', 'vermillion',
+        'emerald', 'jade', 'olive', 'chartreuse', 'cobalt', 'azure', 'cerulean',
+        'white', 'black', 'gray', 'grey', 'silver', 'brown', 'tan', 'beige'
+    ];
+
+    function normalizeQuery(query) {
+        return (query || '').toLowerCase().trim();
+    }
+
+    function isColorSearch(searchLower) {
+        return COLOR_KEYWORDS.some(color =>
+            searchLower.includes(color) || color.includes(searchLower)
+        );
+    }
+
+    // Reference implementation: scan every entry
+    function scanSearch(metadata, query) {
+        const searchLower = normalizeQuery(query);
+        if (!searchLower) return metadata;
+
+        if (isColorSearch(searchLower)) {
+            const scored = metadata.map(img => {
+                let score = 0;
+
+                const named = (img.tags.analyzed_colors && img.tags.analyzed_colors.named) || [];
+                named.forEach((color, index) => {
+                    if (color.toLowerCase().includes(searchLower)) {
+                        score += 10 - (index * 2);
+                    }
+                });
+
+                const colorTags = img.tags.colors || [];
+                if (colorTags.some(tag => tag.toLowerCase().includes(searchLower))) {
+                    score += 5;
+                }
+
+                return { img, score };
+            }).filter(item => item.score > 0);
+
+            scored.sort((a, b) => b.score - a.score);
+            return scored.map(item => item.img);
+        }
+
+        return metadata.filter(img => entryMatches(img, searchLower));
+    }
+
+    // Whether a text (non-color) search for `searchLower` matches `img`
+    function entryMatches(img, searchLower) {
+        if (img.title.toLowerCase().includes(searchLower)) return true;
+        if (img.description.toLowerCase().includes(searchLower)) return true;
+
+        const searchableTags = [
+            ...(img.tags.conceptual || []),
+            ...(img.tags.subject || []),
+            ...(img.tags.colors || []),
+            ...(img.tags.style || [])
+        ];
+
+        return searchableTags.some(tag =>
+            tag.toLowerCase().includes(searchLower)
+        );
+    }
+
+    const QUERY_CACHE_SIZE = 32;
+
+    /**
+     * LRU cache of recent results, keyed by normalized query.
+     *
+     * A text query that contains an earlier text query matches a subset of
+     * its results, in the same order, so typing "blu" -> "blue" only
+     * re-checks the results for "blu". Color searches are ranked and always
+     * run in full (they only touch the color postings).
+     */
+    function createQueryCache(size = QUERY_CACHE_SIZE) {
+        const results = new Map();
+
+        // Results of the longest cached text query contained in `searchLower`
+        function narrowest(searchLower) {
+            let best = null;
+            results.forEach((value, key) => {
+                if (searchLower.includes(key) && !isColorSearch(key) && (!best || key.length > best.length)) {
+                    best = key;
+                }
+            });
+            return best === null ? null : results.get(best);
+        }
+
+        return {
+            /**
+             * Results for `searchLower`: cached, refined with `matches(item)`
+             * from an earlier query, or computed with `searchAll()`.
+             * `refineLimit()`, if given, is the largest earlier result worth
+             * refining (a rough cost of searchAll).
+             */
+            search(searchLower, searchAll, matches, refineLimit) {
+                let value = results.get(searchLower);
+                if (value) {
+                    results.delete(searchLower);
+                } else {
+                    const base = isColorSearch(searchLower) ? null : narrowest(searchLower);
+                    const refine = base && (!refineLimit || base.length <= refineLimit());
+                    value = refine ? base.filter(matches) : searchAll();
+                    if (results.size >= size) {
+                        results.delete(results.keys().next().value);
+                    }
+                }
+                if (size > 0) results.set(searchLower, value);
+                return value.slice();
+            },
+
+            get size() {
+                return results.size;
+            }
+        };
+    }
+
+    // scanSearch over `metadata`, with recent results cached and refined
+    function createScanner(metadata, cacheSize = QUERY_CACHE_SIZE) {
+        const cache = createQueryCache(cacheSize);
+        return {
+            search(query) {
+                const searchLower = normalizeQuery(query);
+                if (!searchLower) return metadata.slice();
+                return cache.search(searchLower,
+                                    () => scanSearch(metadata, searchLower),
+                                    img => entryMatches(img, searchLower));
+            },
+            cache
+        };
+    }
+
+    // Whether `index` was built from exactly these entries (in any display order)
+    function isCurrent(index, metadata) {
+        if (!index || index.version !== INDEX_VERSION || index.filenames.length !== metadata.length) {
+            return false;
+        }
+        const filenames = new Set(index.filenames);
+        return metadata.every(img => filenames.has(img.newFilename));
+    }
+
+    // Document ids of every key in `postings` that contains `needle`
+    function docsContaining(postings, needle) {
+        const docs = new Set();
+        for (const key in postings) {
+            if (key.includes(needle)) {
+                postings[key].forEach(doc => docs.add(doc));
+            }
+        }
+        return docs;
+    }
+
+    const GRAM_SIZE = 3;
+
+    /**
+     * Substring index over a vocabulary: every 1-3 character substring maps to
+     * the ids of the words containing it. Pieces of up to GRAM_SIZE characters
+     * are answered by one lookup (the 1-2 character keys act as a depth-two
+     * trie); longer pieces intersect the lists of their trigrams, then check
+     * the few remaining words.
+     */
+    function createGramIndex(words) {
+        const grams = new Map();
+        words.forEach((word, id) => {
+            const seen = new Set();
+            for (let n = 1; n <= GRAM_SIZE; n++) {
+                for (let i = 0; i + n <= word.length; i++) {
+                    const gram = word.slice(i, i + n);
+                    if (seen.has(gram)) continue;
+                    seen.add(gram);
+                    if (!grams.has(gram)) grams.set(gram, []);
+                    grams.get(gram).push(id);
+                }
+            }
+        });
+
+        return function wordsContaining(piece) {
+            if (piece.length <= GRAM_SIZE) {
+                return grams.get(piece) || [];
+            }
+
+            const lists = [];
+            for (let i = 0; i + GRAM_SIZE <= piece.length; i++) {
+                const list = grams.get(piece.slice(i, i + GRAM_SIZE));
+                if (!list) return [];
+                lists.push(list);
+            }
+            lists.sort((a, b) => a.length - b.length);
+
+            // Lists are sorted ids; keep the shortest list's ids present in all others
+            let ids = lists[0];
+            for (let l = 1; l < lists.length && ids.length; l++) {
+                const other = lists[l];
+                let j = 0;
+                ids = ids.filter(id => {
+                    while (j < other.length && other[j] < id) j++;
+                    return other[j] === id;
+                });
+            }
+            return ids.filter(id => words[id].includes(piece));
+        };
+    }
+
+    /**
+     * Search over a parsed data/search_index.json.
+     *
+     * `order` lists document ids in display order (default: metadata order).
+     * Results come back as document ids in that order, or by score for color
+     * searches, with ties in that order, exactly as scanSearch would.
+     */
+    function createSearcher(index, order, cacheSize = QUERY_CACHE_SIZE) {
+        const count = index.filenames.length;
+        order = order || index.filenames.map((_, doc) => doc);
+
+        const rank = new Int32Array(count);
+        order.forEach((doc, position) => { rank[doc] = position; });
+        const byRank = (a, b) => rank[a] - rank[b];
+
+        const scores = new Int32Array(count);
+
+        // Union/intersection marks, stamped with a fresh value per use instead of cleared
+        const marks = new Uint32Array(count);
+        let stamp = 0;
+
+        const vocabulary = Object.keys(index.tokens);
+        const tokensContaining = createGramIndex(vocabulary);
+
+        // Total postings of the tokens containing `piece`
+        function postingCount(tokenIds) {
+            let total = 0;
+            tokenIds.forEach(id => { total += index.tokens[vocabulary[id]].length; });
+            return total;
+        }
+
+        // Documents with one of the tokens `tokenIds`, unique
+        function docsWithTokens(tokenIds) {
+            const docs = [];
+            stamp++;
+            tokenIds.forEach(id => {
+                index.tokens[vocabulary[id]].forEach(doc => {
+                    if (marks[doc] !== stamp) {
+                        marks[doc] = stamp;
+                        docs.push(doc);
+                    }
+                });
+            });
+            return docs;
+        }
+
+        function colorSearch(searchLower) {
+            const touched = [];
+            const add = (doc, weight) => {
+                if (scores[doc] === 0 && weight !== 0) touched.push(doc);
+                scores[doc] += weight;
+            };
+
+            for (const name in index.colors.named) {
+                if (!name.includes(searchLower)) continue;
+                index.colors.named[name].forEach(([doc, weight]) => add(doc, weight));
+            }
+            docsContaining(index.colors.tags, searchLower).forEach(doc => add(doc, 5));
+
+            const docs = touched.filter(doc => scores[doc] > 0);
+            docs.sort((a, b) => scores[b] - scores[a] || rank[a] - rank[b]);
+            touched.forEach(doc => { scores[doc] = 0; });
+            return docs;
+        }
+
+        // Candidates textSearch would verify for the longest part of the query
+        function textSearchCost(searchLower) {
+            const pieces = searchLower.split(TOKEN_SPLIT);
+            const longest = pieces.reduce((a, b) => b.length > a.length ? b : a, '');
+            return longest ? Math.min(postingCount(tokensContaining(longest)), count) : count;
+        }
+
+        function textSearch(searchLower) {
+            // Each alphanumeric run of the query lies inside one token of a
+            // matching field, so only documents with such tokens are candidates
+            const pieces = searchLower.split(TOKEN_SPLIT).filter(Boolean);
+            pieces.sort((a, b) => b.length - a.length);
+
+            let candidates = null;
+            for (const piece of pieces) {
+                const tokenIds = tokensContaining(piece);
+                if (tokenIds.length === 0) return [];
+
+                // A piece as common as the collection itself (e.g. "e") narrows
+                // nothing; merging its postings would cost more than verifying
+                if (postingCount(tokenIds) > count) continue;
+
+                const docs = docsWithTokens(tokenIds);
+                if (candidates) {
+                    // docsWithTokens just stamped exactly these documents
+                    candidates = candidates.filter(doc => marks[doc] === stamp);
+                } else {
+                    candidates = docs;
+                }
+                if (candidates.length === 0) return [];
+            }
+            const matches = doc => index.text[doc].includes(searchLower);
+            if (candidates === null) {
+                return order.filter(matches);
+            }
+            return candidates.filter(matches).sort(byRank);
+        }
+
+        const cache = createQueryCache(cacheSize);
+
+        return {
+            search(query) {
+                const searchLower = normalizeQuery(query);
+                if (!searchLower || searchLower.includes(FIELD_SEPARATOR)) {
+                    return searchLower ? [] : order.slice();
+                }
+                return cache.search(searchLower,
+                                    () => isColorSearch(searchLower) ? colorSearch(searchLower) : textSearch(searchLower),
+                                    doc => index.text[doc].includes(searchLower),
+                                    () => textSearchCost(searchLower));
+            },
+            cache
+        };
+    }
+
+    return {
+        COLOR_KEYWORDS,
+        normalizeQuery,
+        isColorSearch,
+        scanSearch,
+        isCurrent,
+        createQueryCache,
+        createScanner,
+        createSearcher
+    };
+});
@@ -0,0 +1,83 @@
+/**
+ * Gallery search off the main thread.
+ *
+ * Protocol (all messages are plain objects with a `type`):
+ *   page -> worker  {type: 'init', order}       order: newFilenames in display order
+ *   worker -> page  {type: 'ready', indexed}     indexed: false when scanning without an index
+ *   worker -> page  {type: 'error', message}     the page should search in-thread instead
+ *   page -> worker  {type: 'search', id, query}
+ *   worker -> page  {type: 'results', id, positions}
+ *                    positions: Int32Array of indexes into `order`, in result order
+ *
+ * The worker fetches and parses images_metadata.json and data/search_index.json
+ * itself. Searches that arrive while another is queued replace it, so only the
+ * newest query of a burst is run; the page ignores results for older ids.
+ */
+importScripts('search_index.js');
+
+let ready = null;
+let search = null;
+let pending = null;
+let scheduled = false;
+
+async function fetchJson(url) {
+    const response = await fetch(url + '?v=' + Date.now());
+    if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+    return response.json();
+}
+
+async function init(order) {
+    try {
+        const [metadata, index] = await Promise.all([
+            fetchJson('images_metadata.json'),
+            fetchJson('data/search_index.json').catch(() => null)
+        ]);
+
+        const position = new Map(order.map((filename, i) => [filename, i]));
+        if (metadata.length !== order.length || !metadata.every(img => position.has(img.newFilename))) {
+            throw new Error('images_metadata.json changed since the page loaded');
+        }
+
+        if (SearchIndex.isCurrent(index, metadata)) {
+            const docs = new Map(index.filenames.map((filename, doc) => [filename, doc]));
+            const searcher = SearchIndex.createSearcher(index, order.map(filename => docs.get(filename)));
+            const docPosition = Int32Array.from(index.filenames, filename => position.get(filename));
+            search = query => Int32Array.from(searcher.search(query), doc => docPosition[doc]);
+        } else {
+            const displayed = new Array(order.length);
+            metadata.forEach(img => { displayed[position.get(img.newFilename)] = img; });
+            const entryPosition = new Map(displayed.map((img, i) => [img, i]));
+            const scanner = SearchIndex.createScanner(displayed);
+            search = query => Int32Array.from(scanner.search(query), img => entryPosition.get(img));
+        }
+
+        self.postMessage({ type: 'ready', indexed: SearchIndex.isCurrent(index, metadata) });
+    } catch (error) {
+        self.postMessage({ type: 'error', message: String(error && error.message || error) });
+    }
+}
+
+function runPending() {
+    scheduled = false;
+    const request = pending;
+    pending = null;
+    if (!request || !search) return;
+
+    const positions = search(request.query);
+    self.postMessage({ type: 'results', id: request.id, positions }, [positions.buffer]);
+}
+
+self.onmessage = event => {
+    const message = event.data;
+
+    if (message.type === 'init') {
+        ready = init(message.order);
+    } else if (message.type === 'search') {
+        pending = message;
+        if (!scheduled) {
+            scheduled = true;
+            // Messages already queued run first and replace `pending`
+            ready.then(() => setTimeout(runPending, 0));
+        }
+    }
+};
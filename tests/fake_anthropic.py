@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic Messages API, for testing the scripts
+without network access or an API key.
+
+    with FakeAnthropic(respond, latency=0.2) as server:
+        client = AsyncAnthropic(api_key="test", base_url=server.url)
+
+`respond(request)` gets the parsed JSON body of each POST /v1/messages
+and returns the reply text (or a dict to send as the whole response body,
+or a (status, error body) tuple to fail the request).
+`latency` is seconds per request, or a function of the request. The
+server records every request and the highest number served at once.
+
+Message Batches are supported too: each request in a submitted batch is
+answered by `respond(params)` (None makes it an errored result), and the
+batch reports as ended `batch_delay` seconds after it was created.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+def message_body(text, model):
+    """A Messages API response carrying `text`"""
+    return {
+        'id': 'msg_fake',
+        'type': 'message',
+        'role': 'assistant',
+        'model': model,
+        'content': [{'type': 'text', 'text': text}],
+        'stop_reason': 'end_turn',
+        'stop_sequence': None,
+        'usage': {'input_tokens': 1, 'output_tokens': 1},
+    }
+
+def request_text(request):
+    """The text parts of the (single) user message in a request"""
+    return '\n'.join(part['text'] for part in request['messages'][0]['content'] if part['type'] == 'text')
+
+def timestamp(seconds):
+    """RFC 3339 time for a time.time() value"""
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+def not_found(path):
+    """(status, body) of a 404"""
+    return 404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': path}}
+
+class FakeAnthropic:
+    def __init__(self, respond, latency=0.0, batch_delay=0.0):
+        self.respond = respond
+        self.latency = latency
+        self.batch_delay = batch_delay
+        self.requests = []
+        self.batches = {}
+        self.polls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler_class())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def handler_class(self):
+        """Request handler bound to this server"""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                with fake.lock:
+                    fake.requests.append({'path': self.path, 'body': request})
+                    fake.in_flight += 1
+                    fake.peak_in_flight = max(fake.peak_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.latency(request) if callable(fake.latency) else fake.latency)
+                    status, body = fake.handle(self.path, request)
+                finally:
+                    with fake.lock:
+                        fake.in_flight -= 1
+                self.send_json(status, body)
+
+            def do_GET(self):
+                status, body = fake.handle_get(self.path)
+                if isinstance(body, str):
+                    data = body.encode('utf-8')
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/binary')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self.send_json(status, body)
+
+        return Handler
+
+    def reply(self, request):
+        """Message body for one request, or None if `respond` makes it fail"""
+        reply = self.respond(request)
+        if reply is None or isinstance(reply, (dict, tuple)):
+            return reply
+        body = message_body(reply, request.get('model', 'fake'))
+        body['id'] = f"msg_{next(self.ids)}"
+        return body
+
+    def handle(self, path, request):
+        """(status, body) for a POST; /v1/messages calls `respond`"""
+        path = path.split('?')[0]
+        if path == '/v1/messages/batches':
+            return 200, self.create_batch(request['requests'])
+        if path != '/v1/messages':
+            return not_found(path)
+        body = self.reply(request)
+        if body is None:
+            return 500, {'type': 'error', 'error': {'type': 'api_error', 'message': 'fake failure'}}
+        if isinstance(body, tuple):
+            return body
+        return 200, body
+
+    def handle_get(self, path):
+        """(status, body) for a GET: batch status, or batch results as JSONL text"""
+        parts = path.split('?')[0].strip('/').split('/')
+        if parts[:3] != ['v1', 'messages', 'batches'] or len(parts) not in (4, 5):
+            return not_found(path)
+        batch = self.batches.get(parts[3])
+        if batch is None:
+            return not_found(path)
+        if len(parts) == 4:
+            with self.lock:
+                self.polls += 1
+            return 200, self.batch_body(batch)
+        if parts[4] != 'results' or not self.ended(batch):
+            return not_found(path)
+        return 200, ''.join(json.dumps(line) + '\n' for line in batch['results'])
+
+    def create_batch(self, requests):
+        """Answer every request now; the batch reports as ended after batch_delay"""
+        results = []
+        for item in requests:
+            body = self.reply(item['params'])
+            if body is None:
+                result = {'type': 'errored', 'error': {
+                    'type': 'error', 'error': {'type': 'api_error', 'message': 'fake failure'}}}
+            elif isinstance(body, tuple):
+                result = {'type': 'errored', 'error': body[1]}
+            else:
+                result = {'type': 'succeeded', 'message': body}
+            results.append({'custom_id': item['custom_id'], 'result': result})
+
+        with self.lock:
+            batch_id = f"msgbatch_{next(self.ids)}"
+            batch = {'id': batch_id, 'created': time.time(), 'requests': requests, 'results': results}
+            self.batches[batch_id] = batch
+        return self.batch_body(batch)
+
+    def ended(self, batch):
+        """Whether a batch has finished processing"""
+        return time.time() >= batch['created'] + self.batch_delay
+
+    def batch_body(self, batch):
+        """A MessageBatch object"""
+        ended = self.ended(batch)
+        counts = {'processing': len(batch['results']), 'succeeded': 0, 'errored': 0, 'canceled': 0, 'expired': 0}
+        if ended:
+            counts['processing'] = 0
+            for line in batch['results']:
+                counts[line['result']['type']] += 1
+        return {
+            'id': batch['id'],
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': counts,
+            'created_at': timestamp(batch['created']),
+            'expires_at': timestamp(batch['created'] + 86400),
+            'ended_at': timestamp(batch['created'] + self.batch_delay) if ended else None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f"{self.url}/v1/messages/batches/{batch['id']}/results" if ended else None,
+        }
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -19,7 +19,55 @@ if [ $? -ne 0 ]; then
 fi
 echo ""
 
-# Test 2: Search Functionality
+# Test 2: Color Analysis
+echo "🔍 Running color analysis tests..."
+python3 tests/test_color_analysis.py
+if [ $? -ne 0 ]; then
+    EXIT_CODE=1
+fi
+echo ""
+
+# Test 3: Generated Indexes
+echo "🔍 Running index tests..."
+python3 tests/test_indexes.py
+if [ $? -ne 0 ]; then
+    EXIT_CODE=1
+fi
+echo ""
+
+# Test 4: Derivatives
+echo "🔍 Running derivative tests..."
+python3 tests/test_derivatives.py
+if [ $? -ne 0 ]; then
+    EXIT_CODE=1
+fi
+echo ""
+
+# Test 5: Metadata Store
+echo "🔍 Running metadata store tests..."
+python3 tests/test_metadata_store.py
+if [ $? -ne 0 ]; then
+    EXIT_CODE=1
+fi
+echo ""
+
+# Test 6: Metadata Writes and Recovery
+echo "🔍 Running metadata I/O tests..."
+python3 tests/test_metadata_io.py
+if [ $? -ne 0 ]; then
+    EXIT_CODE=1
+fi
+echo ""
+
+# Test 7: Metadata Validation (local stand-in API)
+echo "🔍 Running auto-validate tests..."
+python3 tests/test_auto_validate.py
+if [ $? -ne 0 ]; then
+    EXIT_CODE=1
+fi
+echo ""
+
+# Test 8: Search Functionality
 echo "🔍 Running search functionality tests..."
 node tests/test_search.js
 if [ $? -ne 0 ]; then
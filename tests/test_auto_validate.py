@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+Test suite for scripts/auto_validate_and_fix.py, against a local stand-in
+for the API (tests/fake_anthropic.py); no network or API key needed.
+Run with: python3 tests/test_auto_validate.py
+"""
+
+import base64
+import contextlib
+import io
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import auto_validate_and_fix
+import image_payload
+import integrate_new_image
+from fake_anthropic import FakeAnthropic, request_text
+
+# Paths
+IMAGE_DIR = Path("editorial_feed_images")
+METADATA_FILE = Path("images_metadata.json")
+
+SAMPLE_SIZE = 20
+LATENCY = 0.25
+
+class TestAutoValidate:
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+        self.warnings = 0
+
+    def test(self, name, condition, error_msg=""):
+        """Run a single test"""
+        if condition:
+            print(f"✓ {name}")
+            self.passed += 1
+            return True
+        else:
+            print(f"✗ {name}")
+            if error_msg:
+                print(f"  → {error_msg}")
+            self.failed += 1
+            return False
+
+FIXED = {"title": "Fixed Title", "description": "Fixed.", "conceptual": ["c"], "subject": ["s"], "style": ["st"]}
+
+def respond(request):
+    """Every third title is flagged; re-analysis (or a combined reply) gives fixed metadata"""
+    text = request_text(request)
+    if 'validating image metadata' in text:
+        title = text.split('- Title: "')[1].split('"')[0]
+        accurate = sum(map(ord, title)) % 3 != 0
+        verdict = {"accurate": accurate, "confidence": 0.9, "actual_content": "something else"}
+        if '"corrected"' in text:
+            verdict["corrected"] = None if accurate else FIXED
+        return json.dumps(verdict)
+    return "```json\n" + json.dumps(FIXED) + "\n```"
+
+def scrambled_latency(request):
+    """Latency that makes later requests finish first"""
+    return LATENCY * (1 + sum(map(ord, request_text(request))) % 5 / 5)
+
+def run_main(tmp, concurrency, server, *extra, payload_dir=None, setup=None):
+    """
+    Run main() (with `extra` options) on a sample collection in `tmp`,
+    after setup(image_dir, metadata) if given; returns (stdout, seconds,
+    metadata after, before)
+    """
+    with open(METADATA_FILE) as f:
+        metadata = json.load(f)[:SAMPLE_SIZE]
+
+    image_dir = Path(tmp) / "images"
+    image_dir.mkdir(parents=True, exist_ok=True)
+    for entry in metadata:
+        shutil.copy2(IMAGE_DIR / entry['newFilename'], image_dir / entry['newFilename'])
+    if setup:
+        setup(image_dir, metadata)
+    metadata_file = Path(tmp) / "images_metadata.json"
+    metadata_file.write_text(json.dumps(metadata, indent=2))
+
+    auto_validate_and_fix.IMAGE_DIR = image_dir
+    auto_validate_and_fix.METADATA_FILE = metadata_file
+    auto_validate_and_fix.CACHE_FILE = Path(tmp) / "responses.json"
+    auto_validate_and_fix.PAYLOAD_DIR = payload_dir or Path(tmp) / "payloads"
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        auto_validate_and_fix.main(['--concurrency', str(concurrency), '--base-url', server.url, *extra])
+    elapsed = time.perf_counter() - start
+    return output.getvalue().replace(str(tmp), '<tmp>'), elapsed, json.loads(metadata_file.read_text()), metadata
+
+def test_concurrency():
+    """Concurrent runs are faster, bounded, and identical to serial runs"""
+    tester = TestAutoValidate()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Both runs share encoded images, so only the requests are timed
+        payload_dir = Path(tmp) / "payloads"
+        with FakeAnthropic(respond) as server:
+            run_main(Path(tmp) / "warm", 10, server, payload_dir=payload_dir)
+
+        with FakeAnthropic(respond, latency=scrambled_latency) as server:
+            serial_output, serial_time, serial_result, original = run_main(
+                Path(tmp) / "serial", 1, server, payload_dir=payload_dir)
+            serial_peak = server.peak_in_flight
+
+        with FakeAnthropic(respond, latency=scrambled_latency) as server:
+            output, elapsed, result, _ = run_main(Path(tmp) / "concurrent", 10, server, payload_dir=payload_dir)
+            peak = server.peak_in_flight
+            requests = len(server.requests)
+
+    expected_flags = [e['newFilename'] for e in original if sum(map(ord, e['title'])) % 3 == 0]
+    fixed = [e['newFilename'] for e in result if e['title'] == 'Fixed Title']
+    tester.test(
+        "Flagged entries are re-analyzed and saved",
+        fixed == expected_flags and requests == SAMPLE_SIZE + len(expected_flags),
+        f"fixed {fixed}, expected {expected_flags}, {requests} requests"
+    )
+
+    tester.test(
+        "Output and saved metadata are identical to a serial run",
+        output.replace("10 at a time", "1 at a time") == serial_output and result == serial_result
+    )
+
+    tester.test(
+        "Requests in flight never exceed --concurrency",
+        serial_peak == 1 and 1 < peak <= 10,
+        f"peak {serial_peak} serial, {peak} concurrent"
+    )
+
+    tester.test(
+        "Concurrent run is several times faster than serial",
+        serial_time / elapsed >= 4,
+        f"{serial_time:.2f}s serial vs {elapsed:.2f}s concurrent ({serial_time / elapsed:.1f}x)"
+    )
+
+    return tester
+
+def test_cache():
+    """Repeated runs reuse cached responses; --force and changed images do not"""
+    tester = TestAutoValidate()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeAnthropic(respond) as server:
+            run_main(tmp, 10, server)
+            first = len(server.requests)
+            output, _, _, _ = run_main(tmp, 10, server)
+            second = len(server.requests) - first
+        tester.test(
+            "A repeated run sends no requests",
+            first > SAMPLE_SIZE and second == 0 and f"{first} from cache, 0 requested" in output,
+            f"{first} then {second} requests"
+        )
+
+        with FakeAnthropic(respond) as server:
+            run_main(tmp, 10, server, '--force')
+            forced = len(server.requests)
+        tester.test(
+            "--force sends every request again",
+            forced == first,
+            f"{forced} requests, expected {first}"
+        )
+
+        image = Path(tmp) / "images" / json.loads(METADATA_FILE.read_text())[0]['newFilename']
+        cache = auto_validate_and_fix.ResponseCache(Path(tmp) / "responses.json")
+        args = (auto_validate_and_fix.REANALYSIS_PROMPT, auto_validate_and_fix.MODEL, 1024)
+        cache.put(image, *args, {'title': 'Cached'})
+        renamed = Path(tmp) / "renamed.jpg"
+        shutil.copy2(image, renamed)
+        renamed_hit = cache.get(renamed, *args) == {'title': 'Cached'}
+        other_tokens = cache.get(image, args[0], args[1], 512)
+        with open(renamed, "ab") as f:
+            f.write(b'changed')
+        changed = cache.get(renamed, *args)
+        tester.test(
+            "Keys follow image content, prompt, model and max_tokens",
+            renamed_hit and other_tokens is None and changed is None
+        )
+
+        cache.put(image, *args, FIXED)
+        tester.test(
+            "integrate_new_image.py analyses are reused by re-analysis",
+            integrate_new_image.analyze_image(image, cache) == FIXED and
+            integrate_new_image.MODEL == auto_validate_and_fix.MODEL
+        )
+
+        # A reply missing fields is neither used from the cache nor cached
+        cache.put(image, *args, {'title': 'Cached'})
+        with mock.patch.object(integrate_new_image.client.messages, 'create',
+                               return_value=mock.Mock(content=[mock.Mock(text='{"title": "No Tags"}')])), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            analysis = integrate_new_image.analyze_image(image, cache)
+        tester.test(
+            "integrate_new_image.py checks cached and fresh analyses",
+            analysis is None and "missing title" in output.getvalue() and
+            cache.store.results[cache.key(image, *args)]['value'] == {'title': 'Cached'},
+            output.getvalue()
+        )
+
+        cache.store.results = {f"k{i}": {'created': time.time() - 10, 'used': float(i), 'value': i}
+                               for i in range(5)}
+        cache.store.results['old'] = {'created': 0, 'used': 1e12, 'value': 'old'}
+        cache.max_entries = 3
+        removed = cache.evict()
+        tester.test(
+            "Eviction drops expired and least recently used entries",
+            removed == 3 and sorted(cache.store.results) == ['k2', 'k3', 'k4'],
+            f"kept {sorted(cache.store.results)}"
+        )
+
+    return tester
+
+def sent_image(request):
+    """The image sent in a request, as raw bytes"""
+    return base64.b64decode(request['body']['messages'][0]['content'][0]['source']['data'])
+
+def test_payloads():
+    """Images are downscaled before sending, encoded once, and savings are reported"""
+    tester = TestAutoValidate()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeAnthropic(respond) as server:
+            output, _, _, original = run_main(tmp, 10, server)
+            sizes = {Image.open(io.BytesIO(sent_image(r))).size for r in server.requests}
+            sent_bytes = len(sent_image(server.requests[0]))
+        tester.test(
+            "Images are sent at --max-edge",
+            sizes == {(image_payload.MAX_EDGE, image_payload.MAX_EDGE)},
+            f"sizes {sizes}"
+        )
+
+        first = IMAGE_DIR / original[0]['newFilename']
+        tester.test(
+            "Savings are reported per request",
+            sent_bytes < first.stat().st_size / 1.5 and
+            re.search(r"📉 Images \(768px-q80\): \d+ KB → \d+ KB per request \(\d+% fewer bytes\), "
+                      r"~1399 → ~787 image tokens", output),
+            output[-400:]
+        )
+
+        payloads = image_payload.ImagePayloads(Path(tmp) / "payloads")
+        image = Path(tmp) / "images" / first.name
+        record = payloads.prepare(image)
+        mtime = Path(record['path']).stat().st_mtime_ns
+        with mock.patch.object(image_payload, 'encode_jpeg', side_effect=AssertionError("re-encoded")):
+            reused = payloads.prepare(image) == record and Path(record['path']).stat().st_mtime_ns == mtime
+        tester.test(
+            "Encoded payloads are cached by content hash across runs",
+            reused and len(list((Path(tmp) / "payloads").glob("*.jpg"))) == SAMPLE_SIZE
+        )
+
+        with FakeAnthropic(respond) as server:
+            output, _, _, _ = run_main(tmp, 10, server, '--max-edge', '0')
+            files = {(Path(tmp) / "images" / e['newFilename']).read_bytes() for e in original}
+            originals = all(sent_image(r) in files for r in server.requests)
+        tester.test(
+            "--max-edge 0 sends the original files, not cached downscaled responses",
+            server.requests and originals and "(original)" in output,
+            f"{len(server.requests)} requests"
+        )
+
+    tester.test(
+        "Token estimate follows the API's resizing",
+        image_payload.estimate_tokens(1024, 1024) == 1399 and image_payload.estimate_tokens(768, 768) == 787 and
+        image_payload.estimate_tokens(4000, 4000) == image_payload.estimate_tokens(1000, 1150)
+    )
+
+    return tester
+
+def first_flagged(metadata):
+    """Filename of the first entry respond() flags"""
+    return next(e['newFilename'] for e in metadata if sum(map(ord, e['title'])) % 3 == 0)
+
+def truncate_flagged(image_dir, metadata):
+    """Cut the first flagged image to its first 4 KB, so it cannot be decoded"""
+    path = image_dir / first_flagged(metadata)
+    path.write_bytes(path.read_bytes()[:4096])
+
+def test_undecodable():
+    """An image that cannot be decoded is reported for that file; the rest of the run goes on"""
+    tester = TestAutoValidate()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeAnthropic(respond) as server:
+            _, _, expected, original = run_main(Path(tmp) / "intact", 4, server)
+
+        broken = first_flagged(original)
+        with FakeAnthropic(respond) as server:
+            output, _, result, _ = run_main(Path(tmp) / "broken", 4, server, setup=truncate_flagged)
+        others = [e for e in result if e['newFilename'] != broken]
+        tester.test(
+            "A truncated image is reported as an error and the other entries are fixed",
+            f"cannot decode {broken}" in output and
+            others == [e for e in expected if e['newFilename'] != broken] and
+            next(e for e in result if e['newFilename'] == broken) in original,
+            output[-400:]
+        )
+
+        with FakeAnthropic(respond) as server:
+            output, _, result, _ = run_main(Path(tmp) / "batch", 4, server, '--batch', setup=truncate_flagged)
+            submitted = sum(len(batch['requests']) for batch in server.batches.values())
+        others = [e for e in result if e['newFilename'] != broken]
+        tester.test(
+            "--batch leaves an undecodable image out of the submission and reports it",
+            f"cannot decode {broken}" in output and
+            others == [e for e in expected if e['newFilename'] != broken] and submitted > 0,
+            output[-400:]
+        )
+
+        for mode in (('--combined',), ('--combined', '--batch')):
+            with FakeAnthropic(respond) as server:
+                output, _, result, _ = run_main(Path(tmp) / "-".join(mode), 4, server, *mode, setup=truncate_flagged)
+            others = [e for e in result if e['newFilename'] != broken]
+            tester.test(
+                f"{' '.join(mode)} reports an undecodable image without falling back or aborting",
+                f"cannot decode {broken}" in output and "unusable" not in output and
+                others == [e for e in expected if e['newFilename'] != broken],
+                output[-400:]
+            )
+
+        with FakeAnthropic(respond) as server:
+            output, _, result, _ = run_main(Path(tmp) / "raw", 4, server, '--max-edge', '0', setup=truncate_flagged)
+            sizes = [len(sent_image(r)) for r in server.requests]
+        tester.test(
+            "--max-edge 0 sends the file as is without decoding it",
+            result == expected and 4096 in sizes and "cannot" not in output,
+            output[-400:]
+        )
+
+        png = Path(tmp) / "image.png"
+        Image.open(IMAGE_DIR / original[0]['newFilename']).resize((64, 64)).save(png)
+        text = Path(tmp) / "notes.jpg"
+        text.write_text("not an image")
+        payloads = image_payload.ImagePayloads(Path(tmp) / "payloads", max_edge=0)
+        try:
+            image_payload.image_source(text)
+            rejected = False
+        except image_payload.PayloadError:
+            rejected = True
+        tester.test(
+            "The media type follows the file format, and non-images are rejected",
+            payloads.source(png)['media_type'] == 'image/png' and
+            image_payload.image_source(IMAGE_DIR / original[0]['newFilename'])['media_type'] == 'image/jpeg' and
+            rejected
+        )
+
+    return tester
+
+def test_combined():
+    """--combined validates and corrects in one request, falling back to two steps"""
+    tester = TestAutoValidate()
+
+    def unusable(request):
+        # Every fifth combined reply is truncated; the rest are fine
+        text = request_text(request)
+        if '"corrected"' in text and sum(map(ord, text)) % 5 == 0:
+            return '{"accurate": false, "confidence": 0.9, "corrected": {"title": "Cut'
+        return respond(request)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeAnthropic(respond) as server:
+            _, _, expected, original = run_main(Path(tmp) / "two-step", 10, server)
+            two_step = len(server.requests)
+
+        with FakeAnthropic(respond) as server:
+            output, _, result, _ = run_main(Path(tmp) / "combined", 10, server, '--combined')
+            combined = len(server.requests)
+        flagged = two_step - SAMPLE_SIZE
+        tester.test(
+            "Combined mode saves the same fixes with one request per image",
+            result == expected and combined == SAMPLE_SIZE and flagged > 0 and
+            f"({flagged} corrected in the same request, 0 to re-analyze)" in output,
+            f"{combined} requests vs {two_step} two-step"
+        )
+
+        with FakeAnthropic(unusable) as server:
+            output, _, result, _ = run_main(Path(tmp) / "fallback", 10, server, '--combined')
+            texts = [request_text(r['body']) for r in server.requests]
+        fallbacks = sum('"corrected"' in text and sum(map(ord, text)) % 5 == 0 for text in texts)
+        tester.test(
+            "Unusable combined replies fall back to validation and re-analysis",
+            result == expected and fallbacks > 0 and
+            sum('"accurate": true/false' in t and '"corrected"' not in t for t in texts) == fallbacks,
+            f"{fallbacks} fallbacks, {len(texts)} requests"
+        )
+
+        with FakeAnthropic(unusable) as server:
+            output, _, result, _ = run_main(Path(tmp) / "batch", 10, server, '--combined', '--batch')
+        tester.test(
+            "Combined mode works with --batch, including the fallback",
+            result == expected and "validating them separately" in output
+        )
+
+    verdict = auto_validate_and_fix.combined_verdict(
+        {"accurate": False, "confidence": 0.8, "corrected": {"title": "Only A Title"}})
+    try:
+        auto_validate_and_fix.combined_verdict({"title": "A re-analysis, not a verdict"})
+        rejected = False
+    except ValueError:
+        rejected = True
+    def rejected_combined(request):
+        # A non-retryable API error for every combined request
+        if '"corrected"' in request_text(request):
+            return 400, {'type': 'error', 'error': {'type': 'invalid_request_error', 'message': 'rejected'}}
+        return respond(request)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ((), ('--batch',)):
+            with FakeAnthropic(rejected_combined) as server:
+                output, _, result, original = run_main(Path(tmp) / "-".join(mode), 10, server, '--combined', *mode)
+                texts = [request_text(item['params']) for batch in server.batches.values()
+                         for item in batch['requests']] or [request_text(r['body']) for r in server.requests]
+            tester.test(
+                f"API errors are reported, not retried as two requests ({' '.join(('--combined',) + mode)})",
+                result == original and "rejected" in output and "unusable" not in output and
+                all('"corrected"' in text for text in texts),
+                f"{len(texts)} requests"
+            )
+
+    tester.test(
+        "A malformed correction is dropped; a reply without a verdict is rejected",
+        'corrected' not in verdict and rejected
+    )
+
+    return tester
+
+def test_errors():
+    """API errors leave entries unchanged instead of aborting the run"""
+    tester = TestAutoValidate()
+
+    def failing(request):
+        return {"type": "error"} if 'validating' in request_text(request) else respond(request)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeAnthropic(failing) as server:
+            output, _, result, original = run_main(tmp, 4, server)
+
+    tester.test(
+        "Unparseable replies count as accurate and nothing is rewritten",
+        result == original and "Validation error" in output and "No fixes needed" in output,
+        output[-300:]
+    )
+
+    def malformed(request):
+        # Well-formed JSON, but a verdict without "accurate" or an analysis without tags
+        reply = json.loads(respond(request).strip('`json\n'))
+        reply.pop('accurate' if 'validating' in request_text(request) else 'style', None)
+        return json.dumps(reply)
+
+    def no_tags(request):
+        if 'validating' in request_text(request):
+            return respond(request)
+        return json.dumps({"title": "Fixed Title", "description": "Fixed."})
+
+    for server_respond, message in ((malformed, "no accuracy verdict"), (no_tags, "missing title")):
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = []
+            for mode in ((), ('--batch',)):
+                with FakeAnthropic(server_respond) as server:
+                    output, _, result, original = run_main(tmp, 4, server, *mode)
+                runs.append(result == original and message in output)
+
+            # Nothing bad was cached: a later run gets and applies real fixes
+            with FakeAnthropic(respond) as server:
+                _, _, fixed, _ = run_main(tmp, 4, server)
+        tester.test(
+            f"Replies missing required fields are reported, not applied or cached ({server_respond.__name__})",
+            all(runs) and any(e['title'] == 'Fixed Title' for e in fixed),
+            f"runs {runs}"
+        )
+
+    return tester
+
+def test_batch():
+    """--batch gives the same result through Message Batches, resubmitting failures"""
+    tester = TestAutoValidate()
+    auto_validate_and_fix.BATCH_POLL_INITIAL = 0.05
+
+    attempts = {}
+    def flaky(params):
+        # Every fourth distinct request fails on its first submission
+        key = json.dumps(params['messages'])
+        attempts[key] = attempts.get(key, 0) + 1
+        if attempts[key] == 1 and len(attempts) % 4 == 0:
+            return None
+        return respond(params)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeAnthropic(respond) as server:
+            _, _, expected, _ = run_main(Path(tmp) / "concurrent", 10, server)
+
+        with FakeAnthropic(flaky, batch_delay=0.3) as server:
+            output, _, result, _ = run_main(Path(tmp) / "batch", 10, server, '--batch')
+            posts = [request['path'] for request in server.requests]
+            sizes = [len(batch['requests']) for batch in server.batches.values()]
+            polls = server.polls
+            custom_ids = [[r['custom_id'] for r in batch['requests']] for batch in server.batches.values()]
+
+    failures = sum(1 for count in attempts.values() if count > 1)
+    tester.test(
+        "Batch run saves the same metadata as a concurrent run",
+        result == expected
+    )
+
+    tester.test(
+        "Requests go through batches only; failed ones are resubmitted",
+        sum(sizes) == len(attempts) + failures and failures > 0 and "Resubmitting" in output and
+        '/v1/messages' not in posts,
+        f"batch sizes {sizes}, {failures} failures"
+    )
+
+    tester.test(
+        "Status polls back off instead of spinning",
+        len(sizes) <= polls <= len(sizes) * 5,
+        f"{polls} polls for {len(sizes)} batches"
+    )
+
+    tester.test(
+        "custom_ids are valid and unique per batch",
+        all(len(set(ids)) == len(ids) and all(re.fullmatch(r'[A-Za-z0-9_-]{1,64}', i) for i in ids)
+            for ids in custom_ids)
+    )
+
+    # Payloads are built chunk by chunk: no more than one submission ahead
+    built, snapshots = [], []
+    image_request = auto_validate_and_fix.image_request
+    def counting_request(*args):
+        built.append(args[0])
+        return image_request(*args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeAnthropic(respond) as server, \
+                mock.patch.object(auto_validate_and_fix, 'BATCH_MAX_REQUESTS', 4), \
+                mock.patch.object(auto_validate_and_fix, 'image_request', counting_request):
+            create_batch = server.create_batch
+            def recording_create(requests):
+                snapshots.append((len(built), len(requests)))
+                return create_batch(requests)
+            server.create_batch = recording_create
+            _, _, chunked, _ = run_main(tmp, 10, server, '--batch')
+
+    submitted = [sum(size for _, size in snapshots[:i + 1]) for i in range(len(snapshots))]
+    tester.test(
+        "Batch payloads are built per submission, not all up front",
+        chunked == expected and len(snapshots) > SAMPLE_SIZE // 4 and
+        all(count <= done + 1 for (count, _), done in zip(snapshots, submitted)),
+        f"(built, submitted) {[(count, done) for (count, _), done in zip(snapshots, submitted)]}"
+    )
+
+    taken = {}
+    for name in ['a.b.jpg', 'a_b.jpg', 'x' * 100 + '.jpg', 'x' * 100 + '.png']:
+        taken[auto_validate_and_fix.batch_custom_id('validate', name, taken)] = name
+    tester.test(
+        "Colliding and overlong filenames still get distinct custom_ids",
+        len(taken) == 4 and all(len(i) <= 64 for i in taken),
+        f"{list(taken)}"
+    )
+
+    return tester
+
+def main():
+    """Run all tests"""
+    print("=" * 80)
+    print("AUTO-VALIDATE TESTS")
+    print("=" * 80)
+    print()
+
+    all_results = []
+
+    print("⚡ Concurrency tests:")
+    all_results.append(test_concurrency())
+    print()
+
+    print("📦 Batch tests:")
+    all_results.append(test_batch())
+    print()
+
+    print("💾 Response cache tests:")
+    all_results.append(test_cache())
+    print()
+
+    print("📉 Payload tests:")
+    all_results.append(test_payloads())
+    all_results.append(test_undecodable())
+    print()
+
+    print("🪄 Combined mode tests:")
+    all_results.append(test_combined())
+    print()
+
+    print("🧯 Error handling tests:")
+    all_results.append(test_errors())
+    print()
+
+    # Summary
+    total_passed = sum(r.passed for r in all_results)
+    total_failed = sum(r.failed for r in all_results)
+
+    print("=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    print(f"✓ Passed: {total_passed}")
+    print(f"✗ Failed: {total_failed}")
+    print()
+
+    if total_failed > 0:
+        print("❌ TESTS FAILED - Please fix the issues above")
+        sys.exit(1)
+    else:
+        print("✅ ALL TESTS PASSED")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Test suite for the color extraction in scripts/analyze_colors.py.
+Run with: python3 tests/test_color_analysis.py
+"""
+
+import contextlib
+import io
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import tempfile
+from unittest import mock
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import analyze_colors
+import color_names
+import content_cache
+
+# Paths
+IMAGE_DIR = Path("editorial_feed_images")
+
+class TestColorAnalysis:
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+        self.warnings = 0
+
+    def test(self, name, condition, error_msg=""):
+        """Run a single test"""
+        if condition:
+            print(f"✓ {name}")
+            self.passed += 1
+            return True
+        else:
+            print(f"✗ {name}")
+            if error_msg:
+                print(f"  → {error_msg}")
+            self.failed += 1
+            return False
+
+def synthetic_images():
+    """Small images that exercise ties, filtering and grouping edge cases"""
+    rng = random.Random(1234)
+
+    noise = Image.new('RGB', (120, 90))
+    noise.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(120 * 90)])
+
+    # Few distinct colors with equal counts, so ordering depends on tie-breaking
+    ties = Image.new('RGB', (60, 60))
+    palette = [(200, 30, 30), (30, 200, 30), (30, 30, 200), (210, 40, 40), (250, 250, 250)]
+    ties.putdata([palette[i % len(palette)] for i in range(60 * 60)])
+
+    gradient = Image.linear_gradient('L').convert('RGB').resize((256, 64))
+
+    return {
+        'noise': noise,
+        'ties': ties,
+        'gradient': gradient,
+        'all-white': Image.new('RGB', (40, 40), (255, 255, 255)),
+        'all-black': Image.new('RGB', (40, 40), (0, 0, 0)),
+    }
+
+def test_numpy_matches_reference():
+    """The numpy backend must produce exactly the reference output"""
+    tester = TestColorAnalysis()
+
+    if 'numpy' not in analyze_colors.PALETTE_BACKENDS:
+        print("⚠ numpy not installed, skipping backend equivalence tests")
+        return tester
+
+    for name, img in synthetic_images().items():
+        for num_colors in (1, 5, 8):
+            reference = analyze_colors.palette_reference(img, num_colors)
+            vectorized = analyze_colors.palette_numpy(img, num_colors)
+            tester.test(
+                f"numpy palette matches reference ({name}, {num_colors} colors)",
+                reference == vectorized,
+                f"reference={reference} numpy={vectorized}"
+            )
+
+    mismatches = []
+    image_files = sorted(IMAGE_DIR.glob("*.jpg"))
+    for image_path in image_files:
+        reference = analyze_colors.extract_colors(image_path, backend='reference')
+        vectorized = analyze_colors.extract_colors(image_path, backend='numpy')
+        if reference != vectorized:
+            mismatches.append(image_path.name)
+
+    tester.test(
+        f"numpy extract_colors matches reference on {len(image_files)} collection images",
+        len(image_files) > 0 and not mismatches,
+        f"Mismatches: {', '.join(mismatches[:5])}" +
+        (f" and {len(mismatches)-5} more" if len(mismatches) > 5 else "")
+    )
+
+    return tester
+
+def test_extract_colors_structure():
+    """extract_colors keeps the analyzed_colors shape used in the metadata"""
+    tester = TestColorAnalysis()
+
+    image_path = next(IMAGE_DIR.glob("*.jpg"), None)
+    if image_path is None:
+        tester.test("Collection has images", False, f"No images in {IMAGE_DIR}")
+        return tester
+
+    for backend in sorted(analyze_colors.PALETTE_BACKENDS):
+        colors = analyze_colors.extract_colors(image_path, backend=backend)
+        tester.test(
+            f"extract_colors returns dominant/accent/named lists ({backend})",
+            colors is not None and all(isinstance(colors.get(k), list) for k in ('dominant', 'accent', 'named')),
+            f"Got {colors}"
+        )
+        tester.test(
+            f"extract_colors returns hex strings ({backend})",
+            colors is not None and colors['dominant'] and all(
+                c.startswith('#') and len(c) == 7 for c in colors['dominant'] + colors['accent']
+            ),
+            f"Got {colors}"
+        )
+
+    return tester
+
+def write_collection(directory):
+    """Save the synthetic images and a minimal metadata file under `directory`"""
+    image_dir = directory / "editorial_feed_images"
+    image_dir.mkdir()
+    metadata = []
+    for name, img in synthetic_images().items():
+        img.save(image_dir / f"{name}.png")
+        metadata.append({'newFilename': f"{name}.png", 'tags': {'colors': []}})
+    metadata_file = directory / "images_metadata.json"
+    metadata_file.write_text(json.dumps(metadata, indent=2))
+    return image_dir, metadata_file
+
+def run_analyze(directory, *extra):
+    """Run analyze_colors.main on a collection in `directory`; returns the names it decoded"""
+    analyzed = []
+    analyze_files = analyze_colors.analyze_files
+
+    def recording(paths, *args, **kwargs):
+        analyzed.extend(path.name for path in paths)
+        return analyze_files(paths, *args, **kwargs)
+
+    with mock.patch.multiple(analyze_colors, IMAGE_DIR=directory / "editorial_feed_images",
+                             METADATA_FILE=directory / "images_metadata.json",
+                             CACHE_FILE=directory / ".cache" / "analyzed_colors.json",
+                             analyze_files=recording), \
+            contextlib.redirect_stdout(io.StringIO()):
+        analyze_colors.main(list(extra))
+    return analyzed
+
+def test_parallel_matches_serial():
+    """Process and thread pools return the serial results, in input order"""
+    tester = TestColorAnalysis()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_dir, _ = write_collection(Path(tmp))
+        # Repeated paths and chunksize=1 spread the images across both workers
+        paths = sorted(image_dir.glob("*.png")) * 3
+
+        serial = list(analyze_colors.analyze_files(paths, workers=1))
+        for executor in ('process', 'thread'):
+            parallel = list(analyze_colors.analyze_files(paths, workers=2, executor=executor, chunksize=1))
+            mismatches = [path.name for path, a, b in zip(paths, serial, parallel) if a != b]
+            tester.test(
+                f"{executor} pool with 2 workers matches the serial run entry for entry",
+                len(parallel) == len(serial) and all(serial) and not mismatches,
+                f"{len(parallel)}/{len(serial)} results, mismatches: {mismatches}"
+            )
+
+    return tester
+
+def test_content_cache():
+    """ContentCache hits on unchanged files and misses when content or version changes"""
+    tester = TestColorAnalysis()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        image_dir, _ = write_collection(tmp)
+        path = image_dir / "noise.png"
+        cache_file = tmp / "cache.json"
+
+        cache = content_cache.ContentCache(cache_file, "1")
+        cache.put(path, "noise colors")
+        cache.save()
+
+        hashed = []
+        file_sha256 = content_cache.file_sha256
+        with mock.patch.object(content_cache, 'file_sha256',
+                               side_effect=lambda p: hashed.append(p) or file_sha256(p)):
+            cache = content_cache.ContentCache(cache_file, "1")
+            tester.test(
+                "Unchanged file hits without being re-hashed",
+                cache.get(path) == "noise colors" and not hashed,
+                f"got {cache.get(path)!r}, hashed {hashed}"
+            )
+
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            tester.test(
+                "Touched file is re-hashed and still hits on the same content",
+                cache.get(path) == "noise colors" and hashed == [path],
+                f"hashed {hashed}"
+            )
+
+            # Same size, different pixels, new mtime
+            data = bytearray(path.read_bytes())
+            data[-20] ^= 0xff
+            path.write_bytes(data)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+            tester.test(
+                "Content changed at the same size misses",
+                path.stat().st_size == stat.st_size and cache.get(path) is None
+            )
+
+            synthetic_images()['ties'].save(path)
+            tester.test(
+                "Content changed to a different size misses",
+                path.stat().st_size != stat.st_size and cache.get(path) is None
+            )
+
+        cache = content_cache.ContentCache(cache_file, "1")
+        cache.put(path, "ties colors")
+        cache.save()
+        stale = content_cache.ContentCache(cache_file, "2")
+        tester.test(
+            "A new cache version drops results but keeps file hashes",
+            stale.get(path) is None and not stale.results and str(path) in stale.files
+        )
+
+    return tester
+
+def test_analyze_colors_cache():
+    """analyze_colors decodes only new or changed images unless --force is given"""
+    tester = TestColorAnalysis()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        image_dir, metadata_file = write_collection(tmp)
+        names = [entry['newFilename'] for entry in json.loads(metadata_file.read_text())]
+        cache_file = tmp / ".cache" / "analyzed_colors.json"
+
+        first = run_analyze(tmp)
+        result = json.loads(metadata_file.read_text())
+        tester.test(
+            "First run analyzes every image",
+            first == names and all('analyzed_colors' in e['tags'] for e in result),
+            f"analyzed {first}"
+        )
+
+        second = run_analyze(tmp)
+        tester.test(
+            "Second run reuses the cache for every image",
+            second == [] and json.loads(metadata_file.read_text()) == result,
+            f"analyzed {second}"
+        )
+
+        synthetic_images()['noise'].transpose(Image.FLIP_LEFT_RIGHT).save(image_dir / "ties.png")
+        changed = run_analyze(tmp)
+        tester.test(
+            "A modified image is analyzed again",
+            changed == ["ties.png"],
+            f"analyzed {changed}"
+        )
+
+        cached = json.loads(cache_file.read_text())
+        with mock.patch.object(analyze_colors, 'ALGORITHM_VERSION', 'test-bump'):
+            bumped = run_analyze(tmp)
+        tester.test(
+            "A new cache_version re-analyzes every image",
+            bumped == names and json.loads(cache_file.read_text())['version'] != cached['version'],
+            f"analyzed {bumped}"
+        )
+
+        forced = run_analyze(tmp, '--force')
+        tester.test(
+            "--force re-analyzes every image",
+            forced == names,
+            f"analyzed {forced}"
+        )
+
+        (image_dir / "all-black.png").unlink()
+        run_analyze(tmp)
+        kept = json.loads(cache_file.read_text())
+        run_analyze(tmp, '--prune')
+        pruned = json.loads(cache_file.read_text())
+        black = str(image_dir / "all-black.png")
+        tester.test(
+            "Without --prune a deleted file stays in the cache",
+            black in kept['files']
+        )
+        tester.test(
+            "--prune drops the deleted file and its result",
+            black not in pruned['files'] and len(pruned['files']) == len(names) - 1
+            and len(pruned['results']) < len(kept['results']),
+            f"files {sorted(pruned['files'])}"
+        )
+
+    return tester
+
+def test_color_lookup():
+    """The quantized lookup table is current and agrees with an exact scan"""
+    tester = TestColorAnalysis()
+
+    palette = color_names.load_palette()
+    tester.test(
+        "color_lookup.bin is in sync with color_palette.json",
+        color_names.read_lookup(palette) is not None,
+        "Run: python3 scripts/color_names.py"
+    )
+
+    names = [name for name, _ in palette]
+    tester.test(
+        "Palette names are unique",
+        len(names) == len(set(names)),
+        f"{len(names) - len(set(names))} duplicate names"
+    )
+
+    # Random colors, every palette color itself and both corners of every bin
+    rng = random.Random(42)
+    samples = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(20000)]
+    samples += [rgb for _, rgb in palette]
+    step = 1 << color_names.LOOKUP_SHIFT
+    samples += [(i * step + offset,) * 3 for i in range(color_names.LOOKUP_BINS) for offset in (0, step - 1)]
+    mismatches = []
+    for rgb in samples:
+        exact = min(palette, key=lambda item: analyze_colors.color_distance(rgb, item[1]))[0]
+        if color_names.get_color_name(rgb) != exact:
+            mismatches.append((rgb, color_names.get_color_name(rgb), exact))
+
+    tester.test(
+        f"Lookup matches an exact nearest-color scan for all {len(samples)} sample colors",
+        not mismatches,
+        f"{len(mismatches)} differ, e.g. {mismatches[:3]}"
+    )
+
+    tester.test(
+        "An exact palette color gets its own name (chartreuse #7FFF00)",
+        color_names.get_color_name((0x7f, 0xff, 0x00)) == 'chartreuse'
+    )
+
+    return tester
+
+def main():
+    """Run all tests"""
+    print("=" * 80)
+    print("COLOR ANALYSIS TESTS")
+    print("=" * 80)
+    print()
+
+    all_results = []
+
+    print("🎨 Backend equivalence tests:")
+    all_results.append(test_numpy_matches_reference())
+    print()
+
+    print("🏷  Color naming tests:")
+    all_results.append(test_color_lookup())
+    print()
+
+    print("📄 Output structure tests:")
+    all_results.append(test_extract_colors_structure())
+    print()
+
+    print("⚡ Parallel analysis tests:")
+    all_results.append(test_parallel_matches_serial())
+    print()
+
+    print("💾 Cache tests:")
+    all_results.append(test_content_cache())
+    all_results.append(test_analyze_colors_cache())
+    print()
+
+    # Summary
+    total_passed = sum(r.passed for r in all_results)
+    total_failed = sum(r.failed for r in all_results)
+
+    print("=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    print(f"✓ Passed: {total_passed}")
+    print(f"✗ Failed: {total_failed}")
+    print()
+
+    if total_failed > 0:
+        print("❌ TESTS FAILED - Please fix the issues above")
+        sys.exit(1)
+    else:
+        print("✅ ALL TESTS PASSED")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test suite for scripts/build_derivatives.py.
+Run with: python3 tests/test_derivatives.py
+"""
+
+import contextlib
+import io
+import json
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from PIL import Image
+
+import build_derivatives
+
+# Paths
+IMAGE_DIR = Path("editorial_feed_images")
+
+class TestDerivatives:
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+        self.warnings = 0
+
+    def test(self, name, condition, error_msg=""):
+        """Run a single test"""
+        if condition:
+            print(f"✓ {name}")
+            self.passed += 1
+            return True
+        else:
+            print(f"✗ {name}")
+            if error_msg:
+                print(f"  → {error_msg}")
+            self.failed += 1
+            return False
+
+def test_build():
+    """Derivatives have the right sizes and formats and are built incrementally"""
+    tester = TestDerivatives()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = sorted(IMAGE_DIR.glob("*.jpg"))[0]
+        image_path = tmp / source.name
+        shutil.copy2(source, image_path)
+
+        output_dir, cache_file = tmp / "derivatives", tmp / "cache.json"
+        records_by_path, built = build_derivatives.build([image_path], output_dir=output_dir, cache_file=cache_file)
+        records = records_by_path.get(image_path, [])
+
+        expected = {
+            (fmt, min(width, Image.open(source).width))
+            for width in build_derivatives.DERIVATIVE_WIDTHS for fmt in build_derivatives.FORMATS
+        }
+        tester.test(
+            "Every width is built in every format",
+            {(r['format'], r['width']) for r in records} == expected,
+            f"Got {sorted((r['format'], r['width']) for r in records)}"
+        )
+
+        mismatched = []
+        for record in records:
+            with Image.open(record['path']) as img:
+                if img.size != (record['width'], record['height']) or \
+                        Path(record['path']).stat().st_size != record['bytes']:
+                    mismatched.append(record['path'])
+                if record['format'] == 'jpeg' and not img.info.get('progressive'):
+                    mismatched.append(f"{record['path']} (not progressive)")
+        tester.test(
+            "Records match the files on disk (size, dimensions, progressive JPEG)",
+            records and not mismatched,
+            f"{mismatched[:3]}"
+        )
+
+        tester.test(
+            "Derivatives are smaller than the original",
+            all(r['bytes'] < source.stat().st_size for r in records)
+        )
+
+        _, built_again = build_derivatives.build([image_path], output_dir=output_dir, cache_file=cache_file)
+        tester.test(
+            "Unchanged images are not rebuilt",
+            built == 1 and built_again == 0,
+            f"Built {built}, then {built_again}"
+        )
+
+        renamed = image_path.rename(tmp / "renamed.jpg")
+        renamed_records, built_renamed = build_derivatives.build([renamed], output_dir=output_dir, cache_file=cache_file)
+        tester.test(
+            "Renamed images reuse their derivatives",
+            built_renamed == 0 and renamed_records[renamed] == records,
+            f"Built {built_renamed}"
+        )
+
+    return tester
+
+def test_index():
+    """Records go to derivatives/index.json, not the tracked metadata"""
+    tester = TestDerivatives()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        image_dir = tmp / "images"
+        image_dir.mkdir()
+        metadata = []
+        for source in sorted(IMAGE_DIR.glob("*.jpg"))[:2]:
+            shutil.copy2(source, image_dir / source.name)
+            # An entry from before the sidecar, with records in the metadata
+            metadata.append({'newFilename': source.name, 'derivatives': [{'path': 'derivatives/old.webp'}]})
+        metadata_file = tmp / "images_metadata.json"
+        metadata_file.write_text(json.dumps(metadata, indent=2))
+
+        output_dir = tmp / "derivatives"
+        output_dir.mkdir()
+        (output_dir / "stale.webp").write_bytes(b'stale')
+        with mock.patch.multiple(build_derivatives, IMAGE_DIR=image_dir, METADATA_FILE=metadata_file,
+                                 DERIVATIVE_DIR=output_dir, INDEX_FILE=output_dir / "index.json",
+                                 CACHE_FILE=tmp / "cache.json"), \
+                contextlib.redirect_stdout(io.StringIO()):
+            build_derivatives.main(['--prune'])
+
+        saved = json.loads(metadata_file.read_text())
+        index = json.loads((output_dir / "index.json").read_text())
+        tester.test(
+            "The metadata keeps no derivative records",
+            all('derivatives' not in entry for entry in saved) and len(saved) == len(metadata)
+        )
+        tester.test(
+            "derivatives/index.json lists every image's records",
+            sorted(index['images']) == sorted(entry['newFilename'] for entry in metadata) and
+            all(Path(r['path']).exists() for records in index['images'].values() for r in records)
+        )
+        tester.test(
+            "--prune deletes stale files but keeps the index",
+            not (output_dir / "stale.webp").exists() and (output_dir / "index.json").exists()
+        )
+
+    return tester
+
+def main():
+    """Run all tests"""
+    print("=" * 80)
+    print("DERIVATIVE TESTS")
+    print("=" * 80)
+    print()
+
+    all_results = []
+
+    print("🖼  Derivative build tests:")
+    all_results.append(test_build())
+    all_results.append(test_index())
+    print()
+
+    # Summary
+    total_passed = sum(r.passed for r in all_results)
+    total_failed = sum(r.failed for r in all_results)
+
+    print("=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    print(f"✓ Passed: {total_passed}")
+    print(f"✗ Failed: {total_failed}")
+    print()
+
+    if total_failed > 0:
+        print("❌ TESTS FAILED - Please fix the issues above")
+        sys.exit(1)
+    else:
+        print("✅ ALL TESTS PASSED")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
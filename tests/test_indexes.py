@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Test suite for the generated indexes in data/.
+Run with: python3 tests/test_indexes.py
+"""
+
+from contextlib import redirect_stdout
+import io
+import json
+from pathlib import Path
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import numpy as np
+from PIL import Image
+
+import image_hashes
+import palette_index
+import search_index
+
+# Paths
+METADATA_FILE = Path("images_metadata.json")
+
+class TestIndexes:
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+        self.warnings = 0
+
+    def test(self, name, condition, error_msg=""):
+        """Run a single test"""
+        if condition:
+            print(f"✓ {name}")
+            self.passed += 1
+            return True
+        else:
+            print(f"✗ {name}")
+            if error_msg:
+                print(f"  → {error_msg}")
+            self.failed += 1
+            return False
+
+def brute_force_distance(a, b):
+    """Two-way weighted nearest-color distance, one palette pair at a time"""
+    def one_way(src, dst):
+        total = 0.0
+        for color in src:
+            if color[3] <= 0:
+                continue
+            total += color[3] * min(
+                float(np.linalg.norm(color[:3] - other[:3])) for other in dst if other[3] > 0
+            )
+        return total
+    return (one_way(a, b) + one_way(b, a)) / 2
+
+def test_palette_index():
+    """Palette index is current and its vectorized search is correct"""
+    tester = TestIndexes()
+
+    with open(METADATA_FILE) as f:
+        metadata = json.load(f)
+
+    try:
+        index = palette_index.PaletteIndex.load()
+    except (OSError, ValueError) as e:
+        tester.test("Palette index loads", False, str(e))
+        return tester
+
+    tester.test(
+        "Palette index matches images_metadata.json",
+        index.filenames == [entry['newFilename'] for entry in metadata] and
+        np.allclose(index.palettes, palette_index.PaletteIndex.from_metadata(metadata).palettes),
+        "Run: python3 scripts/palette_index.py build"
+    )
+
+    entry = next(e for e in metadata if e['tags'].get('analyzed_colors', {}).get('dominant'))
+    analyzed = entry['tags']['analyzed_colors']
+    results = index.query(palette_index.analyzed_vectors(analyzed['dominant'], analyzed['accent']), k=1)
+    tester.test(
+        "Querying an image's own palette returns a zero-distance match",
+        results and results[0][1] < 1e-3,
+        f"Got {results}"
+    )
+
+    query_row = index.rows[entry['newFilename']]
+    expected = sorted(
+        (brute_force_distance(index.palettes[query_row], index.palettes[row]), index.filenames[row])
+        for row in range(len(index.filenames)) if row != query_row
+    )[:5]
+    results = index.query_image(entry['newFilename'], k=5)
+    tester.test(
+        "Vectorized query_image matches brute-force distances",
+        len(results) == len(expected) and all(
+            abs(distance - expected_distance) < 1e-2
+            for (_, distance), (expected_distance, _) in zip(results, expected)
+        ),
+        f"Got {results}, expected {expected}"
+    )
+    tester.test(
+        "query_image excludes the query image",
+        entry['newFilename'] not in [filename for filename, _ in results]
+    )
+
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            palette_index.main(['query', '--image', 'not-an-image.jpg'])
+        code = None
+    except SystemExit as e:
+        code = e.code
+    tester.test(
+        "query --image with an unknown filename exits 1 with an error",
+        code == 1 and "not in the palette index" in output.getvalue(),
+        f"Exit code {code!r}, output {output.getvalue()!r}"
+    )
+
+    try:
+        empty = (index.query_palette([], k=5),
+                 index.query(palette_index.analyzed_vectors([], []), k=5))
+    except Exception as e:
+        empty = e
+    tester.test(
+        "An empty query palette (no extracted colors) returns no matches",
+        empty == ([], []),
+        f"Got {empty!r}"
+    )
+
+    return tester
+
+def test_image_hashes():
+    """Perceptual hashes are current and near-duplicate search is exact"""
+    tester = TestIndexes()
+
+    with open(METADATA_FILE) as f:
+        metadata = json.load(f)
+
+    try:
+        index = image_hashes.HashIndex.load()
+    except (OSError, ValueError) as e:
+        tester.test("Image hashes load", False, str(e))
+        return tester
+
+    tester.test(
+        "Image hashes cover every image in images_metadata.json",
+        list(index.hashes) == [entry['newFilename'] for entry in metadata],
+        "Run: python3 scripts/image_hashes.py build"
+    )
+
+    filename = metadata[0]['newFilename']
+    with open(image_hashes.HASHES_FILE) as f:
+        stored = json.load(f)['hashes'][filename]
+    tester.test(
+        f"Stored hashes match a fresh hash of {filename}",
+        image_hashes.hash_image(image_hashes.IMAGE_DIR / filename) == stored,
+        "Run: python3 scripts/image_hashes.py build --force"
+    )
+
+    # A resized, recompressed copy is a near-duplicate of its original
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_path = Path(tmp) / "copy.jpg"
+        Image.open(image_hashes.IMAGE_DIR / filename).resize((300, 300)).save(copy_path, quality=60)
+        results = index.near_file(copy_path)
+    tester.test(
+        "A resized copy finds its original",
+        results and results[0][1] == filename,
+        f"Got {results[:3]}"
+    )
+
+    # Multi-index search returns exactly what a linear scan does
+    rng = random.Random(0)
+    values = [rng.getrandbits(64) for _ in range(2000)]
+    table = image_hashes.MultiIndexHash((value, i) for i, value in enumerate(values))
+    mismatches = 0
+    for k in (0, 3, 6, 10):
+        for value in values[:20]:
+            query = value ^ rng.getrandbits(64) & rng.getrandbits(64) & rng.getrandbits(64)
+            expected = sorted(
+                (image_hashes.hamming(query, other), i) for i, other in enumerate(values)
+                if image_hashes.hamming(query, other) <= k
+            )
+            if table.search(query, k) != expected:
+                mismatches += 1
+    tester.test(
+        "Multi-index search matches a linear scan",
+        mismatches == 0,
+        f"{mismatches} queries differ"
+    )
+
+    clusters = index.clusters()
+    tester.test(
+        "Duplicate clusters are disjoint",
+        sum(len(group) for group in clusters) == len({name for group in clusters for name in group})
+    )
+
+    # Gears, suitcases and olympic rings share smooth gradient layouts that
+    # pHash alone puts within a few bits; none of them may cluster together
+    subjects = ('gears', 'suitcase', 'olympic')
+    mixed = [
+        group for group in clusters
+        if len({subject for name in group for subject in subjects if subject in name}) > 1
+    ]
+    tester.test(
+        "Images of different subjects do not cluster",
+        not mixed,
+        f"Mixed clusters: {mixed}"
+    )
+
+    # Unrelated synthetic pictures do not cluster either
+    with tempfile.TemporaryDirectory() as tmp:
+        hashes = {}
+        for name, draw in (
+            ('horizontal', lambda x, y: (x, 64, 255 - x)),
+            ('vertical', lambda x, y: (y, 64, 255 - y)),
+            ('diagonal', lambda x, y: ((x + y) // 2, 128, 64)),
+            ('checker', lambda x, y: (255, 255, 255) if (x // 32 + y // 32) % 2 else (0, 0, 0)),
+        ):
+            image = Image.new('RGB', (256, 256))
+            image.putdata([draw(x, y) for y in range(256) for x in range(256)])
+            path = Path(tmp) / f"{name}.jpg"
+            image.save(path, quality=90)
+            hashes[path.name] = image_hashes.hash_image(path)
+    synthetic = image_hashes.HashIndex(hashes).clusters()
+    tester.test(
+        "Unrelated synthetic images do not cluster",
+        not synthetic,
+        f"Clusters: {synthetic}"
+    )
+
+    return tester
+
+def test_search_index():
+    """Search index is current"""
+    tester = TestIndexes()
+
+    with open(METADATA_FILE) as f:
+        metadata = json.load(f)
+
+    try:
+        with open(search_index.INDEX_FILE) as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        tester.test("Search index loads", False, str(e))
+        return tester
+
+    tester.test(
+        "Search index matches images_metadata.json",
+        index == search_index.build_index(metadata),
+        "Run: python3 scripts/search_index.py"
+    )
+
+    tester.test(
+        "Every indexed token occurs in the text of its documents",
+        all(token in index['text'][doc] for token, docs in index['tokens'].items() for doc in docs)
+    )
+
+    return tester
+
+def main():
+    """Run all tests"""
+    print("=" * 80)
+    print("INDEX TESTS")
+    print("=" * 80)
+    print()
+
+    all_results = []
+
+    print("🎨 Palette index tests:")
+    all_results.append(test_palette_index())
+    print()
+
+    print("🔎 Search index tests:")
+    all_results.append(test_search_index())
+    print()
+
+    print("🧬 Perceptual hash tests:")
+    all_results.append(test_image_hashes())
+    print()
+
+    # Summary
+    total_passed = sum(r.passed for r in all_results)
+    total_failed = sum(r.failed for r in all_results)
+
+    print("=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    print(f"✓ Passed: {total_passed}")
+    print(f"✗ Failed: {total_failed}")
+    print()
+
+    if total_failed > 0:
+        print("❌ TESTS FAILED - Please fix the issues above")
+        sys.exit(1)
+    else:
+        print("✅ ALL TESTS PASSED")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
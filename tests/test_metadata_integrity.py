@@ -11,6 +11,7 @@ import sys
 # Paths
 IMAGE_DIR = Path("editorial_feed_images")
 METADATA_FILE = Path("images_metadata.json")
+DERIVATIVES_INDEX = Path("derivatives") / "index.json"
 
 class TestMetadataIntegrity:
     def __init__(self):
@@ -254,6 +255,44 @@ def test_analyzed_colors():
 
     return tester
 
+def test_derivatives():
+    """Test derivative records written by scripts/build_derivatives.py"""
+    tester = TestMetadataIntegrity()
+
+    with open(METADATA_FILE) as f:
+        data = json.load(f)
+
+    # derivatives/ is git-ignored, so the tracked metadata must not refer to it
+    recorded = [entry['newFilename'] for entry in data if 'derivatives' in entry]
+    tester.test(
+        "Metadata has no derivative records (they live in derivatives/index.json)",
+        len(recorded) == 0,
+        f"{len(recorded)} entries, e.g. {recorded[:3]}\n  Run: python3 scripts/build_derivatives.py"
+    )
+
+    # Derivatives are optional (built locally), but indexed ones must exist
+    invalid = []
+    if DERIVATIVES_INDEX.exists():
+        with open(DERIVATIVES_INDEX) as f:
+            index = json.load(f)
+        for filename, records in index['images'].items():
+            for record in records:
+                path = Path(record.get('path', ''))
+                if not path.exists():
+                    invalid.append(f"{filename}: missing {path}")
+                elif path.stat().st_size != record.get('bytes'):
+                    invalid.append(f"{filename}: {path} size changed")
+
+    tester.test(
+        "Indexed derivatives exist with the recorded sizes",
+        len(invalid) == 0,
+        f"\n  " + "\n  ".join(invalid[:3]) +
+        (f"\n  and {len(invalid)-3} more" if len(invalid) > 3 else "") +
+        "\n  Run: python3 scripts/build_derivatives.py"
+    )
+
+    return tester
+
 def main():
     """Run all tests"""
     print("=" * 80)
@@ -283,6 +322,10 @@ def main():
     all_results.append(test_analyzed_colors())
     print()
 
+    print("🖼  Derivative tests:")
+    all_results.append(test_derivatives())
+    print()
+
     # Summary
     total_passed = sum(r.passed for r in all_results)
     total_failed = sum(r.failed for r in all_results)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test suite for scripts/metadata_io.py.
+Run with: python3 tests/test_metadata_io.py
+"""
+
+import copy
+import json
+from pathlib import Path
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import metadata_io
+
+# Paths
+METADATA_FILE = Path("images_metadata.json")
+
+class TestMetadataIO:
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+        self.warnings = 0
+
+    def test(self, name, condition, error_msg=""):
+        """Run a single test"""
+        if condition:
+            print(f"✓ {name}")
+            self.passed += 1
+            return True
+        else:
+            print(f"✗ {name}")
+            if error_msg:
+                print(f"  → {error_msg}")
+            self.failed += 1
+            return False
+
+def copy_metadata(tmp):
+    """A copy of the metadata file in `tmp`; returns (path, original text)"""
+    original = METADATA_FILE.read_text()
+    path = Path(tmp) / METADATA_FILE.name
+    path.write_text(original)
+    return path, original
+
+def test_writes():
+    """Saves are exact, journaled as deltas, and can be reverted"""
+    tester = TestMetadataIO()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path, original = copy_metadata(tmp)
+        metadata = json.loads(original)
+
+        tester.test(
+            "Saving unchanged metadata writes nothing",
+            metadata_io.save_metadata(metadata, "noop", path) == 0 and not metadata_io.journal_path(path).exists()
+        )
+
+        changed = copy.deepcopy(metadata)
+        changed[3]['title'] = 'Changed Title'
+        changed.append({'newFilename': 'appended.jpg'})
+        count = metadata_io.save_metadata(changed, "test", path)
+        tester.test(
+            "Saved file is byte-identical to json.dump(metadata, f, indent=2)",
+            path.read_text() == json.dumps(changed, indent=2)
+        )
+
+        records = metadata_io.read_journal(path)
+        tester.test(
+            "First save journals a checkpoint, then only the changed entries",
+            [r['op'] for r in records] == ['checkpoint', 'change'] and
+            sorted(records[1]['entries']) == ['134', '3'] and count == 2,
+            f"{[(r['op'], sorted(r.get('entries', {}))) for r in records]}"
+        )
+
+        metadata_io.revert(path)
+        tester.test(
+            "Revert restores the previous file exactly",
+            path.read_text() == original and metadata_io.recover(path) == 'clean'
+        )
+
+        # A checkpoint spanning many read chunks, followed by a torn append
+        with open(metadata_io.journal_path(path), 'a') as f:
+            f.write(json.dumps({'seq': 99, 'op': 'checkpoint', 'metadata': ['x' * 300_000]}) + '\n')
+            f.write('{"seq": 100, "op": "cha')
+        last = metadata_io.last_record(path)
+        tester.test(
+            "last_record reads a large final record behind a torn line",
+            last['seq'] == 99 and last['metadata'] == ['x' * 300_000]
+        )
+
+    return tester
+
+def test_recovery():
+    """Interrupted saves and torn files are recovered from the journal"""
+    tester = TestMetadataIO()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path, original = copy_metadata(tmp)
+        metadata = json.loads(original)
+        metadata[0]['title'] = 'First Change'
+        metadata_io.save_metadata(metadata, "first", path)
+        saved = path.read_text()
+
+        # Ctrl-C after the journal append, before the rename
+        metadata[1]['title'] = 'Interrupted Change'
+        with mock.patch.object(metadata_io, 'atomic_write', side_effect=KeyboardInterrupt):
+            try:
+                metadata_io.save_metadata(metadata, "interrupted", path)
+            except KeyboardInterrupt:
+                pass
+        untouched = path.read_text() == saved
+        status = metadata_io.recover(path)
+        tester.test(
+            "Interrupted save leaves the old file and is rolled forward by recover",
+            untouched and status == 'recovered' and path.read_text() == json.dumps(metadata, indent=2),
+            f"untouched={untouched}, status={status}"
+        )
+
+        path.write_text(path.read_text()[:500])
+        status = metadata_io.recover(path)
+        tester.test(
+            "Truncated file is rebuilt from the journal",
+            status == 'recovered' and path.read_text() == json.dumps(metadata, indent=2),
+            f"status={status}"
+        )
+
+        with open(metadata_io.journal_path(path), 'a') as f:
+            f.write('{"seq": 99, "op": "cha')
+        metadata[2]['title'] = 'After Torn Journal'
+        metadata_io.save_metadata(metadata, "after torn", path)
+        tester.test(
+            "A torn journal line is dropped and later saves replay cleanly",
+            metadata_io.recover(path) == 'clean' and metadata_io.last_record(path)['reason'] == "after torn"
+        )
+
+        edited = path.read_text().replace('After Torn Journal', 'Edited By Hand')
+        path.write_text(edited)
+        status = metadata_io.recover(path)
+        tester.test(
+            "Edits made outside the journal are not overwritten",
+            status == 'diverged' and path.read_text() == edited,
+            f"status={status}"
+        )
+
+        metadata = metadata_io.load_metadata(path)
+        metadata[4]['title'] = 'After Hand Edit'
+        metadata_io.save_metadata(metadata, "after hand edit", path)
+        metadata_io.checkpoint(path)
+        tester.test(
+            "Hand edits are checkpointed on the next save; compaction keeps the state",
+            len(metadata_io.read_journal(path)) == 1 and metadata_io.recover(path) == 'clean' and
+            'Edited By Hand' in path.read_text()
+        )
+
+    return tester
+
+def main():
+    """Run all tests"""
+    print("=" * 80)
+    print("METADATA I/O TESTS")
+    print("=" * 80)
+    print()
+
+    all_results = []
+
+    print("💾 Write tests:")
+    all_results.append(test_writes())
+    print()
+
+    print("🩹 Recovery tests:")
+    all_results.append(test_recovery())
+    print()
+
+    # Summary
+    total_passed = sum(r.passed for r in all_results)
+    total_failed = sum(r.failed for r in all_results)
+
+    print("=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    print(f"✓ Passed: {total_passed}")
+    print(f"✗ Failed: {total_failed}")
+    print()
+
+    if total_failed > 0:
+        print("❌ TESTS FAILED - Please fix the issues above")
+        sys.exit(1)
+    else:
+        print("✅ ALL TESTS PASSED")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
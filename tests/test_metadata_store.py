@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test suite for scripts/metadata_store.py.
+Run with: python3 tests/test_metadata_store.py
+"""
+
+import copy
+import json
+from pathlib import Path
+import sys
+import tempfile
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import metadata_store
+
+# Paths
+METADATA_FILE = Path("images_metadata.json")
+
+class TestMetadataStore:
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+        self.warnings = 0
+
+    def test(self, name, condition, error_msg=""):
+        """Run a single test"""
+        if condition:
+            print(f"✓ {name}")
+            self.passed += 1
+            return True
+        else:
+            print(f"✗ {name}")
+            if error_msg:
+                print(f"  → {error_msg}")
+            self.failed += 1
+            return False
+
+def test_round_trip():
+    """Import then export reproduces the metadata file byte for byte"""
+    tester = TestMetadataStore()
+    original = METADATA_FILE.read_text()
+    metadata = json.loads(original)
+
+    # Entries in shapes the columns don't cover must survive too
+    unusual = [
+        {'title': 'Reordered', 'newFilename': 'reordered.jpg', 'derivatives': [{'width': 240, 'bytes': 1.5}],
+         'tags': {'style': None, 'colors': ['red', 'red'], 'analyzed_colors': {'named': ['red'], 'score': 1}}},
+        {'newFilename': 'no-tags.jpg', 'title': None, 'tags': []},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = metadata_store.connect(Path(tmp) / "store.db")
+        metadata_store.import_metadata(conn, metadata)
+        exported = json.dumps(metadata_store.export_metadata(conn), indent=2)
+        tester.test(
+            f"{METADATA_FILE} round-trips exactly ({len(metadata)} entries)",
+            exported == original,
+            "Exported JSON differs from the original"
+        )
+
+        metadata_store.import_metadata(conn, metadata + unusual)
+        exported = metadata_store.export_metadata(conn)
+        tester.test(
+            "Unknown keys, key order and unexpected types round-trip",
+            json.dumps(exported[len(metadata):]) == json.dumps(unusual),
+            f"Got {exported[len(metadata):]}"
+        )
+
+        duplicate = metadata + [dict(metadata[0], title='Copy')]
+        try:
+            metadata_store.import_metadata(conn, duplicate)
+            error = None
+        except ValueError as e:
+            error = str(e)
+        tester.test(
+            "A duplicate newFilename is reported by name and imports nothing",
+            error is not None and metadata[0]['newFilename'] in error and
+            len(metadata_store.export_metadata(conn)) == len(metadata + unusual),
+            f"Got {error!r}"
+        )
+        conn.close()
+
+    return tester
+
+def test_updates_and_queries():
+    """Single-entry updates reach the tag tables, full-text index and export"""
+    tester = TestMetadataStore()
+    with open(METADATA_FILE) as f:
+        metadata = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = metadata_store.connect(Path(tmp) / "store.db")
+        metadata_store.import_metadata(conn, metadata)
+
+        tennis = metadata_store.search(conn, "tennis")
+        tester.test(
+            "Full-text search finds tennis images",
+            tennis and all('tennis' in json.dumps(metadata_store.get_entry(conn, f)).lower() for f in tennis),
+            f"Got {tennis}"
+        )
+
+        with_tag = metadata_store.images_with_tag(conn, 'gradient', 'style')
+        expected = [e['newFilename'] for e in metadata if 'gradient' in e['tags']['style']]
+        tester.test(
+            "Tag query matches a scan of the metadata",
+            with_tag == expected,
+            f"{len(with_tag)} vs {len(expected)}"
+        )
+
+        name = metadata[0]['tags']['analyzed_colors']['named'][0]
+        with_color = metadata_store.images_with_color(conn, name)
+        expected = {e['newFilename'] for e in metadata if name in e['tags']['analyzed_colors']['named']}
+        tester.test(
+            f"Color query finds every image named '{name}'",
+            set(with_color) == expected,
+            f"{len(with_color)} vs {len(expected)}"
+        )
+
+        entry = copy.deepcopy(metadata[1])
+        entry['title'] = 'Renamed Entry'
+        entry['tags']['style'] = ['zz-new-style']
+        metadata_store.put_entry(conn, entry)
+        expected = copy.deepcopy(metadata)
+        expected[1] = entry
+        tester.test(
+            "Updating one entry changes only that entry, in place",
+            json.dumps(metadata_store.export_metadata(conn)) == json.dumps(expected)
+        )
+        tester.test(
+            "Updated entry is found by its new tag and title",
+            metadata_store.images_with_tag(conn, 'zz-new-style') == [entry['newFilename']] and
+            metadata_store.search(conn, "renamed entry") == [entry['newFilename']]
+        )
+
+        metadata_store.delete_entry(conn, entry['newFilename'])
+        tester.test(
+            "Deleted entries leave the export and the full-text index",
+            metadata_store.get_entry(conn, entry['newFilename']) is None and
+            metadata_store.search(conn, "renamed entry") == [] and
+            len(metadata_store.export_metadata(conn)) == len(metadata) - 1
+        )
+        conn.close()
+
+    return tester
+
+def main():
+    """Run all tests"""
+    print("=" * 80)
+    print("METADATA STORE TESTS")
+    print("=" * 80)
+    print()
+
+    all_results = []
+
+    print("🗄  Import/export tests:")
+    all_results.append(test_round_trip())
+    print()
+
+    print("🔎 Update and query tests:")
+    all_results.append(test_updates_and_queries())
+    print()
+
+    # Summary
+    total_passed = sum(r.passed for r in all_results)
+    total_failed = sum(r.failed for r in all_results)
+
+    print("=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    print(f"✓ Passed: {total_passed}")
+    print(f"✗ Failed: {total_failed}")
+    print()
+
+    if total_failed > 0:
+        print("❌ TESTS FAILED - Please fix the issues above")
+        sys.exit(1)
+    else:
+        print("✅ ALL TESTS PASSED")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -6,75 +6,46 @@
 
 const fs = require('fs');
 const path = require('path');
+const vm = require('vm');
 
 // Load metadata
 const metadata = JSON.parse(
     fs.readFileSync('./images_metadata.json', 'utf8')
 );
 
-// Color keywords (same as in index.html)
-const colorKeywords = [
-    'red', 'blue', 'green', 'yellow', 'orange', 'purple', 'pink', 'brown',
-    'black', 'white', 'gray', 'grey', 'cyan', 'magenta', 'lime', 'maroon',
-    'navy', 'olive', 'teal', 'aqua', 'silver', 'gold', 'crimson', 'violet',
-    'indigo', 'turquoise', 'coral', 'salmon', 'khaki', 'lavender', 'plum'
-];
+// Search shared with index.html
+const SearchIndex = require('../search_index.js');
 
-// Search implementation (matches index.html logic)
-function searchImages(query) {
-    if (!query) return metadata;
-
-    const searchLower = query.toLowerCase().trim();
-
-    // Check if search term is a color keyword
-    const isColorSearch = colorKeywords.some(color =>
-        searchLower.includes(color) || color.includes(searchLower)
-    );
-
-    if (isColorSearch) {
-        // Color search with weighted scoring
-        const scored = metadata.map(img => {
-            let score = 0;
-
-            if (img.tags.analyzed_colors) {
-                const analyzed = img.tags.analyzed_colors;
-                if (analyzed.named) {
-                    analyzed.named.forEach((color, index) => {
-                        if (color.toLowerCase().includes(searchLower)) {
-                            score += 10 - (index * 2);
-                        }
-                    });
-                }
-            }
+// Prebuilt index (scripts/search_index.py), if present and built from this metadata
+const INDEX_FILE = './data/search_index.json';
+const searchIndex = fs.existsSync(INDEX_FILE) ? JSON.parse(fs.readFileSync(INDEX_FILE, 'utf8')) : null;
+const indexIsCurrent = SearchIndex.isCurrent(searchIndex, metadata);
+const searcher = indexIsCurrent ? SearchIndex.createSearcher(searchIndex) : null;
 
-            const colorTags = img.tags.colors || [];
-            if (colorTags.some(tag => tag.toLowerCase().includes(searchLower))) {
-                score += 5;
-            }
+// Search implementation (what index.html does: the index when current, else a full scan)
+function searchImages(query) {
+    if (!searcher) return SearchIndex.scanSearch(metadata, query);
+    return searcher.search(query).map(doc => metadata[doc]);
+}
 
-            return { img, score };
-        }).filter(item => item.score > 0);
-
-        scored.sort((a, b) => b.score - a.score);
-        return scored.map(item => item.img);
-    } else {
-        // Non-color search
-        return metadata.filter(img => {
-            if (img.title.toLowerCase().includes(searchLower)) return true;
-            if (img.description.toLowerCase().includes(searchLower)) return true;
-
-            const searchableTags = [
-                ...(img.tags.conceptual || []),
-                ...(img.tags.subject || []),
-                ...(img.tags.colors || []),
-                ...(img.tags.style || [])
-            ];
-
-            return searchableTags.some(tag =>
-                tag.toLowerCase().includes(searchLower)
-            );
-        });
-    }
+// Queries for comparing indexed search with a full scan: every color keyword,
+// and prefixes and inner substrings of words from the metadata
+function equivalenceQueries() {
+    const queries = new Set(['', ' ', 'a', 'e', 'ten', 'tennis', 'red gradient', 'Broken Heart',
+                             '#ca387f', '-', 'sci-fi', 'gold ', ' BLUE', 'x y', 'gradient background']);
+    SearchIndex.COLOR_KEYWORDS.forEach(color => queries.add(color));
+
+    const words = new Set();
+    metadata.forEach(img => {
+        `${img.title} ${img.description} ${Object.values(img.tags).flat().join(' ')}`
+            .split(/\s+/).forEach(word => words.add(word));
+    });
+    [...words].slice(0, 400).forEach(word => {
+        queries.add(word);
+        queries.add(word.slice(0, 3));
+        queries.add(word.slice(1, -1));
+    });
+    return [...queries];
 }
 
 // Test framework
@@ -85,9 +56,9 @@ class TestRunner {
         this.tests = [];
     }
 
-    test(name, testFn) {
+    async test(name, testFn) {
         try {
-            const result = testFn();
+            const result = await testFn();
             if (result.success) {
                 console.log(`✓ ${name}`);
                 if (result.message) {
@@ -124,8 +95,44 @@ class TestRunner {
     }
 }
 
+// Run search_worker.js as the browser would, with fetch() reading from disk
+function startWorker() {
+    const received = [];
+    const context = {
+        console,
+        setTimeout,
+        fetch: async url => {
+            const file = url.split('?')[0];
+            return {
+                ok: fs.existsSync(file),
+                status: 404,
+                json: async () => JSON.parse(fs.readFileSync(file, 'utf8'))
+            };
+        },
+        postMessage: message => received.push(message)
+    };
+    context.self = context;
+    context.importScripts = file => vm.runInContext(fs.readFileSync(file, 'utf8'), context);
+    vm.createContext(context);
+    vm.runInContext(fs.readFileSync('search_worker.js', 'utf8'), context);
+
+    return {
+        received,
+        post: data => context.onmessage({ data }),
+        // Resolves with the first received message of `type`
+        next: type => new Promise(resolve => {
+            const poll = () => {
+                const message = received.find(m => m.type === type);
+                if (message) resolve(message);
+                else setTimeout(poll, 1);
+            };
+            poll();
+        })
+    };
+}
+
 // Tests
-function runTests() {
+async function runTests() {
     const runner = new TestRunner();
 
     console.log('='.repeat(80));
@@ -136,7 +143,7 @@ function runTests() {
     console.log('🔍 Basic search tests:');
 
     // Test 1: Tennis search should only return tennis images
-    runner.test('Search "tennis" returns only tennis images', () => {
+    await runner.test('Search "tennis" returns only tennis images', () => {
         const results = searchImages('tennis');
         const hasNonTennis = results.some(img => {
             const text = JSON.stringify(img).toLowerCase();
@@ -150,7 +157,7 @@ function runTests() {
     });
 
     // Test 2: Search for specific title
-    runner.test('Search finds exact title matches', () => {
+    await runner.test('Search finds exact title matches', () => {
         // Find an image with unique title
         const targetImage = metadata.find(img => img.title === 'Broken Heart');
         if (!targetImage) {
@@ -167,7 +174,7 @@ function runTests() {
     });
 
     // Test 3: Color search returns color-relevant results
-    runner.test('Search "red" returns red-colored images', () => {
+    await runner.test('Search "red" returns red-colored images', () => {
         const results = searchImages('red');
         const hasRed = results.length > 0 && results.every(img => {
             const colors = img.tags.colors || [];
@@ -183,7 +190,7 @@ function runTests() {
     });
 
     // Test 4: Empty search returns all images
-    runner.test('Empty search returns all images', () => {
+    await runner.test('Empty search returns all images', () => {
         const results = searchImages('');
         return {
             success: results.length === metadata.length,
@@ -192,7 +199,7 @@ function runTests() {
     });
 
     // Test 5: Search doesn't match analyzed_colors object structure
-    runner.test('Search does not match color hex codes', () => {
+    await runner.test('Search does not match color hex codes', () => {
         // Search for a hex color that exists in analyzed_colors
         const results = searchImages('#ca387f');
         return {
@@ -205,7 +212,7 @@ function runTests() {
     console.log('🎯 Specific regression tests:');
 
     // Test 6: Blush Gears regression test
-    runner.test('Entry 81 "blush-gears" is labeled as "Broken Heart"', () => {
+    await runner.test('Entry 81 "blush-gears" is labeled as "Broken Heart"', () => {
         const entry = metadata.find(img => img.newFilename === 'blush-gears-gradient.jpg');
         if (!entry) {
             return { success: false, message: 'blush-gears-gradient.jpg not found' };
@@ -218,7 +225,7 @@ function runTests() {
     });
 
     // Test 7: Honeydew Gears regression test
-    runner.test('Entry 109 "honeydew-gears" is labeled correctly', () => {
+    await runner.test('Entry 109 "honeydew-gears" is labeled correctly', () => {
         const entry = metadata.find(img => img.newFilename === 'honeydew-green-gears-gradient.jpg');
         if (!entry) {
             return { success: false, message: 'honeydew-green-gears-gradient.jpg not found' };
@@ -233,11 +240,105 @@ function runTests() {
         };
     });
 
+    console.log();
+    console.log('🗂  Search index tests:');
+
+    // Test 8: Index is current
+    await runner.test('Search index is built from images_metadata.json', () => {
+        return {
+            success: indexIsCurrent,
+            message: indexIsCurrent ? `${searchIndex.filenames.length} entries` : 'Run: python3 scripts/search_index.py'
+        };
+    });
+
+    // Test 9: Indexed search returns exactly what a full scan does
+    await runner.test('Indexed search matches a full scan', () => {
+        if (!indexIsCurrent) {
+            return { success: false, message: 'Search index missing or stale' };
+        }
+
+        // Also in a different display order, as the gallery shuffles (ties keep display order)
+        const order = metadata.map((_, doc) => doc).reverse();
+        const shuffled = order.map(doc => metadata[doc]);
+        const reordered = SearchIndex.createSearcher(searchIndex, order);
+
+        const queries = equivalenceQueries();
+        const mismatched = queries.filter(query => {
+            const expected = SearchIndex.scanSearch(metadata, query).map(img => img.newFilename);
+            const actual = searchImages(query).map(img => img.newFilename);
+            const expectedShuffled = SearchIndex.scanSearch(shuffled, query).map(img => img.newFilename);
+            const actualShuffled = reordered.search(query).map(doc => metadata[doc].newFilename);
+            return expected.join('\n') !== actual.join('\n') ||
+                   expectedShuffled.join('\n') !== actualShuffled.join('\n');
+        });
+
+        return {
+            success: mismatched.length === 0,
+            message: mismatched.length ? `Differs for: ${mismatched.slice(0, 5).map(q => JSON.stringify(q)).join(', ')}`
+                                       : `${queries.length} queries identical`
+        };
+    });
+
+    // Test 10: The search worker answers like a scan, dropping superseded queries
+    await runner.test('Search worker returns scan results for the newest query', async () => {
+        const shuffled = metadata.slice().reverse();
+        const worker = startWorker();
+        worker.post({ type: 'init', order: shuffled.map(img => img.newFilename) });
+        const ready = await worker.next('ready');
+
+        // A burst of keystrokes: only the last one should be searched
+        ['t', 'te', 'ten', 'tennis'].forEach((query, i) => worker.post({ type: 'search', id: i + 1, query }));
+        const results = await worker.next('results');
+        worker.post({ type: 'search', id: 5, query: 'blue' });
+        await new Promise(resolve => setTimeout(resolve, 10));
+
+        const answered = worker.received.filter(m => m.type === 'results');
+        const mismatched = answered.filter(({ id, positions }) => {
+            const query = id === 4 ? 'tennis' : 'blue';
+            const expected = SearchIndex.scanSearch(shuffled, query).map(img => img.newFilename);
+            const actual = Array.from(positions, position => shuffled[position].newFilename);
+            return expected.join('\n') !== actual.join('\n');
+        });
+
+        return {
+            success: ready.indexed === indexIsCurrent && results.id === 4 &&
+                     answered.map(m => m.id).join() === '4,5' && mismatched.length === 0,
+            message: `Answered ids ${answered.map(m => m.id).join(', ')}` +
+                     (mismatched.length ? `; ids ${mismatched.map(m => m.id).join(', ')} differ from a scan` : '')
+        };
+    });
+
+    // Test 11: Cached and refined results equal fresh ones while typing
+    await runner.test('Query cache returns scan results while typing', () => {
+        const scanner = SearchIndex.createScanner(metadata, 8);
+        const cached = indexIsCurrent ? SearchIndex.createSearcher(searchIndex, null, 8) : null;
+
+        // Type each word out, then delete it again, so prefixes hit and refine the cache
+        const typed = [];
+        ['tennis', 'broken heart', 'gradient background', 'blue', 'sci-fi', 'ab'].forEach(word => {
+            for (let i = 1; i <= word.length; i++) typed.push(word.slice(0, i));
+            for (let i = word.length - 1; i >= 1; i--) typed.push(word.slice(0, i));
+        });
+
+        const mismatched = typed.filter(query => {
+            const expected = SearchIndex.scanSearch(metadata, query).map(img => img.newFilename).join('\n');
+            const scanned = scanner.search(query).map(img => img.newFilename).join('\n');
+            const indexed = cached ? cached.search(query).map(doc => metadata[doc].newFilename).join('\n') : expected;
+            return scanned !== expected || indexed !== expected;
+        });
+
+        return {
+            success: mismatched.length === 0 && scanner.cache.size <= 8,
+            message: mismatched.length ? `Differs for: ${mismatched.slice(0, 5).map(q => JSON.stringify(q)).join(', ')}`
+                                       : `${typed.length} keystrokes identical, ${scanner.cache.size} cached`
+        };
+    });
+
     console.log();
     console.log('⚡ Performance tests:');
 
-    // Test 8: Search performance
-    runner.test('Search completes in reasonable time', () => {
+    // Test 12: Search performance
+    await runner.test('Search completes in reasonable time', () => {
         const start = Date.now();
         const iterations = 100;
 